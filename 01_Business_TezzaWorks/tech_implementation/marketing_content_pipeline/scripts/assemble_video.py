@@ -6,15 +6,25 @@ Assembles final videos using FFmpeg from voiceovers, music, and footage.
 
 import os
 import sys
+import time
+import shutil
+import tempfile
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 import logging
 import json
 import subprocess
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
-from parse_script import ScriptParser, VideoScript, Scene, OnScreenText
+from parse_script import ScriptParser, VideoScript, Scene, OnScreenText, Audio
+from media_probe import MediaProbe
+from segment_cache import (
+    SegmentCache, segment_inputs, render_settings, fingerprint,
+    load_manifest, write_manifest, manifest_path
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,6 +32,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Multi-pass stays the default until single-pass benchmarks faster
+# (scripts/benchmark_assembly.py)
+DEFAULT_ASSEMBLY_MODE = 'multi_pass'
+
 
 @dataclass
 class VideoSegment:
@@ -31,17 +45,33 @@ class VideoSegment:
     video_path: Optional[str] = None
     audio_path: Optional[str] = None
     music_path: Optional[str] = None
+    # Seconds into the music track this segment starts at
+    music_offset: float = 0.0
     text_overlay: Optional[str] = None
     fade_in: bool = False
     fade_out: bool = False
+    # Set when a rendering step fell back (e.g. the overlay was dropped)
+    degraded: bool = False
 
 
 class VideoAssembler:
     """Assemble videos using FFmpeg"""
 
-    def __init__(self, config_path: str = 'config.yaml'):
-        """Initialize the video assembler"""
+    def __init__(self, config_path: str = 'config.yaml', profile: Optional[str] = None):
+        """
+        Initialize the video assembler
+
+        Args:
+            config_path: Path to config file
+            profile: Render profile from render_profiles (default: video.profile)
+        """
         self.config = self._load_config(config_path)
+        self.profile = self._apply_profile(profile)
+        self._clip_locks: Dict[str, threading.Lock] = {}
+        self._clip_locks_guard = threading.Lock()
+        self.segment_cache = SegmentCache.from_config(self.config)
+        self.probe = MediaProbe.from_config(self.config)
+        self.last_run_stats: Dict = {}
         self._check_ffmpeg()
 
     def _load_config(self, config_path: str) -> Dict:
@@ -65,7 +95,8 @@ class VideoAssembler:
                 'audio_codec': 'aac',
                 'audio_bitrate': '192k',
                 'default_scene_duration': 5,
-                'fade_duration': 0.5
+                'fade_duration': 0.5,
+                'assembly_mode': DEFAULT_ASSEMBLY_MODE
             },
             'text_overlay': {
                 'font': 'Arial',
@@ -81,10 +112,39 @@ class VideoAssembler:
                 'assets_music': 'assets/music',
                 'assets_footage': 'assets/footage',
                 'output_videos': 'output',
+                'probe_cache': 'assets/cache/probe.json',
                 'temp': 'temp'
+            },
+            'processing': {
+                'max_concurrent_jobs': 3,
+                'cleanup_temp_files': True
             }
         }
 
+    def _apply_profile(self, name: Optional[str]) -> Optional[str]:
+        """Overlay a render profile's settings on the video settings"""
+        profiles = self.config.get('render_profiles', {})
+        name = name or self.config['video'].get('profile')
+        if not name:
+            return None
+        if name not in profiles:
+            raise ValueError(f"Unknown render profile '{name}' (available: {', '.join(profiles) or 'none'})")
+
+        self.config['video'] = dict(self.config['video'], **(profiles[name] or {}))
+        logger.info(f"Render profile: {name} ({self.config['video']['resolution']} "
+                    f"@ {self.config['video']['framerate']}fps)")
+        return name
+
+    def _video_codec_args(self) -> List[str]:
+        """Encoder arguments for the active profile"""
+        video = self.config['video']
+        args = ['-c:v', video['video_codec']]
+        if video.get('preset'):
+            args.extend(['-preset', str(video['preset'])])
+        if video.get('crf') is not None:
+            args.extend(['-crf', str(video['crf'])])
+        return args
+
     def _check_ffmpeg(self):
         """Check if FFmpeg is installed"""
         try:
@@ -103,22 +163,14 @@ class VideoAssembler:
 
     def get_audio_duration(self, audio_path: str) -> float:
         """Get duration of an audio file in seconds"""
-        try:
-            cmd = [
-                'ffprobe',
-                '-v', 'error',
-                '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                audio_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                return float(result.stdout.strip())
-        except Exception as e:
-            logger.error(f"Error getting audio duration: {e}")
+        return self.get_audio_durations([audio_path])[audio_path]
 
+    def get_audio_durations(self, audio_paths: List[str]) -> Dict[str, float]:
+        """Get durations of many audio files at once, in seconds"""
+        durations = self.probe.durations(audio_paths)
         # Default fallback
-        return self.config['video']['default_scene_duration']
+        default = self.config['video']['default_scene_duration']
+        return {path: default if duration is None else duration for path, duration in durations.items()}
 
     def create_color_clip(
         self,
@@ -143,31 +195,77 @@ class VideoAssembler:
         temp_dir = self.config['paths']['temp']
         os.makedirs(temp_dir, exist_ok=True)
 
-        output_path = os.path.join(temp_dir, f'color_{color}_{duration}s.mp4')
+        framerate = self.config['video']['framerate']
+        encoding = '_'.join(str(arg) for arg in self._video_codec_args()[1::2])
+        output_path = os.path.join(temp_dir, f'color_{color}_{resolution}_{framerate}fps_{encoding}_{duration}s.mp4')
 
-        # Skip if already exists
-        if os.path.exists(output_path):
-            return output_path
+        # Parallel segments of the same length wait for one render of the clip
+        with self._clip_locks_guard:
+            clip_lock = self._clip_locks.setdefault(output_path, threading.Lock())
+
+        with clip_lock:
+            # Skip if already exists
+            if os.path.exists(output_path):
+                return output_path
+            return self._render_color_clip(output_path, duration, color, resolution)
 
+    def _render_color_clip(self, output_path: str, duration: float, color: str, resolution: str) -> str:
+        """Encode a color clip to output_path"""
         framerate = self.config['video']['framerate']
 
+        # Other jobs share the clip cache, so the clip is written under a
+        # private name and moved into place when complete
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_path), suffix='.part.mp4')
+        os.close(fd)
+
         cmd = [
             'ffmpeg',
             '-f', 'lavfi',
             '-i', f'color=c={color}:s={resolution}:d={duration}:r={framerate}',
-            '-c:v', self.config['video']['video_codec'],
+            *self._video_codec_args(),
             '-t', str(duration),
             '-y',
-            output_path
+            tmp_path
         ]
 
         try:
             subprocess.run(cmd, check=True, capture_output=True, timeout=30)
+            os.replace(tmp_path, output_path)
             logger.info(f"Created color clip: {output_path}")
             return output_path
         except Exception as e:
             logger.error(f"Error creating color clip: {e}")
             return None
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _drawtext_filter(self, text: str, position: str = None) -> str:
+        """Build the drawtext filter for a text overlay"""
+        if not position:
+            position = self.config['text_overlay']['position']
+
+        # Sizes are given for 1080p and scale with the profile's frame height
+        scale = int(self.config['video']['resolution'].split('x')[1]) / 1080
+        font_size = round(self.config['text_overlay']['font_size'] * scale)
+        font_color = self.config['text_overlay']['font_color']
+        padding = round(self.config['text_overlay']['padding'] * scale)
+        border = max(1, round(2 * scale))
+
+        # Escape text for FFmpeg
+        text = text.replace(':', r'\:').replace("'", r"'\''")
+
+        # Position mapping
+        if position == 'bottom':
+            y_pos = f'h-th-{padding}'
+        elif position == 'top':
+            y_pos = str(padding)
+        else:  # center
+            y_pos = '(h-th)/2'
+
+        x_pos = '(w-tw)/2'  # Centered horizontally
+
+        return f"drawtext=text='{text}':fontsize={font_size}:fontcolor={font_color}:x={x_pos}:y={y_pos}:borderw={border}:bordercolor=black"
 
     def add_text_overlay(
         self,
@@ -188,32 +286,13 @@ class VideoAssembler:
         Returns:
             Path to the output video
         """
-        if not position:
-            position = self.config['text_overlay']['position']
-
-        font_size = self.config['text_overlay']['font_size']
-        font_color = self.config['text_overlay']['font_color']
-        padding = self.config['text_overlay']['padding']
-
-        # Escape text for FFmpeg
-        text = text.replace(':', r'\:').replace("'", r"'\''")
-
-        # Position mapping
-        if position == 'bottom':
-            y_pos = f'h-th-{padding}'
-        elif position == 'top':
-            y_pos = str(padding)
-        else:  # center
-            y_pos = '(h-th)/2'
-
-        x_pos = '(w-tw)/2'  # Centered horizontally
-
-        filter_text = f"drawtext=text='{text}':fontsize={font_size}:fontcolor={font_color}:x={x_pos}:y={y_pos}:borderw=2:bordercolor=black"
+        filter_text = self._drawtext_filter(text, position)
 
         cmd = [
             'ffmpeg',
             '-i', video_path,
             '-vf', filter_text,
+            *self._video_codec_args(),
             '-c:a', 'copy',
             '-y',
             output_path
@@ -232,7 +311,8 @@ class VideoAssembler:
         voiceover_path: str,
         music_path: str,
         output_path: str,
-        music_volume: float = 0.3
+        music_volume: float = 0.3,
+        music_offset: float = 0.0
     ) -> str:
         """
         Merge voiceover and background music
@@ -242,6 +322,7 @@ class VideoAssembler:
             music_path: Path to background music
             output_path: Output audio path
             music_volume: Volume level for music (0.0-1.0)
+            music_offset: Seconds into the music track to start from
 
         Returns:
             Path to merged audio
@@ -249,6 +330,7 @@ class VideoAssembler:
         cmd = [
             'ffmpeg',
             '-i', voiceover_path,
+            *(['-ss', f'{music_offset:.3f}'] if music_offset else []),
             '-i', music_path,
             '-filter_complex',
             f'[1:a]volume={music_volume}[music];[0:a][music]amix=inputs=2:duration=first',
@@ -269,7 +351,8 @@ class VideoAssembler:
     def create_video_segment(
         self,
         segment: VideoSegment,
-        output_path: str
+        output_path: str,
+        work_dir: Optional[str] = None
     ) -> str:
         """
         Create a single video segment
@@ -277,10 +360,14 @@ class VideoAssembler:
         Args:
             segment: VideoSegment object
             output_path: Output video path
+            work_dir: Directory for intermediate files (default: next to output_path)
 
         Returns:
             Path to created segment
         """
+        work_dir = work_dir or os.path.dirname(output_path) or '.'
+        os.makedirs(work_dir, exist_ok=True)
+
         # Use provided video or create black background
         if segment.video_path and os.path.exists(segment.video_path):
             video_source = segment.video_path
@@ -289,46 +376,51 @@ class VideoAssembler:
 
         # Add text overlay if provided
         if segment.text_overlay:
-            temp_dir = self.config['paths']['temp']
-            os.makedirs(temp_dir, exist_ok=True)
-            text_output = os.path.join(temp_dir, f'segment_{segment.order}_text.mp4')
+            text_output = os.path.join(work_dir, f'segment_{segment.order}_text.mp4')
             video_source = self.add_text_overlay(video_source, segment.text_overlay, text_output)
+            segment.degraded = segment.degraded or video_source != text_output
 
         # Merge audio tracks if both exist
         audio_source = segment.audio_path
+        audio_start = 0.0
         if segment.audio_path and segment.music_path:
-            temp_dir = self.config['paths']['temp']
-            os.makedirs(temp_dir, exist_ok=True)
-            merged_audio = os.path.join(temp_dir, f'segment_{segment.order}_audio.mp3')
+            # AAC output, so the container must not be .mp3
+            merged_audio = os.path.join(work_dir, f'segment_{segment.order}_audio.m4a')
             audio_source = self.merge_audio_tracks(
                 segment.audio_path,
                 segment.music_path,
-                merged_audio
+                merged_audio,
+                music_offset=segment.music_offset
             )
+            segment.degraded = segment.degraded or audio_source != merged_audio
         elif segment.music_path:
             audio_source = segment.music_path
+            audio_start = segment.music_offset
 
-        # Combine video and audio
+        # Combine video and audio. Silent segments get a silent track and all
+        # audio is brought to one format, as concatenation copies streams
+        # and takes its layout from the first segment. Audio that runs out
+        # early (e.g. the end of a music track) is padded with silence
         if audio_source:
-            cmd = [
-                'ffmpeg',
-                '-i', video_source,
-                '-i', audio_source,
-                '-c:v', 'copy',
-                '-c:a', self.config['video']['audio_codec'],
-                '-shortest',
-                '-y',
-                output_path
-            ]
+            audio_input = [*(['-ss', f'{audio_start:.3f}'] if audio_start else []), '-i', audio_source]
         else:
-            # Just copy video if no audio
-            cmd = [
-                'ffmpeg',
-                '-i', video_source,
-                '-c:v', 'copy',
-                '-y',
-                output_path
-            ]
+            audio_input = ['-f', 'lavfi', '-i', 'anullsrc=r=44100:cl=stereo']
+
+        cmd = [
+            'ffmpeg',
+            '-i', video_source,
+            *audio_input,
+            '-map', '0:v:0',
+            '-map', '1:a:0',
+            '-c:v', 'copy',
+            '-c:a', self.config['video']['audio_codec'],
+            '-ar', '44100',
+            '-ac', '2',
+            '-af', 'apad',
+            '-t', f'{segment.duration:.3f}',
+            '-y',
+            output_path
+        ]
 
         try:
             subprocess.run(cmd, check=True, capture_output=True, timeout=120)
@@ -341,7 +433,8 @@ class VideoAssembler:
     def concatenate_segments(
         self,
         segment_paths: List[str],
-        output_path: str
+        output_path: str,
+        work_dir: Optional[str] = None
     ) -> str:
         """
         Concatenate multiple video segments
@@ -349,15 +442,16 @@ class VideoAssembler:
         Args:
             segment_paths: List of video segment paths
             output_path: Output video path
+            work_dir: Directory for the concat list (default: the temp path)
 
         Returns:
             Path to final video
         """
-        temp_dir = self.config['paths']['temp']
-        os.makedirs(temp_dir, exist_ok=True)
+        work_dir = work_dir or self.config['paths']['temp']
+        os.makedirs(work_dir, exist_ok=True)
 
         # Create concat file
-        concat_file = os.path.join(temp_dir, 'concat_list.txt')
+        concat_file = os.path.join(work_dir, 'concat_list.txt')
         with open(concat_file, 'w') as f:
             for segment_path in segment_paths:
                 f.write(f"file '{os.path.abspath(segment_path)}'\n")
@@ -380,52 +474,41 @@ class VideoAssembler:
             logger.error(f"Error concatenating segments: {e}")
             return None
 
-    def assemble_from_script(
+    def build_segments(
         self,
         script: VideoScript,
         voiceover_results: List[Dict],
-        music_results: List[Dict],
-        output_path: Optional[str] = None
-    ) -> str:
+        music_results: List[Dict]
+    ) -> List[VideoSegment]:
         """
-        Assemble a complete video from a script
+        Lay out one segment per script element, in order
 
-        Args:
-            script: Parsed VideoScript object
-            voiceover_results: List of voiceover generation results
-            music_results: List of music generation results
-            output_path: Output video path
-
-        Returns:
-            Path to assembled video
+        Each cue's music plays under every segment up to the next cue, each
+        segment picking the track up where the previous one left off, until
+        the track runs out.
         """
-        if not output_path:
-            output_dir = self.config['paths']['output_videos']
-            os.makedirs(output_dir, exist_ok=True)
-            safe_title = "".join(c for c in script.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            safe_title = safe_title.replace(' ', '_')
-            output_path = os.path.join(output_dir, f'{safe_title}.mp4')
-
-        logger.info(f"Assembling video: {script.title}")
-
-        # Create segments
         segments: List[VideoSegment] = []
         voiceover_map = {v['order']: v for v in voiceover_results}
         music_map = {m['order']: m for m in music_results}
         text_map = {t.order: t.content for t in script.get_text_overlays()}
 
+        # Every voiceover and music track is measured up front in one go;
+        # files probed while they were generated come straight from the probe cache
+        orders = {element.order for element in script.elements}
+        durations = self.get_audio_durations(
+            [v['audio_path'] for order, v in voiceover_map.items() if order in orders] +
+            [m['audio_path'] for order, m in music_map.items() if order in orders and m.get('audio_path')]
+        )
+
         # Process each element in order
+        scene_duration = float(self.config['video']['default_scene_duration'])
         for element in script.elements:
-            segment = VideoSegment(order=element.order, duration=5.0)
+            segment = VideoSegment(order=element.order, duration=scene_duration)
 
             # Add voiceover if available
             if element.order in voiceover_map:
                 segment.audio_path = voiceover_map[element.order]['audio_path']
-                segment.duration = self.get_audio_duration(segment.audio_path)
-
-            # Add music if available
-            if element.order in music_map:
-                segment.music_path = music_map[element.order]['audio_path']
+                segment.duration = durations[segment.audio_path]
 
             # Add text overlay if available
             if element.order in text_map:
@@ -433,26 +516,405 @@ class VideoAssembler:
 
             segments.append(segment)
 
-        # Create individual segment videos
+        self._snap_to_frames(segments)
+
+        # Offsets follow the snapped durations, so the music runs on unbroken
+        music_path, music_offset = None, 0.0
+        for element, segment in zip(script.elements, segments):
+            if isinstance(element, Audio):
+                music_path = music_map.get(element.order, {}).get('audio_path')
+                music_offset = 0.0
+            if music_path and music_offset < durations[music_path]:
+                segment.music_path = music_path
+                segment.music_offset = round(music_offset, 3)
+                music_offset += segment.duration
+
+        return segments
+
+    def _snap_to_frames(self, segments: List[VideoSegment]):
+        """
+        Round segment boundaries to whole frames
+
+        Each boundary is rounded from its exact running time rather than
+        each duration on its own, so rounding never accumulates and every
+        profile cuts at the same moments to within half a frame.
+        """
+        framerate = self.config['video']['framerate']
+        elapsed = 0.0
+        frames_before = 0
+        for segment in segments:
+            elapsed += segment.duration
+            frames_end = max(frames_before + 1, round(elapsed * framerate))
+            segment.duration = (frames_end - frames_before) / framerate
+            frames_before = frames_end
+
+    def render_workers(self) -> int:
+        """Segments rendered at once: one per CPU, capped by processing.max_concurrent_jobs"""
+        limit = self.config.get('processing', {}).get('max_concurrent_jobs') or os.cpu_count() or 1
+        return max(1, min(os.cpu_count() or 1, int(limit)))
+
+    def assemble_multi_pass(
+        self,
+        segments: List[VideoSegment],
+        output_path: str,
+        max_workers: Optional[int] = None,
+        fingerprints: Optional[List[str]] = None
+    ) -> str:
+        """
+        Render every segment to its own file, then concatenate them
+
+        Segments are independent until concatenation, so they are rendered on
+        a worker pool. Each run works in its own directory under the temp
+        path, with a subdirectory per segment, so concurrent jobs never share
+        intermediate files. Given fingerprints, segments already in the
+        segment cache are reused and fresh renders are added to it.
+        """
         temp_dir = self.config['paths']['temp']
         os.makedirs(temp_dir, exist_ok=True)
+        run_dir = tempfile.mkdtemp(prefix='assembly_', dir=temp_dir)
+        max_workers = max_workers or self.render_workers()
+        cache = self.segment_cache if fingerprints else None
+
+        def render(indexed_segment):
+            i, segment = indexed_segment
+            if cache:
+                cached_path = cache.lookup(fingerprints[i])
+                if cached_path:
+                    return cached_path, True
+
+            segment_dir = os.path.join(run_dir, f'segment_{i:03d}')
+            path = self.create_video_segment(
+                segment,
+                os.path.join(segment_dir, 'segment.mp4'),
+                work_dir=segment_dir
+            )
+            # A segment that lost its overlay or music is not worth keeping
+            if cache and path and not segment.degraded:
+                cache.store(fingerprints[i], path, {'order': segment.order, 'text_overlay': segment.text_overlay})
+            return path, False
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            # map() yields in submission order, whatever order segments finish in
+            results = list(executor.map(render, enumerate(segments)))
+        rendered = [result for result in results if result[0]]
+        segment_paths = [path for path, _ in rendered]
+        reused = sum(1 for _, cached in rendered if cached)
+
+        self.last_run_stats = {
+            'mode': 'multi_pass',
+            'segments': len(segments),
+            'rendered': len(rendered) - reused,
+            'reused': reused,
+            'elapsed_seconds': round(time.monotonic() - started, 2)
+        }
+        logger.info(f"Rendered {len(rendered) - reused}/{len(segments)} segments ({reused} reused) "
+                    f"with {max_workers} workers in {self.last_run_stats['elapsed_seconds']}s")
+
+        # A video missing a segment is never written, so the next build
+        # doesn't take it for complete
+        final_video = None
+        failed = [segment.order for segment, (path, _) in zip(segments, results) if not path]
+        if not segments:
+            logger.error("No segments created")
+        elif failed:
+            logger.error(f"Segments {', '.join(f'#{order}' for order in failed)} failed to render; "
+                         f"not assembling {output_path}")
+        else:
+            final_video = self.concatenate_segments(segment_paths, output_path, work_dir=run_dir)
+
+        if self.config.get('processing', {}).get('cleanup_temp_files', True):
+            shutil.rmtree(run_dir, ignore_errors=True)
+        return final_video
+
+    def build_filter_graph(self, segments: List[VideoSegment]) -> Tuple[List[str], str]:
+        """
+        Describe the whole video as one FFmpeg filter graph
+
+        Black backgrounds and silence are generated inside the graph, so only
+        footage, voiceovers and music become inputs. Every segment is brought
+        to the same size, frame rate and audio layout and cut to its duration,
+        then the segments are concatenated.
+
+        Returns:
+            Input arguments for FFmpeg and the filter_complex string
+        """
+        resolution = self.config['video']['resolution']
+        framerate = self.config['video']['framerate']
+        width, height = resolution.split('x')
+
+        input_args: List[str] = []
+        filters: List[str] = []
+        concat_inputs = ''
+
+        def add_input(path: str) -> int:
+            input_args.extend(['-i', path])
+            return len(input_args) // 2 - 1
 
-        segment_paths = []
         for i, segment in enumerate(segments):
-            segment_output = os.path.join(temp_dir, f'segment_{i:03d}.mp4')
-            created_segment = self.create_video_segment(segment, segment_output)
-            if created_segment:
-                segment_paths.append(created_segment)
-
-        # Concatenate all segments
-        if segment_paths:
-            final_video = self.concatenate_segments(segment_paths, output_path)
-            logger.info(f"Video assembly complete: {output_path}")
-            return final_video
-        else:
+            duration = f'{segment.duration:.3f}'
+
+            # Video: footage fitted to the frame, or a black background
+            if segment.video_path and os.path.exists(segment.video_path):
+                index = add_input(segment.video_path)
+                video_chain = [
+                    f'[{index}:v]scale={width}:{height}:force_original_aspect_ratio=decrease',
+                    f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2',
+                    f'fps={framerate}',
+                    f'tpad=stop_mode=clone:stop_duration={duration}',
+                    f'trim=duration={duration}'
+                ]
+            else:
+                video_chain = [f'color=c=black:s={resolution}:r={framerate}:d={duration}']
+            video_chain.extend(['setsar=1', 'format=yuv420p', 'setpts=PTS-STARTPTS'])
+            if segment.text_overlay:
+                video_chain.append(self._drawtext_filter(segment.text_overlay))
+            filters.append(','.join(video_chain) + f'[v{i}]')
+
+            # Audio: voiceover with music mixed under it, music alone, or
+            # silence. Music starts where the previous segment left it
+            music_start = f'atrim=start={segment.music_offset:.3f},asetpts=PTS-STARTPTS'
+            if segment.audio_path and segment.music_path:
+                voice = add_input(segment.audio_path)
+                music = add_input(segment.music_path)
+                filters.append(f'[{music}:a]{music_start},volume=0.3[m{i}]')
+                audio_chain = [f'[{voice}:a][m{i}]amix=inputs=2:duration=first']
+            elif segment.music_path:
+                index = add_input(segment.music_path)
+                audio_chain = [f'[{index}:a]{music_start}']
+            elif segment.audio_path:
+                index = add_input(segment.audio_path)
+                audio_chain = [f'[{index}:a]anull']
+            else:
+                audio_chain = ['anullsrc=r=44100:cl=stereo']
+            audio_chain.extend([
+                'aformat=sample_rates=44100:channel_layouts=stereo',
+                'apad',
+                f'atrim=duration={duration}',
+                'asetpts=PTS-STARTPTS'
+            ])
+            filters.append(','.join(audio_chain) + f'[a{i}]')
+
+            concat_inputs += f'[v{i}][a{i}]'
+
+        filters.append(f'{concat_inputs}concat=n={len(segments)}:v=1:a=1[outv][outa]')
+        return input_args, ';'.join(filters)
+
+    def assemble_single_pass(self, segments: List[VideoSegment], output_path: str) -> str:
+        """
+        Render the whole video with one FFmpeg process
+
+        The multi-pass path runs up to four FFmpeg processes per segment and
+        re-encodes the video each time; here the filter graph from
+        build_filter_graph is encoded once.
+        """
+        if not segments:
             logger.error("No segments created")
             return None
 
+        input_args, filter_graph = self.build_filter_graph(segments)
+        total_duration = sum(segment.duration for segment in segments)
+        started = time.monotonic()
+
+        cmd = [
+            'ffmpeg',
+            *input_args,
+            '-filter_complex', filter_graph,
+            '-map', '[outv]',
+            '-map', '[outa]',
+            *self._video_codec_args(),
+            '-pix_fmt', 'yuv420p',
+            '-c:a', self.config['video']['audio_codec'],
+            '-b:a', self.config['video']['audio_bitrate'],
+            '-movflags', '+faststart',
+            '-y',
+            output_path
+        ]
+
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, timeout=max(300, total_duration * 10))
+            self.last_run_stats = {
+                'mode': 'single_pass',
+                'segments': len(segments),
+                'rendered': len(segments),
+                'reused': 0,
+                'elapsed_seconds': round(time.monotonic() - started, 2)
+            }
+            logger.info(f"Rendered {len(segments)} segments in one pass: {output_path}")
+            return output_path
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr.decode('utf-8', 'replace').strip().splitlines()
+            logger.error(f"Single-pass render failed: {stderr[-1] if stderr else e}")
+        except Exception as e:
+            logger.error(f"Single-pass render failed: {e}")
+        return None
+
+    def default_output_path(self, script: VideoScript) -> str:
+        """Output path derived from the script title"""
+        output_dir = self.config['paths']['output_videos']
+        os.makedirs(output_dir, exist_ok=True)
+        safe_title = "".join(c for c in script.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        safe_title = safe_title.replace(' ', '_')
+        # Profiles like preview write alongside the final video, not over it
+        suffix = self.config['video'].get('output_suffix', '')
+        return os.path.join(output_dir, f'{safe_title}{suffix}.mp4')
+
+    def plan_assembly(self, segments: List[VideoSegment], output_path: str, mode: str) -> Dict:
+        """
+        Work out what a build of output_path would render
+
+        Each segment is fingerprinted and compared with the manifest of the
+        previous build. When nothing changed and the output exists, the plan
+        is up to date, whichever mode built it. Otherwise multi-pass renders
+        only segments missing from the segment cache. Single-pass renders
+        everything in one graph, so when the cache already holds some of the
+        segments the plan switches to multi-pass and reuses them.
+        """
+        settings = render_settings(self.config)
+        previous = load_manifest(output_path)
+        previous_segments = {entry['order']: entry for entry in previous.get('segments', [])}
+
+        entries = []
+        for index, segment in enumerate(segments):
+            inputs = segment_inputs(segment)
+            entry = {
+                'index': index,
+                'order': segment.order,
+                'fingerprint': fingerprint(inputs, settings),
+                'inputs': inputs
+            }
+            prior = previous_segments.get(segment.order)
+            if not prior:
+                entry['reason'] = 'new segment'
+            elif prior.get('degraded'):
+                entry['reason'] = 'degraded last build'
+            elif prior['fingerprint'] == entry['fingerprint']:
+                entry['reason'] = 'unchanged'
+            else:
+                changed = [key for key in inputs if inputs[key] != prior.get('inputs', {}).get(key)]
+                entry['reason'] = 'changed: ' + (', '.join(changed) or 'render settings')
+            entries.append(entry)
+
+        # Degraded segments are recorded without a fingerprint, so a build
+        # that dropped an overlay or music is never up to date
+        up_to_date = (
+            os.path.exists(output_path)
+            and [entry['fingerprint'] for entry in entries] ==
+                [entry.get('fingerprint') for entry in previous.get('segments', [])]
+        )
+
+        cached = {
+            entry['fingerprint'] for entry in entries
+            if not up_to_date and self.segment_cache and self.segment_cache.contains(entry['fingerprint'])
+        }
+        if mode == 'single_pass' and cached:
+            reusable = sum(1 for entry in entries if entry['fingerprint'] in cached)
+            logger.info(f"{reusable} of {len(entries)} segments are cached; assembling multi-pass to reuse them")
+            mode = 'multi_pass'
+
+        for entry in entries:
+            if up_to_date:
+                entry['action'] = 'keep'
+            elif entry['fingerprint'] in cached:
+                entry['action'] = 'reuse'
+            else:
+                entry['action'] = 'render'
+
+        return {
+            'output': output_path,
+            'manifest': manifest_path(output_path),
+            'mode': mode,
+            'up_to_date': up_to_date,
+            'settings': settings,
+            'segments': entries
+        }
+
+    def plan_from_script(
+        self,
+        script: VideoScript,
+        voiceover_results: List[Dict],
+        music_results: List[Dict],
+        output_path: Optional[str] = None,
+        mode: Optional[str] = None
+    ) -> Dict:
+        """Dry run of assemble_from_script: the plan, with nothing rendered"""
+        output_path = output_path or self.default_output_path(script)
+        mode = mode or self.config['video'].get('assembly_mode', DEFAULT_ASSEMBLY_MODE)
+        segments = self.build_segments(script, voiceover_results, music_results)
+        return self.plan_assembly(segments, output_path, mode)
+
+    def assemble_from_script(
+        self,
+        script: VideoScript,
+        voiceover_results: List[Dict],
+        music_results: List[Dict],
+        output_path: Optional[str] = None,
+        mode: Optional[str] = None
+    ) -> str:
+        """
+        Assemble a complete video from a script
+
+        Args:
+            script: Parsed VideoScript object
+            voiceover_results: List of voiceover generation results
+            music_results: List of music generation results
+            output_path: Output video path
+            mode: 'single_pass' or 'multi_pass' (default from config)
+
+        Returns:
+            Path to assembled video
+        """
+        output_path = output_path or self.default_output_path(script)
+        mode = mode or self.config['video'].get('assembly_mode', DEFAULT_ASSEMBLY_MODE)
+        logger.info(f"Assembling video ({mode}): {script.title}")
+
+        segments = self.build_segments(script, voiceover_results, music_results)
+        plan = self.plan_assembly(segments, output_path, mode)
+        mode = plan['mode']
+        if plan['up_to_date']:
+            logger.info(f"Video is up to date: {output_path}")
+            self.last_run_stats = {
+                'mode': mode,
+                'segments': len(segments),
+                'rendered': 0,
+                'reused': len(segments),
+                'elapsed_seconds': 0.0
+            }
+            return output_path
+
+        fingerprints = [entry['fingerprint'] for entry in plan['segments']]
+        final_video = None
+        if mode == 'single_pass':
+            final_video = self.assemble_single_pass(segments, output_path)
+            if not final_video:
+                logger.warning("Falling back to multi-pass assembly")
+        if not final_video:
+            final_video = self.assemble_multi_pass(segments, output_path, fingerprints=fingerprints)
+
+        if final_video:
+            built_mode = self.last_run_stats.get('mode', mode)
+            write_manifest(output_path, {
+                'title': script.title,
+                'output': output_path,
+                'mode': built_mode,
+                'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'settings': plan['settings'],
+                'segments': [manifest_entry(entry, segments[entry['index']]) for entry in plan['segments']],
+                'stats': self.last_run_stats
+            })
+            logger.info(f"Video assembly complete: {output_path}")
+        return final_video
+
+
+def manifest_entry(entry: Dict, segment: VideoSegment) -> Dict:
+    """Manifest record of a planned segment after it was built"""
+    record = {key: entry[key] for key in ('index', 'order', 'fingerprint', 'inputs', 'reason')}
+    if segment.degraded:
+        # Rendered without its overlay or music: the next build renders it again
+        record['fingerprint'] = None
+        record['degraded'] = True
+    return record
+
 
 def main():
     """Command-line interface for video assembly"""
@@ -464,6 +926,11 @@ def main():
     parser.add_argument('music_json', help='JSON file with music results')
     parser.add_argument('-o', '--output', help='Output video path')
     parser.add_argument('-s', '--script', help='Script ID to process (e.g., D, E, F)')
+    parser.add_argument('-m', '--mode', choices=['single_pass', 'multi_pass'],
+                        help='Assembly mode (default from config)')
+    parser.add_argument('-p', '--profile', help='Render profile, e.g. preview, final, archival (default from config)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='List the segments that would be rendered, then exit')
     parser.add_argument('-c', '--config', help='Config file path', default='config.yaml')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
 
@@ -492,7 +959,11 @@ def main():
         return
 
     # Assemble videos
-    assembler = VideoAssembler(config_path=args.config)
+    try:
+        assembler = VideoAssembler(config_path=args.config, profile=args.profile)
+    except ValueError as e:
+        logger.error(str(e))
+        return
 
     for script in scripts:
         logger.info(f"\n{'='*60}")
@@ -500,11 +971,23 @@ def main():
         logger.info(f"{'='*60}")
 
         output_path = args.output
+
+        if args.dry_run:
+            plan = assembler.plan_from_script(script, voiceover_results, music_results, output_path, mode=args.mode)
+            status = 'up to date' if plan['up_to_date'] else f"{plan['mode']} build"
+            print(f"\n{plan['output']} ({status})")
+            for entry in plan['segments']:
+                text = entry['inputs']['text_overlay'] or ''
+                print(f"  {entry['action']:<7} #{entry['order']:<3} {entry['inputs']['duration']:6.2f}s  "
+                      f"{entry['reason']:<28} {text[:40]!r}")
+            continue
+
         video_path = assembler.assemble_from_script(
             script,
             voiceover_results,
             music_results,
-            output_path
+            output_path,
+            mode=args.mode
         )
 
         if video_path:
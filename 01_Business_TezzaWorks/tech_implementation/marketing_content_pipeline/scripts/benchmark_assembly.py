@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Assembly Benchmark
+Assembles a script from placeholder audio three ways (segment by segment on
+one worker, segment by segment on the worker pool, and as one filter graph),
+and compares wall time, FFmpeg processes spawned and the resulting files
+(duration, streams, size). No API keys are needed: narrations are sine tones
+about as long as the lines would take to read, and music cues are low tones.
+
+    python3 scripts/benchmark_assembly.py input_scripts/business_video_scripts.md -s D
+"""
+
+import os
+import time
+import tempfile
+import subprocess
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from parse_script import ScriptParser, VideoScript
+from assemble_video import VideoAssembler
+
+logger = logging.getLogger(__name__)
+
+# Roughly how fast a narrator reads
+WORDS_PER_SECOND = 2.5
+MUSIC_DURATION = 30
+
+
+@contextmanager
+def count_ffmpeg_runs():
+    """Count subprocess.run calls made while the block runs"""
+    calls = {'count': 0}
+    original_run = subprocess.run
+
+    def counting_run(*args, **kwargs):
+        calls['count'] += 1
+        return original_run(*args, **kwargs)
+
+    subprocess.run = counting_run
+    try:
+        yield calls
+    finally:
+        subprocess.run = original_run
+
+
+def make_tone(path: str, duration: float, frequency: int):
+    """Write a sine tone MP3 to stand in for generated audio"""
+    cmd = [
+        'ffmpeg', '-v', 'error',
+        '-f', 'lavfi', '-i', f'sine=frequency={frequency}:duration={duration:.2f}',
+        '-ac', '2', '-y', path
+    ]
+    subprocess.run(cmd, check=True, capture_output=True, timeout=60)
+
+
+def probe_streams(path: str) -> str:
+    """Stream types in a rendered file, e.g. 'video+audio'"""
+    cmd = ['ffprobe', '-v', 'error', '-show_entries', 'stream=codec_type', '-of', 'csv=p=0', path]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+    return '+'.join(result.stdout.split()) or 'none'
+
+
+def make_placeholder_assets(script: VideoScript, asset_dir: str) -> Tuple[List[Dict], List[Dict]]:
+    """Placeholder voiceover and music results shaped like the generators' output"""
+    voiceover_results = []
+    for narration in script.get_narrations():
+        duration = max(1.5, len(narration.content.split()) / WORDS_PER_SECOND)
+        path = os.path.join(asset_dir, f'voiceover_{narration.order:03d}.mp3')
+        make_tone(path, duration, 440)
+        voiceover_results.append({'order': narration.order, 'audio_path': path, 'duration': duration})
+
+    music_results = []
+    for cue in script.get_audio_cues():
+        path = os.path.join(asset_dir, f'music_{cue.order:03d}.mp3')
+        make_tone(path, MUSIC_DURATION, 220)
+        music_results.append({'order': cue.order, 'audio_path': path})
+
+    return voiceover_results, music_results
+
+
+def run_benchmark(script_file: str, script_id: str, config_path: str, workers: int = None, profile: str = None):
+    """Time sequential and parallel multi-pass against single-pass assembly of each script"""
+    scripts = ScriptParser().parse_multiple_scripts(script_file)
+    if script_id:
+        scripts = [s for s in scripts if script_id in s.title]
+    if not scripts:
+        print("No scripts found to process")
+        return
+
+    for script in scripts:
+        with tempfile.TemporaryDirectory() as work_dir:
+            voiceover_results, music_results = make_placeholder_assets(script, work_dir)
+
+            results = {}
+            for mode in ('sequential', 'parallel', 'single_pass'):
+                assembler = VideoAssembler(config_path=config_path, profile=profile)
+                assembler.config['paths']['temp'] = os.path.join(work_dir, f'temp_{mode}')
+                segments = assembler.build_segments(script, voiceover_results, music_results)
+                output_path = os.path.join(work_dir, f'{mode}.mp4')
+                pool_size = workers or assembler.render_workers()
+
+                with count_ffmpeg_runs() as calls:
+                    started = time.monotonic()
+                    if mode == 'single_pass':
+                        video_path = assembler.assemble_single_pass(segments, output_path)
+                    else:
+                        video_path = assembler.assemble_multi_pass(
+                            segments, output_path, max_workers=1 if mode == 'sequential' else pool_size
+                        )
+                    elapsed = time.monotonic() - started
+
+                results[mode] = {
+                    'seconds': elapsed,
+                    'processes': calls['count'],
+                    'duration': assembler.get_audio_duration(video_path) if video_path else 0.0,
+                    'size': os.path.getsize(video_path) if video_path else 0,
+                    'streams': probe_streams(video_path) if video_path else 'none'
+                }
+
+        expected = sum(segment.duration for segment in segments)
+        print(f"\n{script.title}: {len(segments)} segments, {expected:.1f}s of timeline "
+              f"({assembler.profile or 'default'} profile)")
+        labels = (
+            ('sequential', 'Multi-pass, 1 worker:'),
+            ('parallel', f"Multi-pass, {pool_size} workers:"),
+            ('single_pass', 'Single-pass:')
+        )
+        for mode, label in labels:
+            result = results[mode]
+            speedup = results['sequential']['seconds'] / result['seconds'] if result['seconds'] else 0
+            print(f"  {label:<24} {result['seconds']:6.2f}s ({speedup:.1f}x), {result['processes']:3d} ffmpeg runs, "
+                  f"{result['duration']:.2f}s {result['streams']} output, {result['size'] / 1024:.0f} KB")
+
+
+def main():
+    """Command-line interface for the assembly benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare sequential, parallel and single-pass video assembly')
+    parser.add_argument('script_file', help='Input markdown script file')
+    parser.add_argument('-s', '--script', help='Script ID to benchmark (e.g., D, E, F)')
+    parser.add_argument('-w', '--workers', type=int, help='Parallel render workers (default from config)')
+    parser.add_argument('-p', '--profile', help='Render profile (default from config)')
+    parser.add_argument('-c', '--config', help='Config file path', default='config.yaml')
+
+    args = parser.parse_args()
+    run_benchmark(args.script_file, args.script, args.config, args.workers, args.profile)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,16 +6,28 @@ Integrates with Suno API to generate background music from audio cues.
 
 import os
 import sys
+import math
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
 from dotenv import load_dotenv
 import yaml
 import time
-import requests
+import asyncio
+import shutil
+import tempfile
 import json
 
+try:
+    import httpx
+except ImportError:
+    print("Warning: httpx package not installed. Install with: pip install httpx")
+    httpx = None
+
 from parse_script import ScriptParser, VideoScript, Audio
+from rate_limit import TokenBucket, call_with_retries_async
+from music_library import MusicLibrary
+from media_probe import MediaProbe
 
 # Load environment variables
 load_dotenv()
@@ -38,7 +50,19 @@ class MusicGenerator:
         if not self.api_key:
             logger.warning("SUNO_API_KEY not found in environment variables")
 
-        self.api_base_url = "https://api.suno.ai/v1"  # Example URL - adjust as needed
+        # Example URL - adjust as needed; SUNO_API_BASE_URL points the client at
+        # another endpoint, e.g. scripts/mock_music_server.py
+        self.api_base_url = os.getenv('SUNO_API_BASE_URL') or \
+            self.config['suno'].get('api_base_url', 'https://api.suno.ai/v1')
+
+        # All cues are generated concurrently, bounded by max_concurrent jobs
+        self.concurrency = self.config['suno'].get('concurrency', {})
+        self.polling = self.config['suno'].get('polling', {})
+        self.limiter = TokenBucket.from_config(self.concurrency.get('rate_limit', {}))
+
+        # Previously generated tracks, reused across cues and scripts
+        self.library = MusicLibrary.from_config(self.config)
+        self.last_run_stats: Dict = {}
 
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from YAML file"""
@@ -59,10 +83,23 @@ class MusicGenerator:
                         'sad_trombone': 'sad trombone sound effect',
                         'generic_corporate': 'generic corporate music'
                     },
-                    'output_format': 'mp3'
+                    'output_format': 'mp3',
+                    'concurrency': {
+                        'max_concurrent': 4,
+                        'max_retries': 3,
+                        'rate_limit': {'requests_per_second': 1, 'burst': 4}
+                    },
+                    'polling': {
+                        'initial_interval': 2,
+                        'max_interval': 15,
+                        'backoff': 1.5,
+                        'timeout': 300
+                    },
+                    'library': {'enabled': True, 'cost_per_generation': 0.0}
                 },
                 'paths': {
-                    'assets_music': 'assets/music'
+                    'assets_music': 'assets/music',
+                    'music_library': 'assets/music_library'
                 }
             }
 
@@ -125,70 +162,97 @@ class MusicGenerator:
         Returns:
             Path to the generated audio file
         """
-        if not self.api_key:
+        return asyncio.run(self._generate_batch([
+            {'prompt': prompt, 'duration': duration, 'output_path': output_path}
+        ]))[0][0]
+
+    async def _generate_batch(self, jobs: List[Dict]) -> List[Tuple[Optional[str], bool]]:
+        """
+        Generate several tracks at once on one event loop
+
+        Every job is submitted, polled and downloaded concurrently through one
+        pooled HTTP client; a semaphore bounds how many generations are in
+        flight.
+
+        Returns:
+            (output path, whether it holds real generated music rather than a
+            mock placeholder) for each job, in job order
+        """
+        if not self.api_key or not httpx:
             logger.warning("No API key available, generating mock music")
-            return self._generate_mock_music(prompt, output_path)
+            return [(self._generate_mock_music(job['prompt'], job['output_path']), False) for job in jobs]
 
-        try:
-            logger.info(f"Generating music: {prompt[:50]}...")
+        max_concurrent = max(1, self.concurrency.get('max_concurrent', 4))
+        semaphore = asyncio.Semaphore(max_concurrent)
+        limits = httpx.Limits(max_connections=max_concurrent * 2, max_keepalive_connections=max_concurrent)
 
-            # Note: Suno API is hypothetical - adjust based on actual API
-            # This is a template implementation
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
+        async with httpx.AsyncClient(base_url=self.api_base_url, limits=limits, timeout=120) as client:
+            return await asyncio.gather(*(self._generate_one(client, semaphore, job) for job in jobs))
 
-            payload = {
-                'prompt': prompt,
-                'duration': duration,
-                'format': self.config['suno']['output_format']
-            }
+    async def _generate_one(self, client, semaphore: asyncio.Semaphore, job: Dict) -> Tuple[Optional[str], bool]:
+        """Submit one generation, wait for it and download the result"""
+        prompt, output_path = job['prompt'], job['output_path']
+        headers = {'Authorization': f'Bearer {self.api_key}'}
 
-            # Make API request
-            response = requests.post(
-                f"{self.api_base_url}/generate",
-                headers=headers,
-                json=payload,
-                timeout=120
-            )
+        async with semaphore:
+            try:
+                logger.info(f"Generating music: {prompt[:50]}...")
+
+                # Note: Suno API is hypothetical - adjust based on actual API
+                # This is a template implementation
+                payload = {
+                    'prompt': prompt,
+                    'duration': job['duration'],
+                    'format': self.config['suno']['output_format']
+                }
 
-            if response.status_code == 200:
-                result = response.json()
+                async def submit():
+                    response = await client.post('/generate', headers=headers, json=payload)
+                    response.raise_for_status()
+                    return response.json()
+
+                result = await call_with_retries_async(
+                    submit,
+                    limiter=self.limiter,
+                    max_retries=self.concurrency.get('max_retries', 3),
+                    backoff_base=self.concurrency.get('backoff_base', 1.0),
+                    backoff_max=self.concurrency.get('backoff_max', 30.0)
+                )
 
                 # Check if we need to poll for completion
                 if 'job_id' in result:
-                    audio_url = self._poll_generation(result['job_id'])
+                    audio_url = await self._poll_generation(client, result['job_id'], headers)
                 else:
                     audio_url = result.get('audio_url')
 
                 if audio_url and output_path:
-                    # Download the audio file
-                    self._download_audio(audio_url, output_path)
+                    await self._download_audio(client, audio_url, output_path)
                     logger.info(f"Saved music to: {output_path}")
-                    return output_path
+                    return output_path, True
+                return None, False
 
-            else:
-                logger.error(f"API error: {response.status_code} - {response.text}")
-                return self._generate_mock_music(prompt, output_path)
+            except Exception as e:
+                logger.error(f"Error generating music: {e}")
+                return self._generate_mock_music(prompt, output_path), False
 
-        except Exception as e:
-            logger.error(f"Error generating music: {e}")
-            return self._generate_mock_music(prompt, output_path)
+    async def _poll_generation(self, client, job_id: str, headers: Dict) -> Optional[str]:
+        """
+        Poll for generation completion
 
-    def _poll_generation(self, job_id: str, max_attempts: int = 30) -> Optional[str]:
-        """Poll for generation completion"""
-        headers = {
-            'Authorization': f'Bearer {self.api_key}'
-        }
+        The interval starts short and grows by `backoff` up to `max_interval`,
+        so quick jobs finish fast without hammering the API on slow ones. A
+        Retry-After header from the API takes precedence.
+        """
+        interval = self.polling.get('initial_interval', 2)
+        max_interval = self.polling.get('max_interval', 15)
+        deadline = time.monotonic() + self.polling.get('timeout', 300)
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(interval)
+            next_interval = min(max_interval, interval * self.polling.get('backoff', 1.5))
 
-        for attempt in range(max_attempts):
             try:
-                response = requests.get(
-                    f"{self.api_base_url}/status/{job_id}",
-                    headers=headers,
-                    timeout=30
-                )
+                response = await client.get(f'/status/{job_id}', headers=headers, timeout=30)
 
                 if response.status_code == 200:
                     result = response.json()
@@ -200,23 +264,34 @@ class MusicGenerator:
                         logger.error(f"Generation failed: {result.get('error')}")
                         return None
 
-                time.sleep(2)  # Wait 2 seconds between polls
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    next_interval = float(retry_after)
 
             except Exception as e:
                 logger.error(f"Error polling status: {e}")
 
+            interval = next_interval
+
         logger.error("Generation timed out")
         return None
 
-    def _download_audio(self, url: str, output_path: str):
-        """Download audio file from URL"""
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
+    async def _download_audio(self, client, url: str, output_path: str):
+        """Stream an audio file to disk, renaming it into place once complete"""
+        output_dir = os.path.dirname(output_path) or '.'
+        os.makedirs(output_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                async with client.stream('GET', url, timeout=60) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        f.write(chunk)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def _generate_mock_music(self, prompt: str, output_path: Optional[str]) -> Optional[str]:
         """Generate a mock music file for testing"""
@@ -229,10 +304,39 @@ class MusicGenerator:
             return output_path
         return None
 
+    def cue_durations(self, script: VideoScript, voiceover_results: Optional[List[Dict]] = None) -> Dict[int, int]:
+        """
+        Seconds of music each audio cue needs, keyed by cue order
+
+        A cue's music plays under every segment from the cue to the next one
+        (VideoScript.music_spans). Narration segments last as long as their
+        voiceover, measured here unless the result already carries a duration,
+        and every other segment lasts one scene. Durations are rounded up to
+        whole seconds for the API; assembly trims the track to the segments.
+        """
+        scene_duration = self.config.get('video', {}).get('default_scene_duration') or \
+            self.config['suno']['default_duration']
+
+        voiceovers = [result for result in voiceover_results or [] if result.get('audio_path')]
+        unmeasured = [result['audio_path'] for result in voiceovers if not result.get('duration')]
+        measured = MediaProbe.from_config(self.config).durations(unmeasured) if unmeasured else {}
+        narration_durations = {}
+        for result in voiceovers:
+            duration = result.get('duration') or measured.get(result['audio_path'])
+            if duration:
+                narration_durations[result['order']] = duration
+
+        return {
+            order: max(1, math.ceil(sum(narration_durations.get(element.order, scene_duration)
+                                        for element in elements)))
+            for order, elements in script.music_spans().items()
+        }
+
     def generate_from_script(
         self,
         script: VideoScript,
-        output_dir: Optional[str] = None
+        output_dir: Optional[str] = None,
+        voiceover_results: Optional[List[Dict]] = None
     ) -> List[Dict]:
         """
         Generate all music tracks from a video script
@@ -240,58 +344,144 @@ class MusicGenerator:
         Args:
             script: Parsed VideoScript object
             output_dir: Directory to save music files
+            voiceover_results: The script's voiceover results, used to size cues
 
         Returns:
             List of dictionaries with music information
         """
+        return self.generate_from_scripts([script], output_dir, [voiceover_results])[0]
+
+    def generate_from_scripts(
+        self,
+        scripts: List[VideoScript],
+        output_dir: Optional[str] = None,
+        voiceover_results: Optional[List[Optional[List[Dict]]]] = None
+    ) -> List[List[Dict]]:
+        """
+        Generate the music tracks for several scripts in one concurrent batch
+
+        Args:
+            scripts: Parsed VideoScript objects
+            output_dir: Directory to save music files
+            voiceover_results: Voiceover results per script, in script order
+
+        Returns:
+            One list of music result dictionaries per script, in script order
+        """
         if not output_dir:
             output_dir = self.config['paths']['assets_music']
 
         os.makedirs(output_dir, exist_ok=True)
 
-        audio_cues = script.get_audio_cues()
-        logger.info(f"Generating {len(audio_cues)} music tracks for: {script.title}")
+        voiceover_results = voiceover_results or [None] * len(scripts)
+        all_results = []
+        jobs = []
 
-        results = []
-        default_duration = self.config['suno']['default_duration']
+        for script, script_voiceovers in zip(scripts, voiceover_results):
+            durations = self.cue_durations(script, script_voiceovers)
+            audio_cues = script.get_audio_cues()
+            logger.info(f"Generating {len(audio_cues)} music tracks for: {script.title}")
 
-        for i, audio_cue in enumerate(audio_cues, 1):
-            # Generate filename
             safe_title = "".join(c for c in script.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
             safe_title = safe_title.replace(' ', '_')
-            filename = f"{safe_title}_music_{i:02d}.mp3"
-            output_path = os.path.join(output_dir, filename)
-
-            # Generate prompt
-            prompt = self.get_music_prompt(audio_cue.style, audio_cue.content)
-
-            # Generate music
-            logger.info(f"Processing music track {i}/{len(audio_cues)}")
-            logger.info(f"Style: {audio_cue.style}")
-            logger.info(f"Prompt: {prompt}")
-
-            audio_path = self.generate_music(
-                prompt=prompt,
-                duration=default_duration,
-                output_path=output_path
-            )
-
-            result = {
-                'order': audio_cue.order,
-                'description': audio_cue.content,
-                'style': audio_cue.style,
-                'prompt': prompt,
-                'audio_path': audio_path,
-                'filename': filename
-            }
-            results.append(result)
 
-            # Rate limiting
-            if i < len(audio_cues):
-                time.sleep(1)
+            results = []
+            for i, audio_cue in enumerate(audio_cues, 1):
+                filename = f"{safe_title}_music_{i:02d}.mp3"
+                output_path = os.path.join(output_dir, filename)
+
+                # Generate prompt
+                prompt = self.get_music_prompt(audio_cue.style, audio_cue.content)
+                logger.info(f"Track {i}/{len(audio_cues)} - style: {audio_cue.style}, prompt: {prompt}")
+
+                results.append({
+                    'order': audio_cue.order,
+                    'description': audio_cue.content,
+                    'style': audio_cue.style,
+                    'prompt': prompt,
+                    'duration': durations[audio_cue.order],
+                    'audio_path': None,
+                    'filename': filename
+                })
+                jobs.append({
+                    'style': audio_cue.style,
+                    'prompt': prompt,
+                    'duration': durations[audio_cue.order],
+                    'output_path': output_path
+                })
+            all_results.append(results)
+
+        started = time.monotonic()
+        if self.library:
+            outcomes = self._generate_with_library(jobs)
+        else:
+            outcomes = [(path, False) for path, _ in asyncio.run(self._generate_batch(jobs))] if jobs else []
+
+        flat_results = [result for results in all_results for result in results]
+        for result, (audio_path, reused) in zip(flat_results, outcomes):
+            result['audio_path'] = audio_path
+            result['reused'] = reused
+
+        reused = [job for job, (_, was_reused) in zip(jobs, outcomes) if was_reused]
+        cost_per_generation = self.config['suno'].get('library', {}).get('cost_per_generation', 0.0)
+        self.last_run_stats = {
+            'tracks': len(jobs),
+            'generated': len(jobs) - len(reused),
+            'reused': len(reused),
+            'seconds_reused': sum(job['duration'] for job in reused),
+            'estimated_savings': round(len(reused) * cost_per_generation, 2),
+            'elapsed_seconds': round(time.monotonic() - started, 2)
+        }
+        logger.info(f"Generated {len(jobs)} music tracks in {self.last_run_stats['elapsed_seconds']}s "
+                    f"({len(reused)} reused from the library)")
+        return all_results
+
+    def _generate_with_library(self, jobs: List[Dict]) -> List[Tuple[Optional[str], bool]]:
+        """
+        Serve cues from the music library, generating only what it lacks
+
+        Cues sharing a style and normalized prompt are generated once, at the
+        longest duration any of them needs, then all served from the library.
 
-        logger.info(f"Generated {len(results)} music tracks")
-        return results
+        Returns:
+            (output path, whether it was reused rather than generated) per job
+        """
+        outcomes: List[Tuple[Optional[str], bool]] = [(None, False)] * len(jobs)
+        pending: Dict[str, List[int]] = {}
+
+        for i, job in enumerate(jobs):
+            if self.library.fetch(job['style'], job['prompt'], job['duration'], job['output_path']):
+                logger.info(f"Reused library track for: {job['prompt'][:50]}")
+                outcomes[i] = (job['output_path'], True)
+            else:
+                pending.setdefault(self.library.group_key(job['style'], job['prompt']), []).append(i)
+
+        if not pending:
+            return outcomes
+
+        groups = []
+        for indices in pending.values():
+            longest = max(indices, key=lambda i: jobs[i]['duration'])
+            groups.append((indices, longest, dict(jobs[longest], output_path=self.library.staging_path())))
+
+        generated = asyncio.run(self._generate_batch([job for _, _, job in groups]))
+
+        for (indices, longest, job), (path, real) in zip(groups, generated):
+            if real:
+                self.library.add(job['style'], job['prompt'], job['duration'], path)
+            for i in indices:
+                output_path = jobs[i]['output_path']
+                if real:
+                    self.library.fetch(jobs[i]['style'], jobs[i]['prompt'], jobs[i]['duration'], output_path)
+                elif path:
+                    shutil.copyfile(path, output_path)
+                else:
+                    output_path = None
+                outcomes[i] = (output_path, real and i != longest)
+            if not real and path and os.path.exists(path):
+                os.remove(path)
+
+        return outcomes
 
 
 def main():
@@ -303,6 +493,7 @@ def main():
     parser.add_argument('-o', '--output-dir', help='Output directory for music',
                         default='assets/music')
     parser.add_argument('-s', '--script', help='Script ID to process (e.g., D, E, F)')
+    parser.add_argument('-r', '--voiceovers', help='JSON file with voiceover results, used to size cues')
     parser.add_argument('-c', '--config', help='Config file path', default='config.yaml')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
 
@@ -326,18 +517,24 @@ def main():
         logger.error("No scripts found to process")
         return
 
-    # Generate music for each script
-    for script in scripts:
-        logger.info(f"\n{'='*60}")
-        logger.info(f"Processing: {script.title}")
-        logger.info(f"{'='*60}")
+    voiceover_results = None
+    if args.voiceovers:
+        with open(args.voiceovers, 'r') as f:
+            voiceover_results = json.load(f)
 
-        results = generator.generate_from_script(script, args.output_dir)
+    # Generate music for every script in one concurrent batch
+    all_results = generator.generate_from_scripts(scripts, args.output_dir,
+                                                  [voiceover_results] * len(scripts))
 
+    for script, results in zip(scripts, all_results):
         # Print summary
         print(f"\nGenerated {len(results)} music tracks for: {script.title}")
         for result in results:
-            print(f"  - {result['filename']} ({result['style']})")
+            print(f"  - {result['filename']} ({result['style']}){' (reused)' if result['reused'] else ''}")
+
+    stats = generator.last_run_stats
+    print(f"\nReused {stats['reused']} of {stats['tracks']} tracks from the music library "
+          f"({stats['seconds_reused']}s of audio, est. savings ${stats['estimated_savings']:.2f})")
 
 
 if __name__ == '__main__':
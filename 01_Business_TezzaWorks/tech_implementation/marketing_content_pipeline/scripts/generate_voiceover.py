@@ -7,20 +7,25 @@ Integrates with ElevenLabs API to generate voiceovers from narrator text.
 import os
 import sys
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import yaml
 import time
+import tempfile
 
 # Try to import ElevenLabs client
 try:
-    from elevenlabs import ElevenLabs, Voice, VoiceSettings
+    from elevenlabs import VoiceSettings
+    from elevenlabs.client import ElevenLabs
 except ImportError:
     print("Warning: elevenlabs package not installed. Install with: pip install elevenlabs")
     ElevenLabs = None
 
 from parse_script import ScriptParser, VideoScript, Narrator
+from rate_limit import TokenBucket, call_with_retries
+from tts_cache import TTSCache
 
 # Load environment variables
 load_dotenv()
@@ -43,9 +48,11 @@ class VoiceoverGenerator:
         if not self.api_key:
             logger.warning("ELEVENLABS_API_KEY not found in environment variables")
 
-        # Initialize ElevenLabs client
+        # Initialize ElevenLabs client (ELEVENLABS_BASE_URL points it at another
+        # endpoint, e.g. scripts/mock_tts_server.py)
+        base_url = os.getenv('ELEVENLABS_BASE_URL') or None
         if ElevenLabs and self.api_key:
-            self.client = ElevenLabs(api_key=self.api_key)
+            self.client = ElevenLabs(api_key=self.api_key, base_url=base_url)
         else:
             self.client = None
             logger.warning("ElevenLabs client not initialized")
@@ -57,6 +64,16 @@ class VoiceoverGenerator:
             style=self.config['elevenlabs']['voice_settings'].get('style', 0.0),
             use_speaker_boost=self.config['elevenlabs']['voice_settings'].get('use_speaker_boost', True)
         ) if ElevenLabs else None
+        self.model_id = self.config['elevenlabs'].get('model_id', 'eleven_multilingual_v2')
+        self.output_format = self.config['elevenlabs'].get('output_format', 'mp3_44100_128')
+
+        # Narrations already synthesized with identical inputs are reused
+        self.cache = TTSCache.from_config(self.config)
+        self.last_run_stats: Dict = {}
+
+        # Concurrency and rate limiting, shared by all worker threads
+        self.concurrency = self.config['elevenlabs'].get('concurrency', {})
+        self.limiter = TokenBucket.from_config(self.concurrency.get('rate_limit', {}))
 
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from YAML file"""
@@ -80,10 +97,18 @@ class VoiceoverGenerator:
                         'style': 0.0,
                         'use_speaker_boost': True
                     },
-                    'output_format': 'mp3_44100_128'
+                    'model_id': 'eleven_multilingual_v2',
+                    'output_format': 'mp3_44100_128',
+                    'cache': {'enabled': True, 'max_size_mb': 500},
+                    'concurrency': {
+                        'max_workers': 4,
+                        'max_retries': 3,
+                        'rate_limit': {'requests_per_second': 2, 'burst': 4}
+                    }
                 },
                 'paths': {
-                    'assets_voiceovers': 'assets/voiceovers'
+                    'assets_voiceovers': 'assets/voiceovers',
+                    'tts_cache': 'assets/cache/tts'
                 }
             }
 
@@ -92,11 +117,32 @@ class VoiceoverGenerator:
         voice_profiles = self.config['elevenlabs']['voice_profiles']
         return voice_profiles.get(voice_type, voice_profiles['narrator'])
 
+    def cache_key(self, text: str, voice_type: str) -> str:
+        """TTS cache key for a narration with the current voice configuration"""
+        return TTSCache.make_key(
+            text,
+            self.get_voice_id(voice_type),
+            self.config['elevenlabs']['voice_settings'],
+            self.model_id,
+            self.output_format
+        )
+
+    def fetch_cached(self, text: str, voice_type: str, output_path: str) -> bool:
+        """Copy a previously synthesized narration to output_path, if cached"""
+        if not self.cache:
+            return False
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        if self.cache.fetch(self.cache_key(text, voice_type), output_path):
+            logger.info(f"Reused cached voiceover: {output_path}")
+            return True
+        return False
+
     def generate_voiceover(
         self,
         text: str,
         voice_type: str = 'narrator',
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        check_cache: bool = True
     ) -> Optional[str]:
         """
         Generate a single voiceover from text
@@ -105,46 +151,79 @@ class VoiceoverGenerator:
             text: The text to convert to speech
             voice_type: Type of voice to use
             output_path: Path to save the audio file
+            check_cache: Reuse a cached narration instead of calling the API
 
         Returns:
             Path to the generated audio file
         """
+        if check_cache and output_path and self.fetch_cached(text, voice_type, output_path):
+            return output_path
+
         if not self.client:
             logger.error("ElevenLabs client not initialized")
             return self._generate_mock_voiceover(text, output_path)
 
+        if not output_path:
+            logger.error("No output path given for voiceover")
+            return None
+
         try:
             voice_id = self.get_voice_id(voice_type)
             logger.info(f"Generating voiceover with voice: {voice_type} ({voice_id})")
 
-            # Generate audio
-            audio_generator = self.client.text_to_speech.convert(
-                voice_id=voice_id,
-                text=text,
-                model_id="eleven_multilingual_v2",
-                voice_settings=self.voice_settings
+            # Stream audio to disk, retrying rate limits and server errors
+            call_with_retries(
+                lambda: self._synthesize_to_file(voice_id, text, output_path),
+                limiter=self.limiter,
+                max_retries=self.concurrency.get('max_retries', 3),
+                backoff_base=self.concurrency.get('backoff_base', 1.0),
+                backoff_max=self.concurrency.get('backoff_max', 30.0)
             )
-
-            # Collect audio data
-            audio_data = b''
-            for chunk in audio_generator:
-                if chunk:
-                    audio_data += chunk
-
-            # Save to file
-            if output_path:
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                with open(output_path, 'wb') as f:
-                    f.write(audio_data)
-                logger.info(f"Saved voiceover to: {output_path}")
-                return output_path
-
-            return None
+            logger.info(f"Saved voiceover to: {output_path}")
+
+            # Only real API output is cached, never mock placeholders
+            if self.cache:
+                self.cache.store(self.cache_key(text, voice_type), output_path, {
+                    'text': text,
+                    'voice_type': voice_type,
+                    'voice_id': voice_id,
+                    'model_id': self.model_id
+                })
+            return output_path
 
         except Exception as e:
             logger.error(f"Error generating voiceover: {e}")
             return self._generate_mock_voiceover(text, output_path)
 
+    def _synthesize_to_file(self, voice_id: str, text: str, output_path: str):
+        """
+        Make one text-to-speech request, streaming the audio to output_path
+
+        Chunks are written as they arrive, so memory use doesn't grow with the
+        narration's length. The file is renamed into place only once the
+        response is complete, so readers never see a partial narration.
+        """
+        output_dir = os.path.dirname(output_path) or '.'
+        os.makedirs(output_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in self.client.text_to_speech.convert(
+                    voice_id=voice_id,
+                    text=text,
+                    model_id=self.model_id,
+                    output_format=self.output_format,
+                    voice_settings=self.voice_settings
+                ):
+                    if chunk:
+                        f.write(chunk)
+            # mkstemp creates owner-only files
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
     def _generate_mock_voiceover(self, text: str, output_path: Optional[str]) -> Optional[str]:
         """Generate a mock voiceover file for testing"""
         if output_path:
@@ -159,41 +238,54 @@ class VoiceoverGenerator:
     def generate_from_script(
         self,
         script: VideoScript,
-        output_dir: Optional[str] = None
+        output_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        on_complete: Optional[Callable[[Dict], Optional[Dict]]] = None
     ) -> List[Dict]:
         """
         Generate all voiceovers from a video script
 
+        Narrations are synthesized concurrently; the shared token bucket keeps
+        the request rate within the configured limit.
+
         Args:
             script: Parsed VideoScript object
             output_dir: Directory to save voiceover files
+            max_workers: Concurrent requests (default from config; 1 = sequential)
+            on_complete: Called on the worker thread with each result as soon as
+                its file is written (e.g. to probe its duration while other
+                narrations are still being synthesized); a returned dict is
+                merged into the result
 
         Returns:
-            List of dictionaries with voiceover information
+            List of dictionaries with voiceover information, sorted by order
         """
         if not output_dir:
             output_dir = self.config['paths']['assets_voiceovers']
+        if not max_workers:
+            max_workers = self.concurrency.get('max_workers', 1)
 
         os.makedirs(output_dir, exist_ok=True)
 
         narrations = script.get_narrations()
-        logger.info(f"Generating {len(narrations)} voiceovers for: {script.title}")
+        logger.info(f"Generating {len(narrations)} voiceovers for: {script.title} "
+                    f"({max_workers} workers)")
 
-        results = []
+        safe_title = "".join(c for c in script.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        safe_title = safe_title.replace(' ', '_')
 
-        for i, narration in enumerate(narrations, 1):
-            # Generate filename
-            safe_title = "".join(c for c in script.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            safe_title = safe_title.replace(' ', '_')
+        def process(numbered):
+            i, narration = numbered
             filename = f"{safe_title}_narration_{i:02d}.mp3"
             output_path = os.path.join(output_dir, filename)
 
-            # Generate voiceover
             logger.info(f"Processing narration {i}/{len(narrations)}")
-            audio_path = self.generate_voiceover(
+            cached = self.fetch_cached(narration.content, narration.voice_type, output_path)
+            audio_path = output_path if cached else self.generate_voiceover(
                 text=narration.content,
                 voice_type=narration.voice_type,
-                output_path=output_path
+                output_path=output_path,
+                check_cache=False
             )
 
             result = {
@@ -201,15 +293,31 @@ class VoiceoverGenerator:
                 'text': narration.content,
                 'voice_type': narration.voice_type,
                 'audio_path': audio_path,
-                'filename': filename
+                'filename': filename,
+                'cached': cached
             }
-            results.append(result)
-
-            # Rate limiting - be nice to the API
-            if i < len(narrations):
-                time.sleep(0.5)
 
-        logger.info(f"Generated {len(results)} voiceovers")
+            if on_complete and audio_path:
+                try:
+                    result.update(on_complete(result) or {})
+                except Exception as e:
+                    logger.error(f"Error post-processing {filename}: {e}")
+            return result
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = list(executor.map(process, enumerate(narrations, 1)))
+        results.sort(key=lambda result: result['order'])
+
+        cache_hits = sum(1 for result in results if result['cached'])
+        self.last_run_stats = {
+            'narrations': len(results),
+            'cache_hits': cache_hits,
+            'synthesized': len(results) - cache_hits,
+            'elapsed_seconds': round(time.monotonic() - started, 2)
+        }
+        logger.info(f"Generated {len(results)} voiceovers in {self.last_run_stats['elapsed_seconds']}s "
+                    f"({cache_hits} from cache)")
         return results
 
     def list_available_voices(self) -> List[Dict]:
@@ -248,6 +356,8 @@ def main():
                         default='assets/voiceovers')
     parser.add_argument('-s', '--script', help='Script ID to process (e.g., D, E, F)')
     parser.add_argument('-c', '--config', help='Config file path', default='config.yaml')
+    parser.add_argument('-w', '--workers', type=int,
+                        help='Concurrent TTS requests (default from config)')
     parser.add_argument('--list-voices', action='store_true',
                         help='List available voices and exit')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
@@ -284,12 +394,13 @@ def main():
         logger.info(f"Processing: {script.title}")
         logger.info(f"{'='*60}")
 
-        results = generator.generate_from_script(script, args.output_dir)
+        results = generator.generate_from_script(script, args.output_dir, max_workers=args.workers)
 
         # Print summary
-        print(f"\nGenerated {len(results)} voiceovers for: {script.title}")
+        print(f"\nGenerated {len(results)} voiceovers for: {script.title} "
+              f"({generator.last_run_stats['cache_hits']} from cache)")
         for result in results:
-            print(f"  - {result['filename']}")
+            print(f"  - {result['filename']}{' (cached)' if result['cached'] else ''}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Media Probe Module
+Durations of media files without an ffprobe process per file. MP3s, which is
+what the voiceover and music generators produce, are measured by reading
+their frame headers; anything else is probed in batches, many files to one
+FFmpeg run. Results are remembered on disk per path, size and modification
+time, so unchanged files are never probed twice.
+
+Probe files from the command line:
+    python3 scripts/media_probe.py assets/voiceovers/*.mp3
+"""
+
+import os
+import re
+import json
+import struct
+import tempfile
+import threading
+import subprocess
+import logging
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Files per FFmpeg run, keeping the command line well inside OS limits
+PROBE_BATCH_SIZE = 50
+
+# Enough of an MP3 after its ID3 tag to hold the first frame's Xing/Info or VBRI header
+MP3_HEAD_BYTES = 4096
+
+# Bitrates in kbps by (MPEG-1?, layer)
+MP3_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# Sample rates by the header's version bits (MPEG-2.5, reserved, MPEG-2, MPEG-1)
+MP3_SAMPLE_RATES = {0: [11025, 12000, 8000], 2: [22050, 24000, 16000], 3: [44100, 48000, 32000]}
+
+INPUT_LINE = re.compile(r"^Input #(\d+), .*, from '(.*)':$")
+DURATION_LINE = re.compile(r'^\s+Duration: (\d+):(\d+):(\d+(?:\.\d+)?)')
+
+
+def _mp3_frame(data: bytes, offset: int) -> Optional[Dict]:
+    """Decode the MPEG audio frame header at offset, or None if there isn't one"""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[offset + 1] >> 3) & 3
+    layer = 4 - ((data[offset + 1] >> 1) & 3)
+    bitrate_index = data[offset + 2] >> 4
+    rate_index = (data[offset + 2] >> 2) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    padding = (data[offset + 2] >> 1) & 1
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if mpeg1 or layer == 2 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+
+    return {
+        'samples': samples,
+        'sample_rate': sample_rate,
+        'length': length,
+        'mpeg1': mpeg1,
+        'mono': data[offset + 3] >> 6 == 3
+    }
+
+
+def mp3_duration(path: str) -> Optional[float]:
+    """
+    Duration of an MP3 read from its headers
+
+    Reads the head of the file and uses the frame count in a Xing/Info or
+    VBRI header when the encoder wrote one. Otherwise it seeks from frame
+    header to frame header, reading four bytes per frame. Returns None for
+    anything that does not parse as MPEG audio.
+    """
+    with open(path, 'rb') as f:
+        offset = 0
+        tag = f.read(10)
+        # Skip an ID3v2 tag: 10-byte header, syncsafe size, optional footer
+        if tag[:3] == b'ID3' and len(tag) == 10:
+            size = (tag[6] << 21) | (tag[7] << 14) | (tag[8] << 7) | tag[9]
+            offset = 10 + size + (10 if tag[5] & 0x10 else 0)
+        f.seek(offset)
+        head = f.read(MP3_HEAD_BYTES)
+
+        first = _mp3_frame(head, 0)
+        if not first:
+            return None
+
+        # Xing/Info sits after the side information; VBRI at a fixed offset
+        side_info = (17 if first['mono'] else 32) if first['mpeg1'] else (9 if first['mono'] else 17)
+        xing = 4 + side_info
+        if head[xing:xing + 4] in (b'Xing', b'Info') and len(head) >= xing + 12:
+            flags = struct.unpack('>I', head[xing + 4:xing + 8])[0]
+            if flags & 1:
+                frames = struct.unpack('>I', head[xing + 8:xing + 12])[0]
+                return frames * first['samples'] / first['sample_rate']
+        vbri = 36
+        if head[vbri:vbri + 4] == b'VBRI' and len(head) >= vbri + 18:
+            frames = struct.unpack('>I', head[vbri + 14:vbri + 18])[0]
+            return frames * first['samples'] / first['sample_rate']
+
+        samples = 0
+        frame = first
+        while frame and frame['length'] > 0:
+            samples += frame['samples']
+            offset += frame['length']
+            f.seek(offset)
+            frame = _mp3_frame(f.read(4), 0)
+    return samples / first['sample_rate']
+
+
+class MediaProbe:
+    """Durations of media files, cached on disk"""
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self.hits = 0
+        self.probed = 0
+        self._lock = threading.Lock()
+        self._cache = self._load_cache()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'MediaProbe':
+        return cls(config.get('paths', {}).get('probe_cache', 'assets/cache/probe.json'))
+
+    def _load_cache(self) -> Dict:
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        cache_dir = os.path.dirname(self.cache_path) or '.'
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._cache, f)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, self.cache_path)
+
+    @staticmethod
+    def _signature(path: str) -> Dict:
+        stat = os.stat(path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def duration(self, path: str) -> Optional[float]:
+        """Duration of one file in seconds, or None if it can't be read"""
+        return self.durations([path]).get(path)
+
+    def durations(self, paths: Iterable[str]) -> Dict[str, Optional[float]]:
+        """
+        Durations of many files in seconds, keyed by the paths given
+
+        Cached results are used while a file's size and mtime are unchanged.
+        MP3s are measured natively and everything else is probed in batches.
+        Missing or unreadable files map to None.
+        """
+        results: Dict[str, Optional[float]] = {}
+        signatures: Dict[str, Dict] = {}
+        pending = []
+
+        for path in dict.fromkeys(paths):
+            if not path or not os.path.exists(path):
+                results[path] = None
+                continue
+            signature = self._signature(path)
+            with self._lock:
+                cached = self._cache.get(os.path.abspath(path))
+            if cached and all(cached.get(key) == value for key, value in signature.items()):
+                results[path] = cached['duration']
+                with self._lock:
+                    self.hits += 1
+                continue
+            signatures[path] = signature
+            pending.append(path)
+
+        to_probe = []
+        for path in pending:
+            value = None
+            if path.lower().endswith('.mp3'):
+                try:
+                    value = mp3_duration(path)
+                except OSError as e:
+                    logger.warning(f"Could not read {path}: {e}")
+            if value is None:
+                to_probe.append(path)
+            else:
+                results[path] = value
+
+        for start in range(0, len(to_probe), PROBE_BATCH_SIZE):
+            results.update(self._probe_batch(to_probe[start:start + PROBE_BATCH_SIZE]))
+
+        if pending:
+            with self._lock:
+                self.probed += len(pending)
+                for path in pending:
+                    if results.get(path) is not None:
+                        self._cache[os.path.abspath(path)] = dict(signatures[path], duration=results[path])
+                self._save_cache()
+        return results
+
+    def _probe_batch(self, paths) -> Dict[str, Optional[float]]:
+        """
+        Durations of several files from one FFmpeg run
+
+        FFmpeg prints a header per input before complaining that there is no
+        output. It stops at the first input it can't open, so whatever is left
+        unread is probed one file at a time with ffprobe.
+        """
+        results: Dict[str, Optional[float]] = {}
+        cmd = ['ffmpeg', '-hide_banner', '-nostdin']
+        for path in paths:
+            cmd.extend(['-i', path])
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30 + 2 * len(paths))
+            current = None
+            for line in result.stderr.splitlines():
+                match = INPUT_LINE.match(line)
+                if match:
+                    current = paths[int(match.group(1))]
+                    continue
+                match = DURATION_LINE.match(line)
+                if match and current:
+                    hours, minutes, seconds = match.groups()
+                    results[current] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+                    current = None
+        except Exception as e:
+            logger.warning(f"Batch probe failed: {e}")
+
+        for path in paths:
+            if path not in results:
+                results[path] = self._ffprobe(path)
+        return results
+
+    @staticmethod
+    def _ffprobe(path: str) -> Optional[float]:
+        try:
+            cmd = [
+                'ffprobe',
+                '-v', 'error',
+                '-show_entries', 'format=duration',
+                '-of', 'default=noprint_wrappers=1:nokey=1',
+                path
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            if result.returncode == 0:
+                return float(result.stdout.strip())
+        except Exception as e:
+            logger.error(f"Error probing {path}: {e}")
+        return None
+
+
+def main():
+    """Command-line interface for probing media durations"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Print media file durations')
+    parser.add_argument('files', nargs='+', help='Media files to probe')
+    parser.add_argument('--cache', default='assets/cache/probe.json', help='Duration cache file')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not update the cache')
+
+    args = parser.parse_args()
+
+    probe = MediaProbe(None if args.no_cache else args.cache)
+    for path, value in probe.durations(args.files).items():
+        print(f"{value:10.3f}s  {path}" if value is not None else f"{'?':>11}  {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Mock Music Server
+Local stand-in for the (hypothetical) Suno generation API: jobs are accepted
+immediately, report `pending` until a simulated render time has passed, then
+point at a downloadable fake MP3.
+
+Serve it and point the generator at it:
+    python3 scripts/mock_music_server.py --port 8766 --render-time 5
+    SUNO_API_KEY=mock SUNO_API_BASE_URL=http://127.0.0.1:8766/v1 \\
+        python3 scripts/generate_music.py input_scripts/business_video_scripts.md
+
+Or compare one-at-a-time and concurrent generation in one go:
+    python3 scripts/mock_music_server.py --benchmark input_scripts/business_video_scripts.md
+"""
+
+import os
+import re
+import json
+import time
+import random
+import tempfile
+import threading
+import itertools
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+STATUS_PATH = re.compile(r'^/v1/status/([^/?]+)$')
+AUDIO_PATH = re.compile(r'^/v1/audio/([^/?]+)\.mp3$')
+
+# An MPEG-1 Layer III frame header (128kbps, 44.1kHz), repeated as the fake audio
+MP3_FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+FRAMES_PER_SECOND = 38
+
+
+class MockMusicServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the simulated generation jobs"""
+
+    daemon_threads = True
+
+    def __init__(self, address, render_time=3.0, error_rate=0.0):
+        super().__init__(address, MockMusicHandler)
+        self.render_time = render_time
+        self.error_rate = error_rate
+        self.jobs = {}
+        self.submitted = 0
+        self.rate_limited = 0
+        self.polls = 0
+        self.downloads = 0
+        self.peak_rendering = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rendering(self):
+        now = time.monotonic()
+        return sum(1 for job in self.jobs.values() if job['ready_at'] > now)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'submitted': self.submitted,
+                'rate_limited': self.rate_limited,
+                'status_polls': self.polls,
+                'downloads': self.downloads,
+                'peak_rendering': self.peak_rendering
+            }
+
+
+class MockMusicHandler(BaseHTTPRequestHandler):
+    """Implements POST /v1/generate, GET /v1/status/<id> and GET /v1/audio/<id>.mp3"""
+
+    def do_POST(self):
+        server = self.server
+        if self.path != '/v1/generate':
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+
+        with server._lock:
+            if random.random() < server.error_rate:
+                server.rate_limited += 1
+                self._send_json(429, {'error': 'Too many requests'})
+                return
+            job_id = f"job{next(server._ids)}"
+            server.jobs[job_id] = {
+                'ready_at': time.monotonic() + server.render_time,
+                'duration': int(body.get('duration', 30))
+            }
+            server.submitted += 1
+            server.peak_rendering = max(server.peak_rendering, server.rendering())
+
+        self._send_json(200, {'job_id': job_id})
+
+    def do_GET(self):
+        server = self.server
+
+        match = STATUS_PATH.match(self.path)
+        if match:
+            with server._lock:
+                server.polls += 1
+                job = server.jobs.get(match.group(1))
+            if not job:
+                self._send_json(404, {'error': 'Unknown job'})
+            elif job['ready_at'] > time.monotonic():
+                self._send_json(200, {'status': 'pending'})
+            else:
+                self._send_json(200, {
+                    'status': 'completed',
+                    'audio_url': f"{server.url}/v1/audio/{match.group(1)}.mp3"
+                })
+            return
+
+        match = AUDIO_PATH.match(self.path)
+        if match and match.group(1) in server.jobs:
+            with server._lock:
+                server.downloads += 1
+            frames = server.jobs[match.group(1)]['duration'] * FRAMES_PER_SECOND
+            self.send_response(200)
+            self.send_header('Content-Type', 'audio/mpeg')
+            self.send_header('Content-Length', str(len(MP3_FRAME) * frames))
+            self.end_headers()
+            for _ in range(frames):
+                self.wfile.write(MP3_FRAME)
+            return
+
+        self._send_json(404, {'error': 'Not found'})
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def start_server(host='127.0.0.1', port=0, render_time=3.0, error_rate=0.0) -> MockMusicServer:
+    """Start a mock server on a background thread (port 0 picks a free port)"""
+    server = MockMusicServer((host, port), render_time=render_time, error_rate=error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_benchmark(script_file, script_id, config_path, render_time, error_rate):
+    """Time one-at-a-time against concurrent generation of every cue in a script file"""
+    from parse_script import ScriptParser
+
+    server = start_server(render_time=render_time, error_rate=error_rate)
+    os.environ['SUNO_API_KEY'] = os.environ.get('SUNO_API_KEY') or 'mock'
+    os.environ['SUNO_API_BASE_URL'] = f"{server.url}/v1"
+
+    from generate_music import MusicGenerator
+
+    scripts = ScriptParser().parse_multiple_scripts(script_file)
+    if script_id:
+        scripts = [s for s in scripts if script_id in s.title]
+    if not scripts:
+        print("No scripts found to process")
+        return
+
+    timings = {}
+    for label in ('one at a time', 'concurrent'):
+        generator = MusicGenerator(config_path=config_path)
+        if label == 'one at a time':
+            generator.concurrency = dict(generator.concurrency, max_concurrent=1)
+        with tempfile.TemporaryDirectory() as output_dir:
+            generator.generate_from_scripts(scripts, output_dir)
+        timings[label] = generator.last_run_stats['elapsed_seconds']
+
+    print(f"\nGenerated {generator.last_run_stats['tracks']} tracks per run "
+          f"({render_time}s render time, {error_rate:.0%} simulated 429s)")
+    print(f"  One at a time: {timings['one at a time']:.2f}s")
+    print(f"  Concurrent:    {timings['concurrent']:.2f}s "
+          f"(max {generator.concurrency.get('max_concurrent', 4)} in flight)")
+    print(f"  Speedup:       {timings['one at a time'] / timings['concurrent']:.1f}x")
+    print(f"  Server:        {server.stats()}")
+    server.shutdown()
+
+
+def main():
+    """Command-line interface for the mock server"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mock Suno music generation server')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8766, help='Port to listen on')
+    parser.add_argument('--render-time', type=float, default=3.0, help='Seconds until a job completes')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of submissions answered with 429 (0.0-1.0)')
+    parser.add_argument('--benchmark', metavar='SCRIPT_FILE',
+                        help='Compare one-at-a-time and concurrent generation, then exit')
+    parser.add_argument('-s', '--script', help='Script ID to benchmark (e.g., D, E, F)')
+    parser.add_argument('-c', '--config', help='Config file path', default='config.yaml')
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.script, args.config, args.render_time, args.error_rate)
+        return
+
+    server = MockMusicServer((args.host, args.port), render_time=args.render_time, error_rate=args.error_rate)
+    print(f"Mock music server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n{server.stats()}")
+
+
+if __name__ == '__main__':
+    main()
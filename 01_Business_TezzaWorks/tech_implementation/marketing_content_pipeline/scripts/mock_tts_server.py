@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Mock TTS Server
+Local stand-in for the ElevenLabs text-to-speech endpoint, with configurable
+latency and rate-limit errors, for exercising the voiceover generator without
+an API key or quota.
+
+Serve it and point the generator at it:
+    python3 scripts/mock_tts_server.py --port 8765 --latency 1.0
+    ELEVENLABS_API_KEY=mock ELEVENLABS_BASE_URL=http://127.0.0.1:8765 \\
+        python3 scripts/generate_voiceover.py input_scripts/business_video_scripts.md -s D
+
+Or compare sequential and concurrent synthesis in one go:
+    python3 scripts/mock_tts_server.py --benchmark input_scripts/business_video_scripts.md -s D
+"""
+
+import os
+import re
+import json
+import time
+import random
+import tempfile
+import threading
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+TTS_PATH = re.compile(r'^/v1/text-to-speech/([^/?]+)')
+
+# An MPEG-1 Layer III frame header (128kbps, 44.1kHz), repeated as the fake audio
+MP3_FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+
+
+class MockTTSServer(ThreadingHTTPServer):
+    """Threaded HTTP server that records what the handler saw"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.5, error_rate=0.0):
+        super().__init__(address, MockTTSHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.rate_limited = 0
+        self.active = 0
+        self.peak_concurrency = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'rate_limited': self.rate_limited,
+                'peak_concurrency': self.peak_concurrency
+            }
+
+
+class MockTTSHandler(BaseHTTPRequestHandler):
+    """Answers POST /v1/text-to-speech/<voice_id> with fake MP3 frames"""
+
+    def do_POST(self):
+        server = self.server
+        if not TTS_PATH.match(self.path):
+            self._send_json(404, {'detail': 'Not found'})
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+
+        with server._lock:
+            server.requests += 1
+            limited = random.random() < server.error_rate
+            if limited:
+                server.rate_limited += 1
+            else:
+                server.active += 1
+                server.peak_concurrency = max(server.peak_concurrency, server.active)
+
+        if limited:
+            self._send_json(429, {'detail': {'status': 'too_many_concurrent_requests'}})
+            return
+
+        try:
+            time.sleep(server.latency)
+            # Roughly one frame per character keeps file size proportional to text
+            audio = MP3_FRAME * max(1, len(body.get('text', '')))
+            self.send_response(200)
+            self.send_header('Content-Type', 'audio/mpeg')
+            self.send_header('Content-Length', str(len(audio)))
+            self.end_headers()
+            self.wfile.write(audio)
+        finally:
+            with server._lock:
+                server.active -= 1
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def start_server(host='127.0.0.1', port=0, latency=0.5, error_rate=0.0) -> MockTTSServer:
+    """Start a mock server on a background thread (port 0 picks a free port)"""
+    server = MockTTSServer((host, port), latency=latency, error_rate=error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_benchmark(script_file, script_id, config_path, workers, latency, error_rate):
+    """Time sequential against concurrent synthesis of a script's narrations"""
+    from parse_script import ScriptParser
+
+    server = start_server(latency=latency, error_rate=error_rate)
+    os.environ['ELEVENLABS_API_KEY'] = os.environ.get('ELEVENLABS_API_KEY') or 'mock'
+    os.environ['ELEVENLABS_BASE_URL'] = server.url
+
+    # Imported after the environment is set so the client targets the mock
+    from generate_voiceover import VoiceoverGenerator
+
+    scripts = ScriptParser().parse_multiple_scripts(script_file)
+    if script_id:
+        scripts = [s for s in scripts if script_id in s.title]
+    if not scripts:
+        print("No scripts found to process")
+        return
+
+    timings = {}
+    for label, max_workers in (('sequential', 1), ('concurrent', workers)):
+        generator = VoiceoverGenerator(config_path=config_path)
+        with tempfile.TemporaryDirectory() as output_dir:
+            started = time.monotonic()
+            narrations = 0
+            for script in scripts:
+                narrations += len(generator.generate_from_script(script, output_dir, max_workers=max_workers))
+            timings[label] = time.monotonic() - started
+
+    workers_label = f"{workers or generator.concurrency.get('max_workers', 1)} workers"
+    print(f"\nSynthesized {narrations} narrations per run ({latency}s latency, "
+          f"{error_rate:.0%} simulated 429s)")
+    print(f"  Sequential: {timings['sequential']:.2f}s")
+    print(f"  Concurrent: {timings['concurrent']:.2f}s ({workers_label})")
+    print(f"  Speedup:    {timings['sequential'] / timings['concurrent']:.1f}x")
+    print(f"  Server:     {server.stats()}")
+    server.shutdown()
+
+
+def main():
+    """Command-line interface for the mock server"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mock ElevenLabs text-to-speech server')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds per request')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with 429 (0.0-1.0)')
+    parser.add_argument('--benchmark', metavar='SCRIPT_FILE',
+                        help='Compare sequential and concurrent synthesis of a script file, then exit')
+    parser.add_argument('-s', '--script', help='Script ID to benchmark (e.g., D, E, F)')
+    parser.add_argument('-w', '--workers', type=int, help='Concurrent workers (default from config)')
+    parser.add_argument('-c', '--config', help='Config file path', default='config.yaml')
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.script, args.config, args.workers,
+                      args.latency, args.error_rate)
+        return
+
+    server = MockTTSServer((args.host, args.port), latency=args.latency, error_rate=args.error_rate)
+    print(f"Mock TTS server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n{server.stats()}")
+
+
+if __name__ == '__main__':
+    main()
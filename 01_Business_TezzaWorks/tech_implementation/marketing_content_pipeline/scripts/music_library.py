@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Music Library Module
+Keeps every generated background track so later cues with the same style and
+prompt reuse it instead of paying for a new generation. A longer track can
+serve a shorter cue: it is trimmed to length with ffmpeg.
+"""
+
+import os
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+LOCK_FILE = '.index.lock'
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Canonical form of a music prompt
+
+    Prompts are comma-separated descriptors built by get_music_prompt, so
+    case, spacing, order and repeats don't change the music asked for.
+    """
+    terms = {term.strip().lower() for term in prompt.split(',')}
+    return ', '.join(sorted(term for term in terms if term))
+
+
+class MusicLibrary:
+    """Generated tracks on disk, indexed by style, normalized prompt and duration"""
+
+    def __init__(self, library_dir: str):
+        self.library_dir = library_dir
+        self.staging_dir = os.path.join(library_dir, '.incoming')
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional['MusicLibrary']:
+        """Build the library described by config, or None when it is disabled"""
+        if not config['suno'].get('library', {}).get('enabled', False):
+            return None
+        return cls(config['paths'].get('music_library', 'assets/music_library'))
+
+    @staticmethod
+    def group_key(style: str, prompt: str) -> str:
+        """Tracks with the same group key are interchangeable apart from length"""
+        return hashlib.sha256(f"{style}|{normalize_prompt(prompt)}".encode('utf-8')).hexdigest()[:24]
+
+    def _load_index(self) -> List[Dict]:
+        try:
+            with open(os.path.join(self.library_dir, INDEX_FILE)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    @contextmanager
+    def _updating_index(self):
+        """
+        The index as it is on disk, written back once the block has changed it
+
+        Several processes can share a library (e.g. the CLI run beside the web
+        interface), so the index is re-read under an exclusive file lock
+        rather than overwritten with this instance's copy.
+        """
+        with self._lock, open(os.path.join(self.library_dir, LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._index = self._load_index()
+                yield self._index
+                self._save_index()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save_index(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.staging_dir, suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.library_dir, INDEX_FILE))
+
+    def find(self, style: str, prompt: str, duration: float) -> Optional[Dict]:
+        """Shortest stored track of this style and prompt that covers duration"""
+        key = self.group_key(style, prompt)
+        with self._lock:
+            candidates = [
+                entry for entry in self._index
+                if entry['key'] == key and entry['duration'] >= duration
+                and os.path.exists(os.path.join(self.library_dir, entry['filename']))
+            ]
+        return min(candidates, key=lambda entry: entry['duration']) if candidates else None
+
+    def fetch(self, style: str, prompt: str, duration: float, output_path: str) -> Optional[Dict]:
+        """
+        Write a stored track for this cue to output_path
+
+        Returns:
+            The library entry used, or None when no stored track fits
+        """
+        entry = self.find(style, prompt, duration)
+        if not entry:
+            return None
+
+        source = os.path.join(self.library_dir, entry['filename'])
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        if entry['duration'] > duration:
+            self._trim(source, duration, output_path)
+        else:
+            shutil.copyfile(source, output_path)
+
+        with self._updating_index() as index:
+            for stored in index:
+                if stored['filename'] == entry['filename']:
+                    stored['uses'] = stored.get('uses', 0) + 1
+                    stored['last_used'] = time.time()
+                    entry = stored
+        return entry
+
+    def _trim(self, source: str, duration: float, output_path: str):
+        """Cut a longer track down to duration without re-encoding"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_path) or '.', suffix='.part.mp3')
+        os.close(fd)
+        cmd = ['ffmpeg', '-v', 'error', '-i', source, '-t', str(duration), '-c', 'copy', '-y', tmp_path]
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, timeout=60)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, output_path)
+        except Exception as e:
+            # Assembly cuts audio to the segment length anyway
+            logger.warning(f"Could not trim {source} ({e}), using the full track")
+            shutil.copyfile(source, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def staging_path(self) -> str:
+        """Temporary path to generate a new track into before add()"""
+        fd, path = tempfile.mkstemp(dir=self.staging_dir, suffix='.mp3')
+        os.close(fd)
+        return path
+
+    def add(self, style: str, prompt: str, duration: float, path: str) -> Dict:
+        """Move a freshly generated track into the library"""
+        key = self.group_key(style, prompt)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        filename = f"{style}_{key[:12]}_{int(duration)}s_{digest.hexdigest()[:8]}.mp3"
+        os.replace(path, os.path.join(self.library_dir, filename))
+
+        entry = {
+            'key': key,
+            'style': style,
+            'prompt': normalize_prompt(prompt),
+            'duration': duration,
+            'filename': filename,
+            'created': time.time(),
+            'uses': 0
+        }
+        with self._updating_index() as index:
+            index.append(entry)
+        return entry
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'tracks': len(self._index),
+                'styles': sorted({entry['style'] for entry in self._index}),
+                'total_uses': sum(entry.get('uses', 0) for entry in self._index)
+            }
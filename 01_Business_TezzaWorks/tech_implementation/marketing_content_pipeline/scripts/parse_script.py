@@ -108,6 +108,22 @@ class VideoScript:
         """Get all on-screen text elements"""
         return [e for e in self.elements if isinstance(e, OnScreenText)]
 
+    def music_spans(self) -> Dict[int, List[ScriptElement]]:
+        """
+        Elements each audio cue's music plays under, keyed by cue order
+
+        A cue's music starts at the cue and runs until the next cue or the
+        end of the script.
+        """
+        spans: Dict[int, List[ScriptElement]] = {}
+        current = None
+        for element in self.elements:
+            if isinstance(element, Audio):
+                current = spans[element.order] = []
+            if current is not None:
+                current.append(element)
+        return spans
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert script to dictionary"""
         return {
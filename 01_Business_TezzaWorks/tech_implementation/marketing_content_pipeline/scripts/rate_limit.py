@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Rate Limiting Module
+Token-bucket limiter and retry-with-backoff helpers shared by the API clients.
+"""
+
+import asyncio
+import random
+import threading
+import time
+import logging
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# HTTP status codes worth retrying: rate limited or a server-side failure
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Allows bursts of up to `burst` calls, refilled at `rate` calls per second.
+    A rate of 0 or less disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if one is available; otherwise return how long to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        if self.rate <= 0:
+            return
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait for a token without blocking the event loop"""
+        if self.rate <= 0:
+            return
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'TokenBucket':
+        """Build a limiter from a `rate_limit` config section"""
+        return cls(
+            rate=float(config.get('requests_per_second', 0)),
+            burst=int(config.get('burst', 1))
+        )
+
+
+def status_code_of(error: Exception) -> Optional[int]:
+    """HTTP status code carried by an API client exception, if any"""
+    status = getattr(error, 'status_code', None)
+    if status is None and getattr(error, 'response', None) is not None:
+        status = getattr(error.response, 'status_code', None)
+    return status
+
+
+def is_retryable(error: Exception) -> bool:
+    """Retry rate limits, server errors and dropped connections"""
+    status = status_code_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return isinstance(error, (ConnectionError, TimeoutError)) or \
+        type(error).__name__ in ('ConnectError', 'ReadTimeout', 'ConnectTimeout', 'RemoteProtocolError')
+
+
+def _backoff(attempt: int, backoff_base: float, backoff_max: float) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(backoff_max, backoff_base * (2 ** attempt)))
+
+
+def call_with_retries(
+    func: Callable[[], T],
+    limiter: Optional[TokenBucket] = None,
+    max_retries: int = 3,
+    backoff_base: float = 1.0,
+    backoff_max: float = 30.0
+) -> T:
+    """
+    Call func, waiting on the limiter before every attempt
+
+    Retryable failures are retried with exponential backoff and full jitter;
+    anything else, or the last failure, is raised to the caller.
+    """
+    attempt = 0
+    while True:
+        if limiter:
+            limiter.acquire()
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = _backoff(attempt, backoff_base, backoff_max)
+            attempt += 1
+            logger.warning(f"Retryable API error ({status_code_of(e) or type(e).__name__}), "
+                           f"retry {attempt}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+async def call_with_retries_async(
+    func: Callable[[], Awaitable[T]],
+    limiter: Optional[TokenBucket] = None,
+    max_retries: int = 3,
+    backoff_base: float = 1.0,
+    backoff_max: float = 30.0
+) -> T:
+    """Coroutine version of call_with_retries"""
+    attempt = 0
+    while True:
+        if limiter:
+            await limiter.acquire_async()
+        try:
+            return await func()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = _backoff(attempt, backoff_base, backoff_max)
+            attempt += 1
+            logger.warning(f"Retryable API error ({status_code_of(e) or type(e).__name__}), "
+                           f"retry {attempt}/{max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
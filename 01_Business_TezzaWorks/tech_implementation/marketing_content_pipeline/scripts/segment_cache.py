@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Segment Cache Module
+Rendered video segments are kept under a fingerprint of everything that goes
+into them (audio and footage contents, text overlay, duration and render
+settings), so re-assembling a script after one narration or on-screen text
+changes only re-renders the segments that changed.
+
+Every assembly also writes a manifest next to the output video recording the
+fingerprint and inputs of each segment. The next run compares against it to
+explain what changed; `assemble_video.py --dry-run` prints that plan without
+rendering anything.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import logging
+from typing import Dict, Optional
+
+from tts_cache import TTSCache
+
+logger = logging.getLogger(__name__)
+
+# Bump when segment rendering changes what the same inputs produce
+RENDER_VERSION = 1
+
+MANIFEST_SUFFIX = '.manifest.json'
+
+_digests: Dict[tuple, str] = {}
+_digests_lock = threading.Lock()
+
+
+class SegmentCache(TTSCache):
+    """Size-bounded LRU cache of rendered segment videos"""
+
+    file_suffix = '.mp4'
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional['SegmentCache']:
+        """Build the cache described by config, or None when it is disabled"""
+        cache_config = config['video'].get('segment_cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        cache_dir = config['paths'].get('segment_cache', 'assets/cache/segments')
+        return cls(cache_dir, int(cache_config.get('max_size_mb', 2000) * 1024 * 1024))
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Path of a cached segment, used in place; None on a miss"""
+        path = self._path(key)
+        try:
+            # Bump the access time used for LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return path
+
+
+def file_digest(path: Optional[str]) -> Optional[str]:
+    """sha256 of a file's contents, remembered per path, size and mtime"""
+    if not path or not os.path.exists(path):
+        return None
+
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        if memo_key in _digests:
+            return _digests[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    with _digests_lock:
+        _digests[memo_key] = digest.hexdigest()
+    return _digests[memo_key]
+
+
+def segment_inputs(segment) -> Dict:
+    """Everything specific to one VideoSegment that affects its rendered video"""
+    return {
+        'duration': round(segment.duration, 3),
+        'text_overlay': segment.text_overlay,
+        'audio': file_digest(segment.audio_path),
+        'music': file_digest(segment.music_path),
+        'music_offset': round(segment.music_offset, 3),
+        'footage': file_digest(segment.video_path)
+    }
+
+
+def render_settings(config: Dict) -> Dict:
+    """Configuration shared by every segment that affects its rendered video"""
+    video = config['video']
+    return {
+        'version': RENDER_VERSION,
+        'video': {
+            key: video.get(key)
+            for key in ('resolution', 'framerate', 'video_codec', 'preset', 'crf', 'audio_codec', 'audio_bitrate')
+        },
+        'text_overlay': config.get('text_overlay', {})
+    }
+
+
+def fingerprint(inputs: Dict, settings: Dict) -> str:
+    payload = json.dumps({'inputs': inputs, 'settings': settings}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def manifest_path(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + MANIFEST_SUFFIX
+
+
+def load_manifest(output_path: str) -> Dict:
+    """Manifest written by the last build of output_path, or {} if there is none"""
+    try:
+        with open(manifest_path(output_path)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_manifest(output_path: str, manifest: Dict):
+    path = manifest_path(output_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
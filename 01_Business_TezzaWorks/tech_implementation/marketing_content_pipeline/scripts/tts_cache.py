@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+TTS Cache Module
+Content-addressed cache of synthesized narrations, so re-running the pipeline
+on an edited script only pays for the lines that changed.
+
+Entries are keyed by a hash of everything that affects the audio (text, voice,
+voice settings, model and output format) and evicted least recently used
+first once the cache grows past its size limit.
+
+Inspect or prune the cache from the command line:
+    python3 scripts/tts_cache.py stats
+    python3 scripts/tts_cache.py list
+    python3 scripts/tts_cache.py prune --max-size-mb 200
+    python3 scripts/tts_cache.py clear
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AUDIO_SUFFIX = '.mp3'
+META_SUFFIX = '.json'
+
+
+class TTSCache:
+    """Size-bounded LRU cache of narration audio files on disk"""
+
+    file_suffix = AUDIO_SUFFIX
+
+    def __init__(self, cache_dir: str, max_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional['TTSCache']:
+        """Build the cache described by config, or None when it is disabled"""
+        cache_config = config['elevenlabs'].get('cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        cache_dir = config['paths'].get('tts_cache', 'assets/cache/tts')
+        return cls(cache_dir, int(cache_config.get('max_size_mb', 500) * 1024 * 1024))
+
+    @staticmethod
+    def make_key(text: str, voice_id: str, voice_settings: Dict, model_id: str, output_format: str) -> str:
+        """Hash of every input that affects the synthesized audio"""
+        payload = json.dumps({
+            'text': text,
+            'voice_id': voice_id,
+            'voice_settings': voice_settings,
+            'model_id': model_id,
+            'output_format': output_format
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str, suffix: Optional[str] = None) -> str:
+        # Two-character fan-out keeps directories small
+        return os.path.join(self.cache_dir, key[:2], key + (suffix or self.file_suffix))
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        """Copy a cached narration to output_path; False on a miss"""
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, output_path)
+            # Bump the access time used for LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, audio_path: str, metadata: Optional[Dict] = None):
+        """Add a freshly synthesized narration, then evict down to the size limit"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(audio_path, tmp_path)
+        os.replace(tmp_path, path)
+
+        with open(self._path(key, META_SUFFIX), 'w') as f:
+            json.dump(dict(metadata or {}, created=time.time()), f)
+
+        self.prune(self.max_bytes)
+
+    def entries(self) -> List[Dict]:
+        """Every cached narration, least recently used first"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(self.file_suffix):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append({
+                    'key': name[:-len(self.file_suffix)],
+                    'size': stat.st_size,
+                    'last_used': stat.st_mtime
+                })
+        entries.sort(key=lambda entry: entry['last_used'])
+        return entries
+
+    def metadata(self, key: str) -> Dict:
+        try:
+            with open(self._path(key, META_SUFFIX)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def remove(self, key: str):
+        for suffix in (self.file_suffix, META_SUFFIX):
+            try:
+                os.remove(self._path(key, suffix))
+            except FileNotFoundError:
+                pass
+
+    def prune(self, max_bytes: int) -> int:
+        """Evict least recently used entries until the cache fits in max_bytes"""
+        with self._lock:
+            entries = self.entries()
+            total = sum(entry['size'] for entry in entries)
+            removed = 0
+            for entry in entries:
+                if total <= max_bytes:
+                    break
+                self.remove(entry['key'])
+                total -= entry['size']
+                removed += 1
+            self.evictions += removed
+        if removed:
+            logger.info(f"Evicted {removed} cached narrations from {self.cache_dir}")
+        return removed
+
+    def clear(self) -> int:
+        return self.prune(0)
+
+    def stats(self) -> Dict:
+        entries = self.entries()
+        with self._lock:
+            return {
+                'entries': len(entries),
+                'size_bytes': sum(entry['size'] for entry in entries),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+def main():
+    """Command-line interface for inspecting and pruning the TTS cache"""
+    import argparse
+    import yaml
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description='Inspect or prune the narration cache')
+    parser.add_argument('command', choices=['stats', 'list', 'prune', 'clear'])
+    parser.add_argument('--max-size-mb', type=float,
+                        help='Size to prune down to (default: the configured limit)')
+    parser.add_argument('-c', '--config', help='Config file path', default='config.yaml')
+
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+
+    cache_config = config['elevenlabs'].get('cache', {})
+    cache = TTSCache(
+        config['paths'].get('tts_cache', 'assets/cache/tts'),
+        int(cache_config.get('max_size_mb', 500) * 1024 * 1024)
+    )
+
+    if args.command == 'stats':
+        print(json.dumps(cache.stats(), indent=2))
+    elif args.command == 'list':
+        for entry in reversed(cache.entries()):
+            meta = cache.metadata(entry['key'])
+            last_used = datetime.fromtimestamp(entry['last_used']).isoformat(timespec='seconds')
+            print(f"{entry['key'][:12]}  {entry['size'] / 1024:8.1f} KB  {last_used}  "
+                  f"{meta.get('voice_type', '?'):<18} {meta.get('text', '')[:60]!r}")
+    elif args.command == 'prune':
+        max_bytes = int(args.max_size_mb * 1024 * 1024) if args.max_size_mb is not None else cache.max_bytes
+        print(f"Removed {cache.prune(max_bytes)} cached narrations")
+    else:
+        print(f"Removed {cache.clear()} cached narrations")
+
+
+if __name__ == '__main__':
+    main()
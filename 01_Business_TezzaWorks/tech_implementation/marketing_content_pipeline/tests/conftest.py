@@ -0,0 +1,26 @@
+import os
+import sys
+import pytest
+import yaml
+
+# The pipeline's modules live in scripts/ and import each other by name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+
+@pytest.fixture
+def pipeline_config(tmp_path):
+    """
+    Write the shipped config.yaml with every path moved under tmp_path
+
+    Keyword arguments update config sections, e.g. video={'profile': 'preview'}.
+    """
+    def write(**sections):
+        with open(os.path.join(os.path.dirname(__file__), '..', 'config.yaml')) as f:
+            config = yaml.safe_load(f)
+        config['paths'] = {name: str(tmp_path / path) for name, path in config['paths'].items()}
+        for section, values in sections.items():
+            config[section].update(values)
+        path = tmp_path / 'config.yaml'
+        path.write_text(yaml.safe_dump(config))
+        return str(path)
+    return write
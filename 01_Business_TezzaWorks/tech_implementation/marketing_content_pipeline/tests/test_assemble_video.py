@@ -0,0 +1,220 @@
+import os
+from types import SimpleNamespace
+import pytest
+from assemble_video import VideoAssembler, VideoSegment
+from parse_script import ScriptParser
+from segment_cache import load_manifest
+
+
+@pytest.fixture
+def assembler(pipeline_config):
+    return VideoAssembler(config_path=pipeline_config())
+
+
+@pytest.fixture
+def segments(tmp_path):
+    voice = tmp_path / 'voice.mp3'
+    voice.write_bytes(b'voice')
+    return [
+        VideoSegment(order=1, duration=2.0, audio_path=str(voice)),
+        VideoSegment(order=2, duration=3.0, text_overlay='Hello'),
+        VideoSegment(order=3, duration=1.5),
+    ]
+
+
+def fake_renders(monkeypatch, assembler, segments, fail=(), degrade=()):
+    """Replace FFmpeg with renders that write placeholder files, failing or degrading some orders"""
+    calls = []
+
+    def create_video_segment(segment, output_path, work_dir=None):
+        calls.append(segment.order)
+        if segment.order in fail:
+            return None
+        segment.degraded = segment.order in degrade
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'wb') as f:
+            f.write(b'segment %d' % segment.order)
+        return output_path
+
+    def concatenate_segments(segment_paths, output_path, work_dir=None):
+        with open(output_path, 'wb') as f:
+            f.write(b''.join(open(path, 'rb').read() for path in segment_paths))
+        return output_path
+
+    monkeypatch.setattr(assembler, 'create_video_segment', create_video_segment)
+    monkeypatch.setattr(assembler, 'concatenate_segments', concatenate_segments)
+    # Each build lays the segments out afresh, as build_segments does
+    monkeypatch.setattr(assembler, 'build_segments',
+                        lambda *args: [VideoSegment(**vars(segment)) for segment in segments])
+    return calls
+
+
+def assemble(assembler, output_path):
+    return assembler.assemble_from_script(SimpleNamespace(title='Test'), [], [], output_path, mode='multi_pass')
+
+
+def test_failed_segment_fails_the_build(assembler, segments, monkeypatch, tmp_path):
+    """
+    GIVEN a multi-pass build in which one segment fails to render
+    WHEN the video is assembled
+    THEN check that no video or manifest is written, and the next plan renders the failed segment
+    """
+    output_path = str(tmp_path / 'video.mp4')
+    fake_renders(monkeypatch, assembler, segments, fail={2})
+
+    assert assemble(assembler, output_path) is None
+    assert not os.path.exists(output_path)
+    assert load_manifest(output_path) == {}
+
+    plan = assembler.plan_assembly(segments, output_path, 'multi_pass')
+    assert not plan['up_to_date']
+    assert [entry['action'] for entry in plan['segments']] == ['reuse', 'render', 'reuse']
+
+
+def test_degraded_segment_is_rendered_again(assembler, segments, monkeypatch, tmp_path):
+    """
+    GIVEN a multi-pass build in which one segment lost its overlay
+    WHEN the same video is assembled again
+    THEN check that only the degraded segment is rendered again
+    """
+    output_path = str(tmp_path / 'video.mp4')
+    fake_renders(monkeypatch, assembler, segments, degrade={2})
+    assert assemble(assembler, output_path) == output_path
+
+    manifest = load_manifest(output_path)
+    assert [entry.get('degraded', False) for entry in manifest['segments']] == [False, True, False]
+
+    plan = assembler.plan_assembly(segments, output_path, 'multi_pass')
+    assert not plan['up_to_date']
+    assert [entry['action'] for entry in plan['segments']] == ['reuse', 'render', 'reuse']
+    assert plan['segments'][1]['reason'] == 'degraded last build'
+
+    calls = fake_renders(monkeypatch, assembler, segments)
+    assert assemble(assembler, output_path) == output_path
+    assert calls == [2]
+    assert assembler.plan_assembly(segments, output_path, 'multi_pass')['up_to_date']
+
+
+def test_music_runs_under_segments_until_the_next_cue(assembler, tmp_path):
+    """
+    GIVEN a script with a narration and a scene after its first cue, and a narration after its second
+    WHEN its segments are laid out
+    THEN check that each track continues under every segment up to the next cue, from where it left off,
+         until the track runs out
+    """
+    from mock_tts_server import MP3_FRAME
+    script = ScriptParser().parse_content(
+        "### **Script Z: Cues**\n\n"
+        "**[NARRATOR]:** Before any music.\n\n"
+        "**[AUDIO]:** Warm acoustic music.\n\n"
+        "**[NARRATOR]:** Under the first cue.\n\n"
+        "**[SCENE]:** Still the first cue.\n\n"
+        "**[AUDIO]:** Dramatic music.\n\n"
+        "**[NARRATOR]:** Under the second cue.\n"
+    )
+    voiceover_results = []
+    for narration in script.get_narrations():
+        path = tmp_path / f'voice_{narration.order}.mp3'
+        # 115 frames of 1152 samples at 44.1kHz: just over 3s
+        path.write_bytes(MP3_FRAME * 115)
+        voiceover_results.append({'order': narration.order, 'audio_path': str(path)})
+    # About 26s of music for the first cue, and 6s, ending during its narration, for the second
+    first_music, second_music = tmp_path / 'first.mp3', tmp_path / 'second.mp3'
+    first_music.write_bytes(MP3_FRAME * 1000)
+    second_music.write_bytes(MP3_FRAME * 230)
+    first, second = script.get_audio_cues()
+    music_results = [{'order': first.order, 'audio_path': str(first_music)},
+                     {'order': second.order, 'audio_path': str(second_music)}]
+
+    segments = assembler.build_segments(script, voiceover_results, music_results)
+
+    assert [segment.music_path for segment in segments] == \
+        [None, str(first_music), str(first_music), str(first_music), str(second_music), str(second_music)]
+    durations = [segment.duration for segment in segments]
+    assert [segment.music_offset for segment in segments] == pytest.approx(
+        [0.0, 0.0, durations[1], durations[1] + durations[2], 0.0, durations[4]])
+
+    # Once the second track has run out, the rest of its span is silent
+    second_music.write_bytes(MP3_FRAME * 150)
+    segments = assembler.build_segments(script, voiceover_results, music_results)
+    assert [segment.music_path for segment in segments][4:] == [str(second_music), None]
+
+
+def test_filter_graph_for_mixed_segments(assembler, tmp_path):
+    """
+    GIVEN segments with voice and music, footage with music and an overlay, nothing, and voice alone
+    WHEN the single-pass filter graph is built
+    THEN check that only files become inputs, and each segment's chain mixes, offsets and cuts its audio
+    """
+    footage = tmp_path / 'footage.mp4'
+    footage.write_bytes(b'footage')
+    segments = [
+        VideoSegment(order=1, duration=2.0, audio_path='voice.mp3', music_path='music.mp3'),
+        VideoSegment(order=2, duration=3.0, music_path='music.mp3', music_offset=2.0,
+                     video_path=str(footage), text_overlay="It's: here"),
+        VideoSegment(order=3, duration=1.5),
+        VideoSegment(order=4, duration=1.0, audio_path='other.mp3'),
+    ]
+
+    input_args, filter_graph = assembler.build_filter_graph(segments)
+
+    assert input_args == ['-i', 'voice.mp3', '-i', 'music.mp3', '-i', str(footage), '-i', 'music.mp3',
+                          '-i', 'other.mp3']
+    black = 'color=c=black:s=1920x1080:r=30:d={},setsar=1,format=yuv420p,setpts=PTS-STARTPTS'
+    fit = 'aformat=sample_rates=44100:channel_layouts=stereo,apad,atrim=duration={},asetpts=PTS-STARTPTS'
+    assert filter_graph.split(';') == [
+        black.format('2.000') + '[v0]',
+        '[1:a]atrim=start=0.000,asetpts=PTS-STARTPTS,volume=0.3[m0]',
+        '[0:a][m0]amix=inputs=2:duration=first,' + fit.format('2.000') + '[a0]',
+        '[2:v]scale=1920:1080:force_original_aspect_ratio=decrease,pad=1920:1080:(ow-iw)/2:(oh-ih)/2,fps=30,'
+        'tpad=stop_mode=clone:stop_duration=3.000,trim=duration=3.000,setsar=1,format=yuv420p,'
+        "setpts=PTS-STARTPTS,drawtext=text='It'\\''s\\: here':fontsize=48:fontcolor=white:"
+        'x=(w-tw)/2:y=h-th-50:borderw=2:bordercolor=black[v1]',
+        '[3:a]atrim=start=2.000,asetpts=PTS-STARTPTS,' + fit.format('3.000') + '[a1]',
+        black.format('1.500') + '[v2]',
+        'anullsrc=r=44100:cl=stereo,' + fit.format('1.500') + '[a2]',
+        black.format('1.000') + '[v3]',
+        '[4:a]anull,' + fit.format('1.000') + '[a3]',
+        '[v0][a0][v1][a1][v2][a2][v3][a3]concat=n=4:v=1:a=1[outv][outa]',
+    ]
+
+
+def test_profiles_cut_at_the_same_moments(pipeline_config, tmp_path):
+    """
+    GIVEN a script whose narrations don't last whole frames
+    WHEN its segments are laid out under the preview and final profiles
+    THEN check that both profiles cut on their own frames within half a frame of the exact moments,
+         while rendering with different settings
+    """
+    from mock_tts_server import MP3_FRAME
+    from segment_cache import render_settings
+
+    script = ScriptParser().parse_content("### **Script Z: Cuts**\n\n" + "\n\n".join(
+        f"**[NARRATOR]:** Line {i}.\n\n**[SCENE]:** Scene {i}." for i in range(1, 5)
+    ))
+    voiceover_results, exact, elapsed = [], [], 0.0
+    for i, narration in enumerate(script.get_narrations()):
+        path = tmp_path / f'voice_{narration.order}.mp3'
+        # 1.2s to 3.2s of audio, none of it a whole number of frames
+        path.write_bytes(MP3_FRAME * (46 + 29 * i))
+        voiceover_results.append({'order': narration.order, 'audio_path': str(path)})
+        # Each narration is followed by a 5s scene
+        elapsed += (46 + 29 * i) * 1152 / 44100
+        exact.append(elapsed)
+        elapsed += 5.0
+        exact.append(elapsed)
+
+    settings = {}
+    for profile in ('preview', 'final'):
+        assembler = VideoAssembler(config_path=pipeline_config(), profile=profile)
+        framerate = assembler.config['video']['framerate']
+        elapsed, cuts = 0.0, []
+        for segment in assembler.build_segments(script, voiceover_results, []):
+            elapsed += segment.duration
+            assert elapsed * framerate == pytest.approx(round(elapsed * framerate))
+            cuts.append(elapsed)
+        assert cuts == pytest.approx(exact, abs=0.5 / framerate)
+        settings[profile] = render_settings(assembler.config)
+
+    assert settings['preview'] != settings['final']
+    assert settings['preview']['video']['resolution'] != settings['final']['video']['resolution']
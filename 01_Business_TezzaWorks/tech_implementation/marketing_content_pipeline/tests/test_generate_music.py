@@ -0,0 +1,121 @@
+import random
+import pytest
+from parse_script import ScriptParser
+from generate_music import MusicGenerator
+
+SCRIPT = """
+### **Script Z: Two Acoustic Cues**
+
+**[SCENE]:** An office at dawn.
+
+**[AUDIO]:** Warm acoustic music.
+
+**[NARRATOR]:** The first line runs under the first cue.
+
+**[SCENE]:** A team around a table.
+
+**[AUDIO]:** Warm acoustic music.
+
+**[NARRATOR]:** The second line is shorter.
+"""
+
+
+@pytest.fixture
+def script():
+    return ScriptParser().parse_content(SCRIPT)
+
+
+@pytest.fixture
+def voiceover_results(script):
+    first, second = script.get_narrations()
+    return [
+        {'order': first.order, 'audio_path': 'first.mp3', 'duration': 3.2},
+        {'order': second.order, 'audio_path': 'second.mp3', 'duration': 1.5},
+    ]
+
+
+def test_cues_span_the_segments_they_play_under(pipeline_config, script, voiceover_results):
+    """
+    GIVEN a script whose two cues play under a narration each, the first also under a scene
+    WHEN the cues are sized with the voiceover durations
+    THEN check that each cue lasts as long as its own scene, narrations and scenes up to the next cue
+    """
+    generator = MusicGenerator(pipeline_config())
+    first, second = script.get_audio_cues()
+
+    # 5s cue scene + 3.2s narration + 5s scene, then 5s cue scene + 1.5s narration
+    assert generator.cue_durations(script, voiceover_results) == {first.order: 14, second.order: 7}
+    # Without voiceovers every segment lasts one scene
+    assert generator.cue_durations(script) == {first.order: 15, second.order: 10}
+
+
+def test_library_sees_each_cue_length(pipeline_config, script, voiceover_results, monkeypatch, tmp_path):
+    """
+    GIVEN two cues with the same style and prompt but different lengths, generated against the mock server
+    WHEN their music is generated through the library
+    THEN check that the longer cue is generated once and the shorter one is served from it
+    """
+    pytest.importorskip('httpx')
+    from mock_music_server import start_server
+
+    server = start_server(render_time=0.05)
+    monkeypatch.setenv('SUNO_API_KEY', 'mock')
+    monkeypatch.setenv('SUNO_API_BASE_URL', f"{server.url}/v1")
+    generator = MusicGenerator(pipeline_config(suno={'polling': {'initial_interval': 0.02, 'timeout': 10}}))
+
+    fetched, added = [], []
+    fetch, add = generator.library.fetch, generator.library.add
+    monkeypatch.setattr(generator.library, 'fetch',
+                        lambda style, prompt, duration, path: fetched.append(duration) or fetch(style, prompt, duration, path))
+    monkeypatch.setattr(generator.library, 'add',
+                        lambda style, prompt, duration, path: added.append(duration) or add(style, prompt, duration, path))
+
+    try:
+        results = generator.generate_from_script(script, str(tmp_path / 'music'), voiceover_results)
+    finally:
+        server.shutdown()
+
+    assert [result['duration'] for result in results] == [14, 7]
+    assert added == [14]
+    # Both cues miss the empty library, then are written from the one new track
+    assert sorted(fetched) == [7, 7, 14, 14]
+    assert server.stats()['submitted'] == 1
+    assert [result['reused'] for result in results] == [False, True]
+
+
+def test_rate_limited_submissions_are_retried(pipeline_config, monkeypatch, tmp_path):
+    """
+    GIVEN four cues and a mock server that answers half of all submissions with 429
+    WHEN their music is generated concurrently with enough retries
+    THEN check that every job was resubmitted until accepted, then polled and downloaded in full
+    """
+    pytest.importorskip('httpx')
+    from mock_music_server import start_server, MP3_FRAME, FRAMES_PER_SECOND
+
+    script = ScriptParser().parse_content("### **Script Z: Four Cues**\n\n" + "\n\n".join(
+        f"**[AUDIO]:** {description}." for description in
+        ('Warm acoustic music', 'Dramatic music', 'Sad trombone', 'Uplifting corporate music')
+    ))
+    random.seed(3)
+    server = start_server(render_time=0.1, error_rate=0.5)
+    monkeypatch.setenv('SUNO_API_KEY', 'mock')
+    monkeypatch.setenv('SUNO_API_BASE_URL', f"{server.url}/v1")
+    generator = MusicGenerator(pipeline_config(suno={
+        'concurrency': {'max_concurrent': 4, 'max_retries': 20, 'backoff_base': 0.01, 'backoff_max': 0.05,
+                        'rate_limit': {'requests_per_second': 0}},
+        'polling': {'initial_interval': 0.02, 'timeout': 10},
+        'library': {'enabled': False}
+    }))
+
+    try:
+        results = generator.generate_from_script(script, str(tmp_path / 'music'))
+    finally:
+        server.shutdown()
+
+    stats = server.stats()
+    assert stats['rate_limited'] > 0
+    assert stats['submitted'] == stats['downloads'] == 4
+    assert stats['status_polls'] >= 4
+    for result in results:
+        with open(result['audio_path'], 'rb') as f:
+            assert f.read() == MP3_FRAME * result['duration'] * FRAMES_PER_SECOND
@@ -0,0 +1,77 @@
+import random
+import pytest
+from parse_script import ScriptParser
+
+pytest.importorskip('elevenlabs')
+
+SCRIPT = "### **Script Z: Six Lines**\n\n" + "\n\n".join(
+    f"**[NARRATOR]:** Line number {i} of the narration." for i in range(1, 7)
+)
+
+
+@pytest.fixture
+def mock_tts(monkeypatch):
+    """Start the mock TTS server and point the generator at it"""
+    from mock_tts_server import start_server
+
+    servers = []
+
+    def start(**options):
+        server = start_server(port=0, **options)
+        servers.append(server)
+        monkeypatch.setenv('ELEVENLABS_API_KEY', 'mock')
+        monkeypatch.setenv('ELEVENLABS_BASE_URL', server.url)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def synthesize(pipeline_config, tmp_path, max_workers, **concurrency):
+    from generate_voiceover import VoiceoverGenerator
+
+    config = pipeline_config(elevenlabs={
+        'cache': {'enabled': False},
+        'concurrency': dict(concurrency, max_workers=max_workers)
+    })
+    generator = VoiceoverGenerator(config_path=config)
+    script = ScriptParser().parse_content(SCRIPT)
+    return generator.generate_from_script(script, str(tmp_path / 'voiceovers'), max_workers=max_workers)
+
+
+def test_workers_cap_requests_in_flight(pipeline_config, tmp_path, mock_tts):
+    """
+    GIVEN six narrations, three workers and no rate limit
+    WHEN the script is synthesized against the mock server
+    THEN check that exactly three requests were ever in flight at once
+    """
+    server = mock_tts(latency=0.2)
+
+    results = synthesize(pipeline_config, tmp_path, 3, rate_limit={'requests_per_second': 0})
+
+    assert len(results) == 6
+    assert server.stats()['requests'] == 6
+    assert server.stats()['peak_concurrency'] == 3
+
+
+def test_rate_limited_requests_are_retried(pipeline_config, tmp_path, mock_tts):
+    """
+    GIVEN a mock server that answers half of all requests with 429
+    WHEN the script is synthesized with enough retries
+    THEN check that the 429s were retried until every narration holds real audio
+    """
+    from mock_tts_server import MP3_FRAME
+
+    random.seed(7)
+    server = mock_tts(latency=0.01, error_rate=0.5)
+
+    results = synthesize(pipeline_config, tmp_path, 1, max_retries=20, backoff_base=0.01, backoff_max=0.05,
+                         rate_limit={'requests_per_second': 0})
+
+    stats = server.stats()
+    assert stats['rate_limited'] > 0
+    assert stats['requests'] == stats['rate_limited'] + 6
+    for result in results:
+        with open(result['audio_path'], 'rb') as f:
+            assert f.read(len(MP3_FRAME)) == MP3_FRAME
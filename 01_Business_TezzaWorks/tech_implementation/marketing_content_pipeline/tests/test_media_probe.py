@@ -0,0 +1,96 @@
+import struct
+import pytest
+from media_probe import MediaProbe, mp3_duration
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz: 1152 samples in 417 bytes (418 padded)
+MPEG1_SAMPLES, MPEG1_RATE, MPEG1_LENGTH = 1152, 44100, 417
+# MPEG-2 Layer III, 64 kbps, 22.05 kHz: 576 samples in 208 bytes
+MPEG2_SAMPLES, MPEG2_RATE, MPEG2_LENGTH = 576, 22050, 208
+
+def mpeg1_frame(padded=False, body=b''):
+    header = bytes([0xFF, 0xFB, 0x90 | (0x02 if padded else 0), 0x00])
+    return (header + body).ljust(MPEG1_LENGTH + padded, b'\x00')
+
+def mpeg2_frame():
+    return bytes([0xFF, 0xF3, 0x80, 0x00]).ljust(MPEG2_LENGTH, b'\x00')
+
+def id3_tag(size):
+    syncsafe = bytes([(size >> shift) & 0x7F for shift in (21, 14, 7, 0)])
+    # Tag contents that look like frame sync must not be mistaken for audio
+    return b'ID3\x04\x00\x00' + syncsafe + (b'\xFF\xFB\x90\x00' * size)[:size]
+
+@pytest.fixture
+def write_mp3(tmp_path):
+    def write(data, name='track.mp3'):
+        path = tmp_path / name
+        path.write_bytes(data)
+        return str(path)
+    return write
+
+def test_cbr_frames_are_walked(write_mp3):
+    """
+    GIVEN an MPEG-1 Layer III file of 100 frames, every other one padded, without a Xing header
+    WHEN its duration is read
+    THEN check that every frame is counted
+    """
+    path = write_mp3(b''.join(mpeg1_frame(padded=i % 2 == 1) for i in range(100)))
+    assert mp3_duration(path) == pytest.approx(100 * MPEG1_SAMPLES / MPEG1_RATE)
+
+def test_info_header_frame_count_is_used(write_mp3):
+    """
+    GIVEN a file whose first frame carries an Info header claiming 5000 frames
+    WHEN its duration is read
+    THEN check that the header's frame count is used instead of walking the file
+    """
+    # Stereo MPEG-1 side information is 32 bytes, so the tag starts at byte 36
+    info = b'\x00' * 32 + b'Info' + struct.pack('>II', 1, 5000)
+    path = write_mp3(mpeg1_frame(body=info) + mpeg1_frame() * 3)
+    assert mp3_duration(path) == pytest.approx(5000 * MPEG1_SAMPLES / MPEG1_RATE)
+
+def test_id3v2_tag_is_skipped(write_mp3):
+    """
+    GIVEN an ID3v2 tag larger than the head read, followed by 20 frames
+    WHEN its duration is read
+    THEN check that the tag is skipped and only the frames are counted
+    """
+    path = write_mp3(id3_tag(10000) + mpeg1_frame() * 20)
+    assert mp3_duration(path) == pytest.approx(20 * MPEG1_SAMPLES / MPEG1_RATE)
+
+def test_mpeg2_frames(write_mp3):
+    """
+    GIVEN an MPEG-2 Layer III file of 50 frames
+    WHEN its duration is read
+    THEN check that the MPEG-2 frame size and sample count are used
+    """
+    path = write_mp3(mpeg2_frame() * 50)
+    assert mp3_duration(path) == pytest.approx(50 * MPEG2_SAMPLES / MPEG2_RATE)
+
+@pytest.mark.parametrize('data', [b'', b'MOCK_MUSIC_DATA', b'\xFF\xFF\xFF\xFF' * 100, id3_tag(64)])
+def test_garbage_returns_none(write_mp3, data):
+    """
+    GIVEN files that are empty, text, invalid frame headers or a tag with no audio
+    WHEN their duration is read
+    THEN check that None is returned
+    """
+    assert mp3_duration(write_mp3(data)) is None
+
+def test_probe_caches_native_durations(write_mp3, tmp_path, monkeypatch):
+    """
+    GIVEN an MP3 measured once by a MediaProbe with a cache file
+    WHEN a new probe asks for the same file
+    THEN check that FFmpeg is never run and the second answer comes from the cache
+    """
+    def no_subprocess(*args, **kwargs):
+        raise AssertionError('FFmpeg should not run for a readable MP3')
+
+    monkeypatch.setattr('media_probe.subprocess.run', no_subprocess)
+    path = write_mp3(mpeg1_frame() * 10)
+    cache_path = str(tmp_path / 'probe.json')
+
+    first = MediaProbe(cache_path)
+    assert first.duration(path) == pytest.approx(10 * MPEG1_SAMPLES / MPEG1_RATE)
+    assert first.probed == 1
+
+    second = MediaProbe(cache_path)
+    assert second.duration(path) == pytest.approx(10 * MPEG1_SAMPLES / MPEG1_RATE)
+    assert (second.hits, second.probed) == (1, 0)
@@ -0,0 +1,113 @@
+import json
+import subprocess
+import pytest
+import music_library
+from music_library import MusicLibrary, normalize_prompt
+
+PROMPT = 'warm acoustic music, guitar, friendly'
+
+
+@pytest.fixture
+def library_dir(tmp_path):
+    return str(tmp_path / 'library')
+
+
+@pytest.fixture
+def track(tmp_path):
+    """Write a fake generated track"""
+    def write(content):
+        path = tmp_path / f'generated_{content}.mp3'
+        path.write_text(content)
+        return str(path)
+    return write
+
+
+def test_prompt_normalization():
+    """
+    GIVEN two prompts with the same descriptors
+    WHEN they differ only in case, spacing, order and repeats
+    THEN check that they normalize to the same prompt
+    """
+    assert normalize_prompt(' Guitar,warm acoustic music , friendly, guitar') == normalize_prompt(PROMPT)
+
+
+def test_find_picks_the_shortest_covering_track(library_dir, track):
+    """
+    GIVEN tracks of 10, 30 and 60 seconds for one style and prompt, and a 45 second one for another
+    WHEN a 20 second cue is looked up
+    THEN check that the 30 second track is picked, and that nothing covers a 90 second cue
+    """
+    library = MusicLibrary(library_dir)
+    for duration in (60, 10, 30):
+        library.add('warm_acoustic', PROMPT, duration, track(f'{duration}s'))
+    library.add('dramatic', PROMPT, 45, track('dramatic'))
+
+    assert library.find('warm_acoustic', 'friendly, guitar, warm acoustic music', 20)['duration'] == 30
+    assert library.find('warm_acoustic', PROMPT, 30)['duration'] == 30
+    assert library.find('warm_acoustic', PROMPT, 90) is None
+    assert library.find('corporate_uplifting', PROMPT, 20) is None
+
+
+def test_fetch_trims_longer_tracks(library_dir, track, tmp_path, monkeypatch):
+    """
+    GIVEN a stored 30 second track
+    WHEN it is fetched for a 20 second cue and ffmpeg trims it
+    THEN check that it is cut to 20 seconds without re-encoding, and its use is recorded
+    """
+    commands = []
+
+    def fake_ffmpeg(cmd, **kwargs):
+        commands.append(cmd)
+        with open(cmd[-1], 'w') as f:
+            f.write('trimmed')
+    monkeypatch.setattr(music_library.subprocess, 'run', fake_ffmpeg)
+
+    library = MusicLibrary(library_dir)
+    library.add('warm_acoustic', PROMPT, 30, track('full'))
+    output = tmp_path / 'cue.mp3'
+    entry = library.fetch('warm_acoustic', PROMPT, 20, str(output))
+
+    assert commands[0][commands[0].index('-t') + 1] == '20'
+    assert commands[0][commands[0].index('-c') + 1] == 'copy'
+    assert output.read_text() == 'trimmed'
+    assert entry['uses'] == 1
+
+
+def test_failed_trim_falls_back_to_the_full_track(library_dir, track, tmp_path, monkeypatch):
+    """
+    GIVEN a stored 30 second track and no working ffmpeg
+    WHEN it is fetched for a 20 second cue
+    THEN check that the full track is written and no partial file is left behind
+    """
+    def failing_ffmpeg(cmd, **kwargs):
+        raise subprocess.CalledProcessError(1, cmd)
+    monkeypatch.setattr(music_library.subprocess, 'run', failing_ffmpeg)
+
+    library = MusicLibrary(library_dir)
+    library.add('warm_acoustic', PROMPT, 30, track('full'))
+    output = tmp_path / 'cues' / 'cue.mp3'
+    library.fetch('warm_acoustic', PROMPT, 20, str(output))
+
+    assert output.read_text() == 'full'
+    assert [path.name for path in output.parent.iterdir()] == ['cue.mp3']
+
+
+def test_libraries_sharing_a_directory_keep_each_others_changes(library_dir, track, tmp_path):
+    """
+    GIVEN two library instances opened on the same directory, as two processes would
+    WHEN each adds a track and fetches the other's
+    THEN check that the index holds both tracks with both uses recorded
+    """
+    first, second = MusicLibrary(library_dir), MusicLibrary(library_dir)
+    first.add('warm_acoustic', PROMPT, 30, track('first'))
+    second.add('dramatic', PROMPT, 30, track('second'))
+
+    # The second instance has read the first's track while writing its own
+    assert second.fetch('warm_acoustic', PROMPT, 30, str(tmp_path / 'a.mp3'))
+    first.fetch('warm_acoustic', PROMPT, 30, str(tmp_path / 'b.mp3'))
+    first.fetch('dramatic', PROMPT, 30, str(tmp_path / 'c.mp3'))
+
+    with open(f'{library_dir}/index.json') as f:
+        index = json.load(f)
+    assert sorted((entry['style'], entry['uses']) for entry in index) == [('dramatic', 1), ('warm_acoustic', 2)]
+    assert MusicLibrary(library_dir).stats()['total_uses'] == 3
@@ -0,0 +1,118 @@
+import asyncio
+import time
+import pytest
+import rate_limit
+from rate_limit import TokenBucket, call_with_retries, call_with_retries_async
+
+
+class APIError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def flaky(failures):
+    """A call that raises each of failures in turn, then succeeds"""
+    calls = []
+
+    def call():
+        calls.append(len(calls))
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return 'ok'
+    return call, calls
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(rate_limit.time, 'sleep', recorded.append)
+    return recorded
+
+
+def test_token_bucket_allows_a_burst_then_the_rate():
+    """
+    GIVEN a bucket of 3 tokens refilled at 20 per second
+    WHEN 5 tokens are taken
+    THEN check that the burst is immediate and the other 2 wait for the refill
+    """
+    bucket = TokenBucket(rate=20, burst=3)
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.05
+
+    for _ in range(2):
+        bucket.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_token_bucket_disabled_at_zero_rate(sleeps):
+    """
+    GIVEN a bucket with a rate of 0
+    WHEN many tokens are taken
+    THEN check that it never waits
+    """
+    bucket = TokenBucket(rate=0, burst=1)
+    for _ in range(100):
+        bucket.acquire()
+    assert sleeps == []
+
+
+def test_retryable_errors_are_retried_with_backoff(sleeps):
+    """
+    GIVEN a call that is rate limited twice and then fails with a 503
+    WHEN it is called with up to 3 retries
+    THEN check that it succeeds on the fourth attempt after three capped backoffs
+    """
+    call, calls = flaky([APIError(429), APIError(429), APIError(503)])
+    assert call_with_retries(call, max_retries=3, backoff_base=1.0, backoff_max=2.0) == 'ok'
+    assert len(calls) == 4
+    assert len(sleeps) == 3
+    assert all(0 <= delay <= 2.0 for delay in sleeps)
+
+
+def test_retries_give_up(sleeps):
+    """
+    GIVEN a call that is always rate limited
+    WHEN it is called with up to 2 retries
+    THEN check that the last error is raised after three attempts
+    """
+    call, calls = flaky([APIError(429)] * 5)
+    with pytest.raises(APIError):
+        call_with_retries(call, max_retries=2)
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize('error', [APIError(400), APIError(401), ValueError('bad input')])
+def test_other_errors_are_not_retried(sleeps, error):
+    """
+    GIVEN a call that fails with a client error or a non-HTTP exception
+    WHEN it is called with retries
+    THEN check that the error is raised at once
+    """
+    call, calls = flaky([error])
+    with pytest.raises(type(error)):
+        call_with_retries(call, max_retries=3)
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_async_retries_wait_on_the_limiter():
+    """
+    GIVEN a coroutine that is rate limited once, and a bucket with one token
+    WHEN it is called through call_with_retries_async
+    THEN check that the retry waits for a refilled token and then succeeds
+    """
+    call, calls = flaky([APIError(429)])
+
+    async def coroutine():
+        return call()
+
+    bucket = TokenBucket(rate=20, burst=1)
+    started = time.monotonic()
+    result = asyncio.run(call_with_retries_async(coroutine, limiter=bucket, max_retries=1,
+                                                 backoff_base=0.001, backoff_max=0.001))
+    assert result == 'ok'
+    assert len(calls) == 2
+    assert time.monotonic() - started >= 0.04
@@ -0,0 +1,88 @@
+import os
+import pytest
+from tts_cache import TTSCache
+
+
+@pytest.fixture
+def narration(tmp_path):
+    """Write a fake narration of the given size"""
+    def write(name, size=100):
+        path = tmp_path / f'{name}.mp3'
+        path.write_bytes(name.encode()[:1] * size)
+        return str(path)
+    return write
+
+
+def age(cache, key, seconds_ago):
+    """Set an entry's last use to seconds_ago"""
+    when = os.stat(cache._path(key)).st_mtime - seconds_ago
+    os.utime(cache._path(key), (when, when))
+
+
+def test_hits_and_misses(tmp_path, narration):
+    """
+    GIVEN a cache holding one narration
+    WHEN it is asked for that narration and for another
+    THEN check that the first is copied out and counted as a hit, the second as a miss
+    """
+    cache = TTSCache(str(tmp_path / 'cache'))
+    key = TTSCache.make_key('Hello', 'voice', {'stability': 0.75}, 'model', 'mp3_44100_128')
+    cache.store(key, narration('hello'), {'text': 'Hello'})
+
+    output = tmp_path / 'out.mp3'
+    assert cache.fetch(key, str(output))
+    assert output.read_bytes() == b'h' * 100
+    assert not cache.fetch('0' * 64, str(tmp_path / 'missing.mp3'))
+    assert cache.metadata(key)['text'] == 'Hello'
+
+    stats = cache.stats()
+    assert (stats['entries'], stats['hits'], stats['misses']) == (1, 1, 1)
+
+
+def test_key_covers_every_input():
+    """
+    GIVEN the inputs of one narration
+    WHEN any one of them changes
+    THEN check that the cache key changes with it
+    """
+    inputs = ['Hello', 'voice', {'stability': 0.75}, 'model', 'mp3_44100_128']
+    key = TTSCache.make_key(*inputs)
+    for i, changed in enumerate(['Hi', 'other', {'stability': 0.5}, 'turbo', 'mp3_22050_32']):
+        assert TTSCache.make_key(*inputs[:i], changed, *inputs[i + 1:]) != key
+
+
+def test_least_recently_used_is_evicted_first(tmp_path, narration):
+    """
+    GIVEN a cache with room for two narrations, holding two of which the older was used since
+    WHEN a third narration is stored
+    THEN check that the one not used for longest is evicted
+    """
+    cache = TTSCache(str(tmp_path / 'cache'), max_bytes=250)
+    cache.store('a' * 64, narration('a'))
+    cache.store('b' * 64, narration('b'))
+    age(cache, 'a' * 64, 20)
+    age(cache, 'b' * 64, 10)
+
+    # Reading a refreshes it, leaving b the least recently used
+    assert cache.fetch('a' * 64, str(tmp_path / 'out.mp3'))
+    cache.store('c' * 64, narration('c'))
+
+    assert sorted(entry['key'][0] for entry in cache.entries()) == ['a', 'c']
+    assert cache.stats()['evictions'] == 1
+
+
+def test_prune(tmp_path, narration):
+    """
+    GIVEN a cache holding three narrations of different ages
+    WHEN it is pruned to fit one, then cleared
+    THEN check that the newest is kept, then that nothing is left
+    """
+    cache = TTSCache(str(tmp_path / 'cache'))
+    for i, name in enumerate('abc'):
+        cache.store(name * 64, narration(name))
+        age(cache, name * 64, 30 - 10 * i)
+
+    assert cache.prune(100) == 2
+    assert [entry['key'][0] for entry in cache.entries()] == ['c']
+    assert cache.clear() == 1
+    assert cache.entries() == []
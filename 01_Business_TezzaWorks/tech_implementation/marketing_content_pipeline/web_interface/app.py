@@ -178,10 +178,14 @@ def generate_video():
         data = request.json
         filename = data.get('filename')
         script_title = data.get('script_title')
+        profile = data.get('profile') or CONFIG['video'].get('profile')
 
         if not filename:
             return jsonify({'success': False, 'error': 'No filename provided'}), 400
 
+        if profile and profile not in CONFIG.get('render_profiles', {}):
+            return jsonify({'success': False, 'error': f'Unknown render profile: {profile}'}), 400
+
         filename = secure_filename(filename)
         file_path = os.path.join(UPLOAD_FOLDER, filename)
 
@@ -197,6 +201,7 @@ def generate_video():
             'status': 'queued',
             'filename': filename,
             'script_title': script_title,
+            'profile': profile,
             'created': datetime.now().isoformat(),
             'progress': 0,
             'message': 'Job queued'
@@ -204,7 +209,7 @@ def generate_video():
 
         # Start processing in background (in production, use Celery)
         # For now, we'll do it synchronously for simplicity
-        process_video_generation(job_id, file_path, script_title)
+        process_video_generation(job_id, file_path, script_title, profile)
 
         return jsonify({
             'success': True,
@@ -217,7 +222,7 @@ def generate_video():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-def process_video_generation(job_id, file_path, script_title):
+def process_video_generation(job_id, file_path, script_title, profile=None):
     """Process video generation (should be async in production)"""
     try:
         jobs[job_id]['status'] = 'processing'
@@ -243,26 +248,35 @@ def process_video_generation(job_id, file_path, script_title):
         jobs[job_id]['message'] = 'Generating voiceovers...'
         jobs[job_id]['progress'] = 30
 
+        # Each narration's duration is probed as soon as its file is written,
+        # overlapping with synthesis of the rest
+        assembler = VideoAssembler(CONFIG_PATH, profile=profile)
         voiceover_gen = VoiceoverGenerator(CONFIG_PATH)
-        voiceover_results = voiceover_gen.generate_from_script(script, VOICEOVER_FOLDER)
+        voiceover_results = voiceover_gen.generate_from_script(
+            script,
+            VOICEOVER_FOLDER,
+            on_complete=lambda result: {'duration': assembler.get_audio_duration(result['audio_path'])}
+        )
+        jobs[job_id]['voiceover_stats'] = voiceover_gen.last_run_stats
 
         # Generate music
         jobs[job_id]['message'] = 'Generating background music...'
         jobs[job_id]['progress'] = 60
 
         music_gen = MusicGenerator(CONFIG_PATH)
-        music_results = music_gen.generate_from_script(script, MUSIC_FOLDER)
+        music_results = music_gen.generate_from_script(script, MUSIC_FOLDER, voiceover_results)
+        jobs[job_id]['music_stats'] = music_gen.last_run_stats
 
         # Assemble video
         jobs[job_id]['message'] = 'Assembling video...'
         jobs[job_id]['progress'] = 80
 
-        assembler = VideoAssembler(CONFIG_PATH)
         video_path = assembler.assemble_from_script(
             script,
             voiceover_results,
             music_results
         )
+        jobs[job_id]['assembly_stats'] = assembler.last_run_stats
 
         if video_path:
             jobs[job_id]['status'] = 'completed'
@@ -347,6 +361,8 @@ def get_config():
             'elevenlabs_configured': bool(os.getenv('ELEVENLABS_API_KEY')),
             'suno_configured': bool(os.getenv('SUNO_API_KEY')),
             'video_settings': CONFIG['video'],
+            'render_profiles': CONFIG.get('render_profiles', {}),
+            'default_profile': CONFIG['video'].get('profile'),
             'available_voices': CONFIG['elevenlabs']['voice_profiles'],
             'music_styles': list(CONFIG['suno']['music_styles'].keys())
         }
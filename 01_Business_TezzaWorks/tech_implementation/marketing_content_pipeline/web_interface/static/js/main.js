@@ -286,7 +286,7 @@ async function generateVideo(filename) {
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({ filename })
+            body: JSON.stringify({ filename, profile: selectedRenderProfile() })
         });
 
         const data = await response.json();
@@ -314,7 +314,8 @@ async function generateVideoFromScript(filename, scriptTitle) {
             },
             body: JSON.stringify({
                 filename,
-                script_title: scriptTitle
+                script_title: scriptTitle,
+                profile: selectedRenderProfile()
             })
         });
 
@@ -331,6 +332,22 @@ async function generateVideoFromScript(filename, scriptTitle) {
     }
 }
 
+function selectedRenderProfile() {
+    return document.getElementById('render-profile').value || null;
+}
+
+function populateRenderProfiles(config) {
+    const select = document.getElementById('render-profile');
+    const profiles = Object.keys(config.render_profiles || {});
+    if (profiles.length === 0) {
+        return;
+    }
+
+    select.innerHTML = profiles.map(name => `
+        <option value="${name}" ${name === config.default_profile ? 'selected' : ''}>${name}</option>
+    `).join('');
+}
+
 async function deleteScript(filename) {
     if (!confirm(`Delete ${filename}?`)) {
         return;
@@ -388,7 +405,7 @@ function createJobItem(job) {
             <span class="status-badge ${job.status}">${job.status.toUpperCase()}</span>
         </div>
         <div class="list-item-meta">
-            Job ID: ${job.id} | Created: ${date}
+            Job ID: ${job.id} | Created: ${date}${job.profile ? ` | Profile: ${job.profile}` : ''}
         </div>
         <div class="progress-bar">
             <div class="progress-fill" style="width: ${job.progress}%">
@@ -467,6 +484,7 @@ async function loadConfig() {
 
         if (data.success) {
             container.innerHTML = createConfigDisplay(data.config);
+            populateRenderProfiles(data.config);
         }
     } catch (error) {
         container.innerHTML = `<p class="error">Error loading config: ${error.message}</p>`;
@@ -513,6 +531,19 @@ function createConfigDisplay(config) {
             </div>
         </div>
 
+        <div class="config-section">
+            <h3>Render Profiles</h3>
+            ${Object.entries(config.render_profiles || {}).map(([name, profile]) => `
+                <div class="config-item">
+                    <span class="config-label">${name}${name === config.default_profile ? ' (default)' : ''}</span>
+                    <span class="config-value">
+                        ${profile.resolution || config.video_settings.resolution} @ ${profile.framerate || config.video_settings.framerate} fps,
+                        ${profile.preset || 'default'} preset
+                    </span>
+                </div>
+            `).join('')}
+        </div>
+
         <div class="config-section">
             <h3>Available Voice Profiles</h3>
             ${Object.entries(config.available_voices).map(([key, value]) => `
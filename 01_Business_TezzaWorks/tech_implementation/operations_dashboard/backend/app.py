@@ -3,14 +3,21 @@ TezzaWorks Operations Dashboard - Main Flask Application
 """
 from flask import Flask, jsonify
 from flask_cors import CORS
-from database import init_db, SessionLocal
+from database import init_db, SessionLocal, engine
 from routes.clients import clients_bp
 from routes.products import products_bp
 from routes.orders import orders_bp
 from routes.export import export_bp
+from routes.imports import import_bp
+from routes.metrics import metrics_bp
 import os
+import sys
 from dotenv import load_dotenv
 
+# Code shared with the other TezzaWorks apps lives in tech_implementation/tezzaworks_common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from tezzaworks_common.instrumentation import init_instrumentation, instrumentation_enabled
+
 # Load environment variables
 load_dotenv()
 
@@ -38,6 +45,12 @@ def create_app():
     app.register_blueprint(products_bp)
     app.register_blueprint(orders_bp)
     app.register_blueprint(export_bp)
+    app.register_blueprint(import_bp)
+    app.register_blueprint(metrics_bp)
+
+    # Opt-in request/SQL instrumentation (INSTRUMENTATION_ENABLED=true)
+    if instrumentation_enabled():
+        init_instrumentation(app, engine, metric_prefix='tezzaworks')
 
     # Health check endpoint
     @app.route('/')
@@ -0,0 +1,56 @@
+"""
+ASGI entry point for the Operations Dashboard
+
+Serves the same Flask app, blueprints and models behind an ASGI server, so one
+event loop per worker handles slow clients and keep-alive connections while
+request handlers run on a bounded pool of threads.
+
+Usage:
+    uvicorn asgi:app --workers 4
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+"""
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from wsgi import app as wsgi_app
+import asyncio
+import contextvars
+import os
+
+class ConcurrentWsgiToAsgi(WsgiToAsgi):
+    """
+    WsgiToAsgi that runs requests concurrently
+
+    Plain WsgiToAsgi runs every request on one shared thread. Giving each
+    request its own ThreadSensitiveContext gives it its own thread instead,
+    capped at ASGI_THREADS requests in flight per worker.
+    """
+
+    def __init__(self, wsgi_application, max_threads):
+        super().__init__(wsgi_application)
+        self.max_threads = max_threads
+        self._slots = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            # Nothing to set up, but acknowledge so servers don't log an error
+            while True:
+                message = await receive()
+                await send({'type': message['type'] + '.complete'})
+                if message['type'] == 'lifespan.shutdown':
+                    return
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_threads)
+
+        async with self._slots:
+            # Start from an empty context: uvicorn can hand a new request the
+            # context of the previous response's send, which still points
+            # asgiref at that request's (now finished) thread
+            handler = contextvars.Context().run(asyncio.ensure_future, self._handle(scope, receive, send))
+            await handler
+
+    async def _handle(self, scope, receive, send):
+        async with ThreadSensitiveContext():
+            await super().__call__(scope, receive, send)
+
+app = ConcurrentWsgiToAsgi(wsgi_app, max_threads=int(os.getenv('ASGI_THREADS', 32)))
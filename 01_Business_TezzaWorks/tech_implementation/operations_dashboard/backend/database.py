@@ -2,17 +2,25 @@
 Database configuration and initialization for TezzaWorks Operations Dashboard
 """
 from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import declarative_base, sessionmaker, scoped_session
 import os
 
 # Database configuration
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///tezzaworks.db')
 
+# Async driver used when ASYNC_DB_ENABLED=true (sqlite -> aiosqlite, postgresql -> asyncpg)
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+}
+
 # Create engine
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False} if 'sqlite' in DATABASE_URL else {},
-    echo=True  # Set to False in production
+    echo=os.getenv('SQL_ECHO', 'true').lower() == 'true'  # Set SQL_ECHO=false in production
 )
 
 # Create session factory
@@ -26,8 +34,15 @@ def init_db():
     from models.client import Client
     from models.product import Product
     from models.order import Order, OrderItem
+    from models.handoff import SyncState, DesignHandoff
 
     Base.metadata.create_all(bind=engine)
+
+    # create_all only builds indexes for new tables, so add any that are
+    # missing from tables created by an earlier version
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     print("Database initialized successfully!")
 
 def drop_db():
@@ -42,3 +57,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+_async_session_factory = None
+
+def async_db_enabled():
+    """Check whether read-heavy endpoints should use the async session"""
+    return os.getenv('ASYNC_DB_ENABLED', 'false').lower() == 'true'
+
+def get_async_session_factory():
+    """
+    Get the async session factory, creating the async engine on first use
+
+    Requires the async driver for the configured database (aiosqlite or asyncpg).
+    The URL defaults to DATABASE_URL with its driver swapped; set ASYNC_DATABASE_URL
+    to override it.
+    """
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        url = os.getenv('ASYNC_DATABASE_URL')
+        if not url:
+            scheme, _, rest = DATABASE_URL.partition('://')
+            url = f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+        # Flask runs each async view on its own event loop, so pooled
+        # connections can't be shared between requests
+        async_engine = create_async_engine(url, echo=engine.echo, poolclass=NullPool)
+        _async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+    return _async_session_factory
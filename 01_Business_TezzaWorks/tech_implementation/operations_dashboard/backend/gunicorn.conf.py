@@ -0,0 +1,30 @@
+"""
+Gunicorn worker/concurrency profile for the Operations Dashboard
+
+WSGI (default):  gunicorn -c gunicorn.conf.py wsgi:app
+ASGI:            gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+
+Tune with environment variables:
+    WEB_CONCURRENCY   worker processes (default: 2 x CPU cores + 1)
+    WORKER_THREADS    threads per gthread worker (default: 8); for ASGI
+                      workers use ASGI_THREADS instead (default: 32)
+    WORKER_TIMEOUT    seconds before a stuck worker is restarted (default: 120,
+                      long enough for large exports)
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('WORKER_CLASS', 'gthread')
+threads = int(os.getenv('WORKER_THREADS', 8))
+timeout = int(os.getenv('WORKER_TIMEOUT', 120))
+keepalive = 5
+
+# Recycle workers periodically to cap memory growth from large exports
+max_requests = 1000
+max_requests_jitter = 100
+
+# Don't preload: the SQLAlchemy engine must be created after forking so
+# workers don't share database connections
+preload_app = False
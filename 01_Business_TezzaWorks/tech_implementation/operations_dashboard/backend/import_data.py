@@ -0,0 +1,65 @@
+"""
+Command-line bulk import of clients and products from CSV files
+
+Usage:
+    python import_data.py clients trade_show_leads.csv --default-source trade_show
+    python import_data.py products catalog.csv --dry-run
+"""
+import argparse
+import json
+import sys
+from database import SessionLocal, init_db
+from models.client import AcquisitionSource
+from utils.csv_importer import IMPORTERS, RowError, parse_enum
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import clients or products from CSV')
+    parser.add_argument('entity', choices=sorted(IMPORTERS.keys()), help='What the CSV contains')
+    parser.add_argument('csv_file', help='Path to the CSV file')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Rows per database batch')
+    parser.add_argument('--skip-existing', action='store_true',
+                        help='Leave existing records untouched instead of updating them')
+    parser.add_argument('--dry-run', action='store_true', help='Validate without writing to the database')
+    parser.add_argument('--default-source', help='Acquisition source for new clients without one')
+    parser.add_argument('--json', action='store_true', help='Print the full report as JSON')
+    args = parser.parse_args()
+
+    options = {
+        'chunk_size': args.chunk_size,
+        'update_existing': not args.skip_existing,
+        'dry_run': args.dry_run,
+    }
+    if args.default_source:
+        if args.entity != 'clients':
+            parser.error('--default-source only applies to client imports')
+        try:
+            options['default_source'] = parse_enum(AcquisitionSource, args.default_source, 'default source')
+        except RowError as e:
+            parser.error(str(e))
+
+    init_db()
+    db = SessionLocal()
+    try:
+        with open(args.csv_file, newline='', encoding='utf-8-sig') as f:
+            report = IMPORTERS[args.entity](db, **options).run(f).to_dict()
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        prefix = '[dry run] ' if args.dry_run else ''
+        print(f"\n{prefix}Imported {report['total_rows']} rows in {report['elapsed_seconds']}s")
+        print(f"  Created: {report['created']}")
+        print(f"  Updated: {report['updated']}")
+        print(f"  Skipped: {report['skipped']}")
+        print(f"  Errors:  {report['error_count']}")
+        for error in report['errors'][:20]:
+            print(f"    row {error['row']}: {error['error']}")
+        if report['error_count'] > 20:
+            print(f"    ... and {report['error_count'] - 20} more (use --json for the full report)")
+
+    return 1 if report['error_count'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
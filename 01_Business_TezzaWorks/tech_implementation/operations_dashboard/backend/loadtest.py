@@ -0,0 +1,161 @@
+"""
+Load test simulating concurrent dashboard users
+
+Each simulated user loops through the requests the dashboard pages make
+(kanban board, analytics, client and product lists, low-stock alerts) with a
+short think time between page loads, over its own keep-alive connection.
+
+Usage:
+    python loadtest.py --url http://localhost:5000 --users 200 --duration 60
+    python loadtest.py --url http://localhost:5000 --json > results.json
+"""
+from collections import defaultdict
+from urllib.parse import urlsplit
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+
+# (weight, path) pairs roughly matching how often each dashboard view is loaded
+DASHBOARD_REQUESTS = [
+    (3, '/api/orders/kanban'),
+    (2, '/api/orders/analytics'),
+    (2, '/api/clients/'),
+    (2, '/api/products/'),
+    (1, '/api/products/low-stock'),
+    (1, '/api/clients/follow-ups'),
+]
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class LoadTest:
+    """Runs simulated users against a server and aggregates latencies"""
+
+    def __init__(self, url, users, duration, ramp_up, think_time, timeout=30):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.users = users
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.timeout = timeout
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+        self._paths = [path for weight, path in DASHBOARD_REQUESTS for _ in range(weight)]
+
+    def _connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _user(self, stop_at):
+        conn = self._connect()
+        rng = random.Random()
+        while time.monotonic() < stop_at:
+            path = rng.choice(self._paths)
+            start = time.perf_counter()
+            for attempt in range(2):
+                try:
+                    conn.request('GET', path)
+                    response = conn.getresponse()
+                    response.read()
+                    ok = response.status < 500
+                    break
+                except (OSError, http.client.HTTPException):
+                    # Like a browser, retry once on a fresh connection when the
+                    # server closed an idle keep-alive one (e.g. worker recycling)
+                    ok = False
+                    conn.close()
+                    conn = self._connect()
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                if ok:
+                    self.latencies[path].append(elapsed)
+                else:
+                    self.errors[path] += 1
+
+            if self.think_time:
+                time.sleep(rng.uniform(0, 2 * self.think_time))
+        conn.close()
+
+    def run(self):
+        start = time.monotonic()
+        stop_at = start + self.ramp_up + self.duration
+        threads = []
+        for i in range(self.users):
+            thread = threading.Thread(target=self._user, args=(stop_at,), daemon=True)
+            thread.start()
+            threads.append(thread)
+            if self.ramp_up:
+                time.sleep(self.ramp_up / self.users)
+
+        # Only count requests made once every user is running
+        with self._lock:
+            self.latencies.clear()
+            self.errors.clear()
+        measured_from = time.monotonic()
+
+        for thread in threads:
+            thread.join()
+        return self.report(time.monotonic() - measured_from)
+
+    def report(self, elapsed):
+        all_latencies = sorted(l for values in self.latencies.values() for l in values)
+        total = len(all_latencies)
+        endpoints = {}
+        for path, values in sorted(self.latencies.items()):
+            values.sort()
+            endpoints[path] = {
+                'requests': len(values),
+                'errors': self.errors.get(path, 0),
+                'p50_ms': round(percentile(values, 50) * 1000, 1),
+                'p95_ms': round(percentile(values, 95) * 1000, 1),
+            }
+        return {
+            'users': self.users,
+            'duration_seconds': round(elapsed, 1),
+            'requests': total,
+            'errors': sum(self.errors.values()),
+            'requests_per_second': round(total / elapsed, 1) if elapsed else 0,
+            'p50_ms': round(percentile(all_latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(all_latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(all_latencies, 99) * 1000, 1),
+            'endpoints': endpoints,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Operations Dashboard API')
+    parser.add_argument('--url', default='http://localhost:5000', help='Base URL of the running API')
+    parser.add_argument('--users', type=int, default=200, help='Concurrent simulated users')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to measure after ramp-up')
+    parser.add_argument('--ramp-up', type=float, default=10, help='Seconds over which users start')
+    parser.add_argument('--think-time', type=float, default=0.5,
+                        help='Average seconds a user waits between requests')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    report = LoadTest(args.url, args.users, args.duration, args.ramp_up, args.think_time).run()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"\n{report['users']} users for {report['duration_seconds']}s against {args.url}")
+    print(f"  Requests:   {report['requests']} ({report['requests_per_second']} req/s)")
+    print(f"  Errors:     {report['errors']}")
+    print(f"  Latency:    p50 {report['p50_ms']}ms  p95 {report['p95_ms']}ms  p99 {report['p99_ms']}ms")
+    for path, stats in report['endpoints'].items():
+        print(f"    {path:<28} {stats['requests']:>7} req  p50 {stats['p50_ms']:>7}ms  "
+              f"p95 {stats['p95_ms']:>7}ms  errors {stats['errors']}")
+    return 1 if report['errors'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
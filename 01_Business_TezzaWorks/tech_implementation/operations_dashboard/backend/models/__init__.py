@@ -4,6 +4,7 @@ Models package initialization
 from models.client import Client, ClientInteraction, AcquisitionSource
 from models.product import Product, ProductCategory
 from models.order import Order, OrderItem, OrderStatus
+from models.handoff import SyncState, DesignHandoff
 
 __all__ = [
     'Client',
@@ -14,4 +15,6 @@ __all__ = [
     'Order',
     'OrderItem',
     'OrderStatus',
+    'SyncState',
+    'DesignHandoff',
 ]
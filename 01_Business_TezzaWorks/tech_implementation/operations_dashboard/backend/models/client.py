@@ -1,7 +1,7 @@
 """
 Client model for CRM functionality
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Index, event, update
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -42,7 +42,7 @@ class Client(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_contact_date = Column(DateTime)
-    next_follow_up = Column(DateTime)
+    next_follow_up = Column(DateTime, index=True)  # Indexed for the follow-up queue
 
     # Relationships
     orders = relationship("Order", back_populates="client", cascade="all, delete-orphan")
@@ -78,7 +78,7 @@ class ClientInteraction(Base):
     __tablename__ = 'client_interactions'
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, nullable=False, index=True)
+    client_id = Column(Integer, ForeignKey('clients.id'), nullable=False)
     interaction_type = Column(String(50))  # email, call, meeting, quote, follow_up
     subject = Column(String(200))
     notes = Column(Text)
@@ -86,10 +86,13 @@ class ClientInteraction(Base):
     created_by = Column(String(100))
 
     # Relationships
-    from sqlalchemy import ForeignKey
-    client_id = Column(Integer, ForeignKey('clients.id'), nullable=False)
     client = relationship("Client", back_populates="interactions")
 
+    # Serves both the per-client timeline and the latest-interaction lookup
+    __table_args__ = (
+        Index('ix_client_interactions_client_date', 'client_id', 'interaction_date'),
+    )
+
     def __repr__(self):
         return f"<ClientInteraction(id={self.id}, type={self.interaction_type})>"
 
@@ -103,3 +106,19 @@ class ClientInteraction(Base):
             'interaction_date': self.interaction_date.isoformat() if self.interaction_date else None,
             'created_by': self.created_by,
         }
+
+
+@event.listens_for(ClientInteraction, 'after_insert')
+def update_last_contact_date(mapper, connection, target):
+    """Keep Client.last_contact_date at the most recent interaction date"""
+    if target.interaction_date is None:
+        return
+    connection.execute(
+        update(Client.__table__)
+        .where(Client.__table__.c.id == target.client_id)
+        .where(
+            (Client.__table__.c.last_contact_date.is_(None)) |
+            (Client.__table__.c.last_contact_date < target.interaction_date)
+        )
+        .values(last_contact_date=target.interaction_date)
+    )
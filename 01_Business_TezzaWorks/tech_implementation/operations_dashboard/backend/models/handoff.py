@@ -0,0 +1,39 @@
+"""
+Bookkeeping for the design-to-order handoff from the personalization platform
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from database import Base
+
+class SyncState(Base):
+    """High-water mark of an incremental sync job"""
+    __tablename__ = 'sync_state'
+
+    name = Column(String(50), primary_key=True)
+    watermark = Column(Integer, nullable=False, default=0)
+    last_run_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<SyncState(name={self.name}, watermark={self.watermark})>"
+
+
+class DesignHandoff(Base):
+    """Links a personalization-platform design request to the order created for it"""
+    __tablename__ = 'design_handoffs'
+
+    id = Column(Integer, primary_key=True, index=True)
+    design_request_id = Column(Integer, unique=True, nullable=False, index=True)
+    client_id = Column(Integer, ForeignKey('clients.id'), nullable=False, index=True)
+    order_id = Column(Integer, ForeignKey('orders.id'), nullable=False, index=True)
+
+    # Feedback revision reflected in the order
+    revision = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    order = relationship("Order")
+
+    def __repr__(self):
+        return f"<DesignHandoff(request={self.design_request_id}, order={self.order_id})>"
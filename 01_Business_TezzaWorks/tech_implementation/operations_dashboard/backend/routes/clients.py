@@ -2,10 +2,11 @@
 Client routes for CRM functionality
 """
 from flask import Blueprint, request, jsonify
+from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from models.client import Client, ClientInteraction, AcquisitionSource
-from datetime import datetime
+from datetime import datetime, timedelta
 
 clients_bp = Blueprint('clients', __name__, url_prefix='/api/clients')
 
@@ -46,6 +47,62 @@ def get_clients():
     finally:
         db.close()
 
+@clients_bp.route('/follow-ups', methods=['GET'])
+def get_follow_up_queue():
+    """Get clients due for follow-up, most overdue first, with their last interaction"""
+    db = get_db()
+    try:
+        # Include follow-ups due within the next N days (0 = due now or overdue)
+        days_ahead = int(request.args.get('days', 0))
+        limit = min(int(request.args.get('limit', 50)), 200)
+        offset = int(request.args.get('offset', 0))
+        now = datetime.utcnow()
+        cutoff = now + timedelta(days=days_ahead)
+
+        # Index seek on (client_id, interaction_date) per due client
+        latest_interaction_id = (
+            select(ClientInteraction.id)
+            .where(ClientInteraction.client_id == Client.id)
+            .order_by(ClientInteraction.interaction_date.desc(), ClientInteraction.id.desc())
+            .limit(1)
+            .correlate(Client)
+            .scalar_subquery()
+        )
+
+        rows = db.query(Client, ClientInteraction).outerjoin(
+            ClientInteraction, ClientInteraction.id == latest_interaction_id
+        ).filter(
+            Client.next_follow_up.isnot(None),
+            Client.next_follow_up <= cutoff
+        ).order_by(
+            Client.next_follow_up.asc(), Client.id.asc()
+        ).offset(offset).limit(limit + 1).all()
+
+        items = []
+        for client, interaction in rows[:limit]:
+            client_dict = client.to_dict()
+            client_dict['overdue'] = client.next_follow_up < now
+            client_dict['last_interaction'] = {
+                'interaction_type': interaction.interaction_type,
+                'subject': interaction.subject,
+                'interaction_date': interaction.interaction_date.isoformat() if interaction.interaction_date else None,
+            } if interaction else None
+            items.append(client_dict)
+
+        return jsonify({
+            'items': items,
+            'has_more': len(rows) > limit,
+            'offset': offset,
+            'limit': limit,
+        }), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        db.close()
+
 @clients_bp.route('/<int:client_id>', methods=['GET'])
 def get_client(client_id):
     """Get a specific client by ID"""
@@ -195,6 +252,66 @@ def get_client_interactions(client_id):
     finally:
         db.close()
 
+@clients_bp.route('/<int:client_id>/timeline', methods=['GET'])
+def get_client_timeline(client_id):
+    """Get a page of a client's interactions, newest first"""
+    db = get_db()
+    try:
+        limit = min(int(request.args.get('limit', 20)), 100)
+        before = request.args.get('before', '')
+        interaction_type = request.args.get('type', '')
+
+        if not db.query(Client.id).filter(Client.id == client_id).first():
+            return jsonify({'error': 'Client not found'}), 404
+
+        query = db.query(ClientInteraction).filter(ClientInteraction.client_id == client_id)
+
+        if interaction_type:
+            query = query.filter(ClientInteraction.interaction_type == interaction_type)
+
+        # Keyset pagination: the cursor is "<interaction_date>_<id>" of the last row seen,
+        # or "_<id>" once paging has reached the undated interactions, which sort last
+        if before:
+            cursor_date, _, cursor_id = before.rpartition('_')
+            cursor_id = int(cursor_id)
+            if cursor_date:
+                cursor_date = datetime.fromisoformat(cursor_date)
+                query = query.filter(or_(
+                    ClientInteraction.interaction_date < cursor_date,
+                    and_(ClientInteraction.interaction_date == cursor_date, ClientInteraction.id < cursor_id),
+                    ClientInteraction.interaction_date.is_(None)
+                ))
+            else:
+                query = query.filter(
+                    ClientInteraction.interaction_date.is_(None), ClientInteraction.id < cursor_id
+                )
+
+        interactions = query.order_by(
+            ClientInteraction.interaction_date.is_(None),
+            ClientInteraction.interaction_date.desc(),
+            ClientInteraction.id.desc()
+        ).limit(limit + 1).all()
+
+        page = interactions[:limit]
+        has_more = len(interactions) > limit
+        next_cursor = None
+        if has_more:
+            last = page[-1]
+            next_cursor = f"{last.interaction_date.isoformat() if last.interaction_date else ''}_{last.id}"
+
+        return jsonify({
+            'items': [interaction.to_dict() for interaction in page],
+            'has_more': has_more,
+            'next_cursor': next_cursor,
+        }), 200
+
+    except ValueError as e:
+        return jsonify({'error': f'Invalid pagination parameter: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        db.close()
+
 @clients_bp.route('/<int:client_id>/interactions', methods=['POST'])
 def create_interaction(client_id):
     """Create a new interaction for a client"""
@@ -216,9 +333,7 @@ def create_interaction(client_id):
             interaction_date=datetime.fromisoformat(data['interaction_date']) if data.get('interaction_date') else datetime.utcnow()
         )
 
-        # Update client's last contact date
-        client.last_contact_date = interaction.interaction_date
-
+        # Client.last_contact_date is maintained by the ClientInteraction insert hook
         db.add(interaction)
         db.commit()
         db.refresh(interaction)
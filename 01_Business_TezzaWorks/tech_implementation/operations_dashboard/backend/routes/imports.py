@@ -0,0 +1,60 @@
+"""
+Import routes for bulk loading clients and products from CSV
+"""
+from flask import Blueprint, request, jsonify
+from database import SessionLocal
+from models.client import AcquisitionSource
+from utils.csv_importer import IMPORTERS, ClientImporter, RowError, parse_enum
+import io
+
+import_bp = Blueprint('import', __name__, url_prefix='/api/import')
+
+def get_db():
+    db = SessionLocal()
+    try:
+        return db
+    finally:
+        pass
+
+@import_bp.route('/<entity>', methods=['POST'])
+def import_csv(entity):
+    """Import clients or products from an uploaded CSV file"""
+    importer_cls = IMPORTERS.get(entity)
+    if not importer_cls:
+        return jsonify({'error': f"Unknown import type: {entity}"}), 404
+
+    if 'file' not in request.files or not request.files['file'].filename:
+        return jsonify({'error': 'A CSV file is required'}), 400
+
+    db = get_db()
+    try:
+        options = {
+            'chunk_size': request.args.get('chunk_size', type=int),
+            'update_existing': request.args.get('update_existing', 'true').lower() == 'true',
+            'dry_run': request.args.get('dry_run', 'false').lower() == 'true',
+        }
+        if importer_cls is ClientImporter and request.args.get('default_source'):
+            try:
+                options['default_source'] = parse_enum(AcquisitionSource, request.args['default_source'], 'default_source')
+            except RowError as e:
+                return jsonify({'error': str(e)}), 400
+
+        # Werkzeug spools large uploads to disk, so wrapping the stream keeps
+        # memory flat while the importer reads it chunk by chunk
+        upload = request.files['file']
+        text_stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+
+        report = importer_cls(db, **options).run(text_stream)
+        result = report.to_dict()
+        result['dry_run'] = options['dry_run']
+
+        return jsonify(result), 200
+
+    except UnicodeDecodeError:
+        db.rollback()
+        return jsonify({'error': 'File must be UTF-8 encoded CSV'}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        db.close()
@@ -0,0 +1,50 @@
+"""
+Admin metrics routes exposing request and query instrumentation
+"""
+from flask import Blueprint, Response, current_app, jsonify, request
+import os
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/admin/metrics')
+
+@metrics_bp.before_request
+def require_metrics_token():
+    """Require the METRICS_TOKEN bearer token; without one configured the endpoints stay closed"""
+    token = os.getenv('METRICS_TOKEN')
+    if not token:
+        return jsonify({'error': 'Metrics access requires METRICS_TOKEN to be configured'}), 403
+    if request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+def get_store():
+    return current_app.extensions.get('instrumentation')
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """Get per-endpoint timings, slow queries and profile summaries"""
+    store = get_store()
+    if store is None:
+        return jsonify({'error': 'Instrumentation is disabled'}), 404
+
+    return jsonify(store.snapshot()), 200
+
+@metrics_bp.route('/prometheus', methods=['GET'])
+def get_prometheus_metrics():
+    """Get metrics in the Prometheus text exposition format"""
+    store = get_store()
+    if store is None:
+        return jsonify({'error': 'Instrumentation is disabled'}), 404
+
+    return Response(store.prometheus(), mimetype='text/plain; version=0.0.4')
+
+@metrics_bp.route('/profiles/<int:index>', methods=['GET'])
+def get_profile(index):
+    """Download a slow-request profile as folded stacks for flamegraph tools"""
+    store = get_store()
+    if store is None:
+        return jsonify({'error': 'Instrumentation is disabled'}), 404
+
+    profiles = list(store.profiles)
+    if index < 0 or index >= len(profiles):
+        return jsonify({'error': 'Profile not found'}), 404
+
+    return Response(profiles[index]['folded'], mimetype='text/plain')
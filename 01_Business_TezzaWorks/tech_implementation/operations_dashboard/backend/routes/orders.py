@@ -3,13 +3,15 @@ Order routes for order management system
 """
 from flask import Blueprint, request, jsonify
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from database import SessionLocal
+from sqlalchemy import func, extract, select
+from database import SessionLocal, async_db_enabled, get_async_session_factory
 from models.order import Order, OrderItem, OrderStatus
 from models.product import Product
 from models.client import Client
 from utils.pricing_calculator import PricingCalculator
+from utils.quote_cache import normalize_quote_request, pricing_version, quote_fingerprint, quote_cache
 from datetime import datetime, timedelta
+import asyncio
 
 orders_bp = Blueprint('orders', __name__, url_prefix='/api/orders')
 
@@ -98,8 +100,15 @@ def create_order():
     try:
         data = request.get_json()
 
+        # An order can be converted from a cached quote instead of listing items
+        quote_entry = None
+        if data.get('quote_fingerprint'):
+            quote_entry = quote_cache.get(data['quote_fingerprint'])
+            if quote_entry is None and not data.get('items'):
+                return jsonify({'error': 'Quote not found or expired, please request a new quote'}), 404
+
         # Validate required fields
-        if not data.get('client_id') or not data.get('items'):
+        if not data.get('client_id') or not (data.get('items') or quote_entry):
             return jsonify({'error': 'Client ID and items are required'}), 400
 
         # Verify client exists
@@ -124,12 +133,28 @@ def create_order():
             discount_percentage=float(data.get('discount_percentage', 0.0)),
         )
 
+        if quote_entry:
+            # Pricing terms come from the quote the client agreed to
+            order.shipping_cost = quote_entry['request']['shipping_cost']
+            order.tax_rate = quote_entry['request']['tax_rate']
+            order.discount_percentage = quote_entry['request']['discount_percentage']
+            items_data = quote_entry['request']['items']
+        else:
+            items_data = data['items']
+
         # Generate order number
         order.order_number = order.generate_order_number()
 
+        products = load_products(db, [item_data['product_id'] for item_data in items_data])
+
+        if quote_entry:
+            for product_id, version in quote_entry['pricing_versions'].items():
+                if product_id not in products or pricing_version(products[product_id]) != version:
+                    return jsonify({'error': 'Product pricing changed since this quote, please request a new quote'}), 409
+
         # Add items
-        for item_data in data['items']:
-            product = db.query(Product).filter(Product.id == item_data['product_id']).first()
+        for index, item_data in enumerate(items_data):
+            product = products.get(int(item_data['product_id']))
             if not product:
                 return jsonify({'error': f"Product {item_data['product_id']} not found"}), 404
 
@@ -137,13 +162,16 @@ def create_order():
             quantity = int(item_data['quantity'])
             has_customization = item_data.get('has_logo', False) or item_data.get('has_personalization', False)
 
-            unit_price = PricingCalculator.calculate_unit_price(
-                base_cost=product.base_cost,
-                overhead_percentage=product.overhead_percentage,
-                quantity=quantity,
-                has_customization=has_customization,
-                customization_cost=product.customization_cost if has_customization else 0.0
-            )
+            if quote_entry:
+                unit_price = quote_entry['quote']['items'][index]['unit_price']
+            else:
+                unit_price = PricingCalculator.calculate_unit_price(
+                    base_cost=product.base_cost,
+                    overhead_percentage=product.overhead_percentage,
+                    quantity=quantity,
+                    has_customization=has_customization,
+                    customization_cost=product.customization_cost if has_customization else 0.0
+                )
 
             # Create order item
             order_item = OrderItem(
@@ -306,133 +334,183 @@ def get_kanban_board():
     finally:
         db.close()
 
+def analytics_statements(start_date=None, end_date=None):
+    """Build the independent aggregate queries behind the analytics endpoint"""
+    date_filters = []
+    if start_date:
+        date_filters.append(Order.order_date >= start_date)
+    if end_date:
+        date_filters.append(Order.order_date <= end_date)
+
+    # Order counts and revenue per status
+    status_totals = select(
+        Order.status,
+        func.count(Order.id).label('order_count'),
+        func.coalesce(func.sum(Order.total_amount), 0).label('revenue')
+    ).where(*date_filters).group_by(Order.status)
+
+    # Top products
+    top_products = select(
+        Product.name,
+        func.sum(OrderItem.quantity).label('total_quantity'),
+        func.sum(OrderItem.line_total).label('total_revenue')
+    ).join(OrderItem, OrderItem.product_id == Product.id).join(
+        Order, Order.id == OrderItem.order_id
+    ).where(*date_filters).group_by(Product.name).order_by(
+        func.sum(OrderItem.quantity).desc()
+    ).limit(5)
+
+    # Monthly revenue trend (last 6 months)
+    six_months_ago = datetime.utcnow() - timedelta(days=180)
+    monthly_revenue = select(
+        extract('year', Order.order_date).label('year'),
+        extract('month', Order.order_date).label('month'),
+        func.sum(Order.total_amount).label('revenue')
+    ).where(
+        Order.order_date >= six_months_ago
+    ).group_by('year', 'month').order_by('year', 'month')
+
+    return status_totals, top_products, monthly_revenue
+
+def build_analytics(status_totals, top_products, monthly_revenue):
+    """Shape the analytics query results into the API response"""
+    revenue_by_status = {}
+    orders_by_status = {}
+    for row in status_totals:
+        revenue_by_status[row.status.value] = float(row.revenue)
+        orders_by_status[row.status.value] = row.order_count
+
+    total_orders = sum(orders_by_status.values())
+    total_revenue = sum(revenue_by_status.values())
+    avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
+
+    return {
+        'total_orders': total_orders,
+        'total_revenue': round(total_revenue, 2),
+        'average_order_value': round(avg_order_value, 2),
+        'revenue_by_status': {k: round(v, 2) for k, v in revenue_by_status.items()},
+        'orders_by_status': orders_by_status,
+        'top_products': [
+            {
+                'name': p.name,
+                'quantity': int(p.total_quantity),
+                'revenue': round(float(p.total_revenue), 2)
+            }
+            for p in top_products
+        ],
+        'monthly_revenue': [
+            {
+                'year': int(m.year),
+                'month': int(m.month),
+                'revenue': round(float(m.revenue), 2)
+            }
+            for m in monthly_revenue
+        ]
+    }
+
+async def run_analytics_async(statements):
+    """Run the analytics queries concurrently, one async session each"""
+    session_factory = get_async_session_factory()
+
+    async def fetch(statement):
+        async with session_factory() as session:
+            return (await session.execute(statement)).all()
+
+    return await asyncio.gather(*(fetch(statement) for statement in statements))
+
 @orders_bp.route('/analytics', methods=['GET'])
-def get_analytics():
+async def get_analytics():
     """Get order analytics and key metrics"""
-    db = get_db()
     try:
         # Date range parameters
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
 
-        query = db.query(Order)
-
-        if start_date:
-            query = query.filter(Order.order_date >= datetime.fromisoformat(start_date))
-        if end_date:
-            query = query.filter(Order.order_date <= datetime.fromisoformat(end_date))
-
-        orders = query.all()
-
-        # Calculate metrics
-        total_orders = len(orders)
-        total_revenue = sum(order.total_amount for order in orders)
-        avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
+        statements = analytics_statements(
+            datetime.fromisoformat(start_date) if start_date else None,
+            datetime.fromisoformat(end_date) if end_date else None
+        )
 
-        # Revenue by status
-        revenue_by_status = {}
-        orders_by_status = {}
-        for order in orders:
-            status = order.status.value
-            revenue_by_status[status] = revenue_by_status.get(status, 0) + order.total_amount
-            orders_by_status[status] = orders_by_status.get(status, 0) + 1
-
-        # Top products
-        from sqlalchemy import func
-        top_products = db.query(
-            Product.name,
-            func.sum(OrderItem.quantity).label('total_quantity'),
-            func.sum(OrderItem.line_total).label('total_revenue')
-        ).join(OrderItem).join(Order).filter(
-            Order.order_date >= datetime.fromisoformat(start_date) if start_date else True,
-            Order.order_date <= datetime.fromisoformat(end_date) if end_date else True
-        ).group_by(Product.name).order_by(func.sum(OrderItem.quantity).desc()).limit(5).all()
-
-        # Monthly revenue trend (last 6 months)
-        six_months_ago = datetime.utcnow() - timedelta(days=180)
-        monthly_revenue = db.query(
-            extract('year', Order.order_date).label('year'),
-            extract('month', Order.order_date).label('month'),
-            func.sum(Order.total_amount).label('revenue')
-        ).filter(
-            Order.order_date >= six_months_ago
-        ).group_by('year', 'month').order_by('year', 'month').all()
-
-        analytics = {
-            'total_orders': total_orders,
-            'total_revenue': round(total_revenue, 2),
-            'average_order_value': round(avg_order_value, 2),
-            'revenue_by_status': {k: round(v, 2) for k, v in revenue_by_status.items()},
-            'orders_by_status': orders_by_status,
-            'top_products': [
-                {
-                    'name': p.name,
-                    'quantity': int(p.total_quantity),
-                    'revenue': round(float(p.total_revenue), 2)
-                }
-                for p in top_products
-            ],
-            'monthly_revenue': [
-                {
-                    'year': int(m.year),
-                    'month': int(m.month),
-                    'revenue': round(float(m.revenue), 2)
-                }
-                for m in monthly_revenue
-            ]
-        }
+        if async_db_enabled():
+            results = await run_analytics_async(statements)
+        else:
+            db = get_db()
+            try:
+                results = [db.execute(statement).all() for statement in statements]
+            finally:
+                db.close()
 
-        return jsonify(analytics), 200
+        return jsonify(build_analytics(*results)), 200
 
+    except ValueError as e:
+        return jsonify({'error': f'Invalid date: {e}'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
+
+def load_products(db, product_ids):
+    """Load products by id with a single query"""
+    return {
+        product.id: product
+        for product in db.query(Product).filter(Product.id.in_(set(product_ids))).all()
+    }
 
 @orders_bp.route('/quote', methods=['POST'])
 def generate_quote():
     """Generate a quote without creating an order"""
+    db = get_db()
     try:
         data = request.get_json()
 
         if not data.get('items'):
             return jsonify({'error': 'Items are required'}), 400
 
-        # Prepare items for pricing calculator
-        items = []
-        db = get_db()
-
-        for item_data in data['items']:
-            product = db.query(Product).filter(Product.id == item_data['product_id']).first()
-            if not product:
-                db.close()
-                return jsonify({'error': f"Product {item_data['product_id']} not found"}), 404
-
-            has_logo = item_data.get('has_logo', False)
-            has_personalization = item_data.get('has_personalization', False)
-
-            items.append({
-                'name': product.name,
-                'base_cost': product.base_cost,
-                'overhead_percentage': product.overhead_percentage,
-                'labor_hours': product.labor_hours,
-                'quantity': item_data['quantity'],
-                'has_logo': has_logo,
-                'has_personalization': has_personalization,
-                'customization_cost': product.customization_cost if (has_logo or has_personalization) else 0.0,
-            })
-
-        db.close()
-
-        # Generate quote
-        quote = PricingCalculator.generate_quote(
-            items=items,
-            discount_percentage=float(data.get('discount_percentage', 0.0)),
-            tax_rate=float(data.get('tax_rate', 8.5)),
-            shipping_cost=float(data.get('shipping_cost', 0.0))
-        )
+        try:
+            quote_request = normalize_quote_request(data)
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+
+        products = load_products(db, [item['product_id'] for item in quote_request['items']])
+        for item in quote_request['items']:
+            if item['product_id'] not in products:
+                return jsonify({'error': f"Product {item['product_id']} not found"}), 404
+
+        pricing_versions = {product_id: pricing_version(product) for product_id, product in products.items()}
+        fingerprint = quote_fingerprint(quote_request, pricing_versions)
+
+        cached = quote_cache.get(fingerprint)
+        if cached:
+            quote = cached['quote']
+        else:
+            # Prepare items for pricing calculator
+            items = []
+            for item in quote_request['items']:
+                product = products[item['product_id']]
+                has_customization = item['has_logo'] or item['has_personalization']
+                items.append({
+                    'name': product.name,
+                    'base_cost': product.base_cost,
+                    'overhead_percentage': product.overhead_percentage,
+                    'labor_hours': product.labor_hours,
+                    'quantity': item['quantity'],
+                    'has_logo': item['has_logo'],
+                    'has_personalization': item['has_personalization'],
+                    'customization_cost': product.customization_cost if has_customization else 0.0,
+                })
+
+            # Generate quote
+            quote = PricingCalculator.generate_quote(
+                items=items,
+                discount_percentage=quote_request['discount_percentage'],
+                tax_rate=quote_request['tax_rate'],
+                shipping_cost=quote_request['shipping_cost']
+            )
+            quote_cache.put(fingerprint, quote_request, pricing_versions, quote)
 
-        return jsonify(quote), 200
+        response = jsonify(dict(quote, quote_fingerprint=fingerprint))
+        response.headers['X-Quote-Cache'] = 'hit' if cached else 'miss'
+        return response, 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        db.close()
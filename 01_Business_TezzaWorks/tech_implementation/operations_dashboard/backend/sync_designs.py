@@ -0,0 +1,60 @@
+"""
+Command-line design-to-order handoff from the personalization platform
+
+Creates a quote for every design request a client has approved since the last
+run, upserting the client by email. Safe to run repeatedly, e.g. from cron.
+
+Usage:
+    PERSONALIZATION_DATABASE_URL=sqlite:////srv/personalization/instance/tezzaworks.db python sync_designs.py
+    python sync_designs.py --source sqlite:///../../personalization_platform/instance/tezzaworks.db --dry-run
+"""
+import argparse
+import json
+import sys
+from database import SessionLocal, init_db
+from utils.design_handoff import DesignHandoffJob, create_source_engine
+
+def main():
+    parser = argparse.ArgumentParser(description='Create quote orders for approved personalization designs')
+    parser.add_argument('--source', help='Personalization platform database URL '
+                                         '(default: PERSONALIZATION_DATABASE_URL)')
+    parser.add_argument('--batch-size', type=int, default=None, help='Approvals per database batch')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    parser.add_argument('--reset', action='store_true',
+                        help='Re-check every approval instead of starting after the last run')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    try:
+        source_engine = create_source_engine(args.source)
+    except ValueError as e:
+        parser.error(str(e))
+
+    init_db()
+    db = SessionLocal()
+    try:
+        job = DesignHandoffJob(db, source_engine, batch_size=args.batch_size, dry_run=args.dry_run)
+        if args.reset and not args.dry_run:
+            job.reset()
+        report = job.run().to_dict()
+    finally:
+        db.close()
+        source_engine.dispose()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        prefix = '[dry run] ' if args.dry_run else ''
+        print(f"\n{prefix}Processed {report['approvals']} approvals in {report['elapsed_seconds']}s")
+        print(f"  Clients created: {report['clients_created']}")
+        print(f"  Clients updated: {report['clients_updated']}")
+        print(f"  Orders created:  {report['orders_created']}")
+        print(f"  Orders updated:  {report['orders_updated']}")
+        print(f"  Withdrawn:       {report['withdrawn']} (quotes whose designs were all deselected)")
+        print(f"  Skipped:         {report['skipped']} (already past the quote stage)")
+        print(f"  Watermark:       {report['watermark_from']} -> {report['watermark_to']}")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
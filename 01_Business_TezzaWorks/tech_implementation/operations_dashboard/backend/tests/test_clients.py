@@ -99,3 +99,106 @@ def test_delete_client(seeded_client):
     # Verify the client was actually deleted
     get_response = seeded_client.get(f'/api/clients/{first_client_id}')
     assert get_response.status_code == 404
+
+def test_client_timeline_pagination(client):
+    """
+    GIVEN a Flask application configured for testing
+    WHEN the '/api/clients/<id>/timeline' endpoint is paged through with next_cursor
+    THEN check that interactions come back newest first without gaps or repeats
+    """
+    client_id = client.post('/api/clients/', json={
+        "company_name": "Timeline Co", "contact_person": "Tina Line", "email": "tina@timeline.com"
+    }).json['id']
+    for day in range(1, 6):
+        response = client.post(f'/api/clients/{client_id}/interactions', json={
+            "interaction_type": "email",
+            "subject": f"Touch {day}",
+            "interaction_date": f"2024-01-0{day}T09:00:00"
+        })
+        assert response.status_code == 201
+
+    first_page = client.get(f'/api/clients/{client_id}/timeline', query_string={'limit': 2}).json
+    assert [item['subject'] for item in first_page['items']] == ['Touch 5', 'Touch 4']
+    assert first_page['has_more'] is True
+
+    subjects = []
+    cursor = first_page['next_cursor']
+    while cursor:
+        page = client.get(f'/api/clients/{client_id}/timeline',
+                          query_string={'limit': 2, 'before': cursor}).json
+        subjects.extend(item['subject'] for item in page['items'])
+        cursor = page['next_cursor']
+    assert subjects == ['Touch 3', 'Touch 2', 'Touch 1']
+
+    # Older interactions logged later must not move last_contact_date backwards
+    assert client.get(f'/api/clients/{client_id}').json['last_contact_date'].startswith('2024-01-05')
+
+    assert client.get('/api/clients/999/timeline').status_code == 404
+    assert client.get(f'/api/clients/{client_id}/timeline', query_string={'before': 'bogus'}).status_code == 400
+
+def test_client_timeline_undated_interactions(client, db):
+    """
+    GIVEN a client with dated interactions and imported interactions without a date
+    WHEN the '/api/clients/<id>/timeline' endpoint is paged through with next_cursor
+    THEN check that the undated interactions come last and every page links to the next
+    """
+    from models.client import ClientInteraction
+
+    client_id = client.post('/api/clients/', json={
+        "company_name": "Undated Co", "contact_person": "Una Dated", "email": "una@undated.com"
+    }).json['id']
+    for day in range(1, 3):
+        client.post(f'/api/clients/{client_id}/interactions', json={
+            "interaction_type": "email", "subject": f"Dated {day}", "interaction_date": f"2024-01-0{day}T09:00:00"
+        })
+    for number in range(1, 4):
+        db.add(ClientInteraction(client_id=client_id, interaction_type='note', subject=f"Undated {number}"))
+    db.commit()
+    # The column default fills in a date on insert, so clear it afterwards
+    db.query(ClientInteraction).filter(ClientInteraction.subject.like('Undated%')).update(
+        {'interaction_date': None}, synchronize_session=False
+    )
+    db.commit()
+
+    subjects = []
+    cursor = None
+    while True:
+        query = {'limit': 2, 'before': cursor} if cursor else {'limit': 2}
+        page = client.get(f'/api/clients/{client_id}/timeline', query_string=query).json
+        subjects.extend(item['subject'] for item in page['items'])
+        assert page['has_more'] == (page['next_cursor'] is not None)
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert subjects == ['Dated 2', 'Dated 1', 'Undated 3', 'Undated 2', 'Undated 1']
+
+def test_follow_up_queue(client):
+    """
+    GIVEN a Flask application configured for testing
+    WHEN the '/api/clients/follow-ups' endpoint is requested
+    THEN check that due clients are listed most overdue first with their last interaction
+    """
+    clients = {}
+    for name, follow_up in (('Overdue', '2024-01-01T00:00:00'), ('Later', '2099-01-01T00:00:00'), ('Due', '2024-06-01T00:00:00')):
+        clients[name] = client.post('/api/clients/', json={
+            "company_name": f"{name} Co", "contact_person": name, "email": f"{name.lower()}@example.com"
+        }).json['id']
+        client.put(f'/api/clients/{clients[name]}', json={"next_follow_up": follow_up})
+    client.post('/api/clients/', json={"company_name": "No Date Co", "contact_person": "None", "email": "none@example.com"})
+
+    client.post(f'/api/clients/{clients["Overdue"]}/interactions', json={"interaction_type": "call", "subject": "Old call",
+                                                                         "interaction_date": "2023-12-01T10:00:00"})
+    client.post(f'/api/clients/{clients["Overdue"]}/interactions', json={"interaction_type": "email", "subject": "Recap",
+                                                                         "interaction_date": "2023-12-15T10:00:00"})
+
+    response = client.get('/api/clients/follow-ups')
+    assert response.status_code == 200
+    items = response.json['items']
+    assert [item['company_name'] for item in items] == ['Overdue Co', 'Due Co']
+    assert items[0]['overdue'] is True
+    assert items[0]['last_interaction']['subject'] == 'Recap'
+    assert items[1]['last_interaction'] is None
+
+    response = client.get('/api/clients/follow-ups', query_string={'limit': 1})
+    assert len(response.json['items']) == 1
+    assert response.json['has_more'] is True
@@ -0,0 +1,166 @@
+import pytest
+from sqlalchemy import create_engine, insert, update
+from models import Client, Order, OrderStatus
+from utils.design_handoff import (DesignHandoffJob, source_metadata, design_requests, designs,
+                                  client_feedback, design_selections)
+
+@pytest.fixture
+def source(tmp_path):
+    """A personalization platform database with two approved requests and one unapproved one"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'personalization.db'}")
+    source_metadata.create_all(engine)
+    with engine.begin() as conn:
+        # One statement per row, since the rows leave different columns empty
+        for row in [
+            {'id': 1, 'company_name': 'TechCorp Solutions', 'contact_name': 'John Smith',
+             'contact_email': 'John@TechCorp.com', 'contact_phone': '555-0199',
+             'brand_keywords': 'modern, bold', 'brand_colors': 'navy', 'gallery_token': 'tok1'},
+            {'id': 2, 'company_name': 'Fresh Bakes', 'contact_name': 'Ana Diaz',
+             'contact_email': 'ana@freshbakes.com', 'brand_keywords': 'warm', 'gallery_token': 'tok2'},
+            {'id': 3, 'company_name': 'Undecided Inc', 'contact_name': 'Lee Park',
+             'contact_email': 'lee@undecided.com', 'brand_keywords': 'calm', 'gallery_token': 'tok3'},
+        ]:
+            conn.execute(insert(design_requests).values(row))
+        conn.execute(insert(designs), [
+            {'id': 10, 'request_id': 1, 'title': 'Mug Concept', 'display_order': 0},
+            {'id': 11, 'request_id': 1, 'title': 'Tote Concept', 'display_order': 1},
+            {'id': 20, 'request_id': 2, 'title': None, 'display_order': 0},
+            {'id': 30, 'request_id': 3, 'title': 'Pen Concept', 'display_order': 0},
+        ])
+        conn.execute(insert(client_feedback), [
+            {'id': 1, 'request_id': 1, 'overall_feedback': 'Love it', 'rating': 5, 'revision': 1},
+            {'id': 2, 'request_id': 2, 'overall_feedback': None, 'rating': None, 'revision': 2},
+            {'id': 3, 'request_id': 3, 'overall_feedback': 'Not yet', 'rating': 2, 'revision': 3},
+        ])
+        conn.execute(insert(design_selections), [
+            {'id': 1, 'feedback_id': 1, 'design_id': 10},
+            {'id': 2, 'feedback_id': 1, 'design_id': 11},
+            {'id': 3, 'feedback_id': 2, 'design_id': 20},
+        ])
+    yield engine
+    engine.dispose()
+
+def test_handoff_creates_quotes_and_upserts_clients(seeded_db, source):
+    """
+    GIVEN a seeded dashboard and a personalization database with two approvals
+    WHEN the handoff job runs in batches of one
+    THEN check that the existing client is matched by email, a new client is created
+         and a quote order is created for each approved request only
+    """
+    clients_before = seeded_db.query(Client).count()
+
+    report = DesignHandoffJob(seeded_db, source, batch_size=1).run().to_dict()
+    assert report['approvals'] == 2
+    assert report['batches'] == 3
+    assert report['clients_created'] == 1
+    assert report['clients_updated'] == 1
+    assert report['orders_created'] == 2
+    assert report['watermark_to'] == 3
+    assert seeded_db.query(Client).count() == clients_before + 1
+
+    order = seeded_db.query(Order).filter_by(order_number='TW-DR-000001').one()
+    assert order.status == OrderStatus.QUOTE
+    assert order.client.email == 'john@techcorp.com'
+    assert order.client.phone == '555-0199'
+    assert 'Mug Concept, Tote Concept' in order.notes
+    assert 'Brand colors: navy' in order.special_instructions
+
+    order = seeded_db.query(Order).filter_by(order_number='TW-DR-000002').one()
+    assert order.client.acquisition_source.value == 'website'
+    assert 'Design #20' in order.notes
+    assert seeded_db.query(Order).filter_by(order_number='TW-DR-000003').count() == 0
+
+def test_handoff_is_incremental_and_idempotent(seeded_db, source):
+    """
+    GIVEN a handoff that has already run
+    WHEN it runs again, then after a new approval and a changed selection
+    THEN check that nothing is duplicated, only new approvals are read and
+         quotes still at the quote stage pick up the changed selection
+    """
+    DesignHandoffJob(seeded_db, source).run()
+    orders_before = seeded_db.query(Order).count()
+
+    report = DesignHandoffJob(seeded_db, source).run().to_dict()
+    assert report['approvals'] == 0
+    assert report['watermark_from'] == 3
+    assert seeded_db.query(Order).count() == orders_before
+
+    # Request 3 is approved; request 1's selection is resubmitted after its
+    # quote was confirmed; request 2's selection is resubmitted as well
+    with source.begin() as conn:
+        conn.execute(design_selections.delete().where(design_selections.c.feedback_id.in_([1, 2])))
+        conn.execute(insert(design_selections), [
+            {'id': 4, 'feedback_id': 3, 'design_id': 30},
+            {'id': 5, 'feedback_id': 1, 'design_id': 11},
+            {'id': 6, 'feedback_id': 2, 'design_id': 20},
+        ])
+        for feedback_id, revision in [(3, 4), (1, 5), (2, 6)]:
+            conn.execute(update(client_feedback).where(client_feedback.c.id == feedback_id)
+                         .values(revision=revision))
+    confirmed = seeded_db.query(Order).filter_by(order_number='TW-DR-000001').one()
+    confirmed.update_status(OrderStatus.CONFIRMED)
+    seeded_db.commit()
+
+    report = DesignHandoffJob(seeded_db, source).run().to_dict()
+    assert report['approvals'] == 3
+    assert report['orders_created'] == 1
+    assert report['orders_updated'] == 1
+    assert report['skipped'] == 1
+    assert report['watermark_to'] == 6
+    assert seeded_db.query(Order).count() == orders_before + 1
+
+    seeded_db.expire_all()
+    assert 'Mug Concept' in seeded_db.query(Order).filter_by(order_number='TW-DR-000001').one().notes
+
+def test_handoff_picks_up_feedback_edits_and_withdrawals(seeded_db, source):
+    """
+    GIVEN a handoff that has already run
+    WHEN one client only changes their rating and another deselects every design
+    THEN check that both quotes are refreshed and the withdrawal is reported
+    """
+    DesignHandoffJob(seeded_db, source).run()
+
+    # Resubmitting reuses the deleted selection ids, so only the revision moves
+    with source.begin() as conn:
+        conn.execute(update(client_feedback).where(client_feedback.c.id == 1).values(rating=3, revision=4))
+        conn.execute(design_selections.delete().where(design_selections.c.feedback_id == 2))
+        conn.execute(update(client_feedback).where(client_feedback.c.id == 2).values(revision=5))
+
+    report = DesignHandoffJob(seeded_db, source).run().to_dict()
+    assert report['approvals'] == 2
+    assert report['orders_created'] == 0
+    assert report['orders_updated'] == 2
+    assert report['withdrawn'] == 1
+    assert report['watermark_to'] == 5
+
+    seeded_db.expire_all()
+    assert 'Client rating: 3/5' in seeded_db.query(Order).filter_by(order_number='TW-DR-000001').one().notes
+    assert 'Approval withdrawn' in seeded_db.query(Order).filter_by(order_number='TW-DR-000002').one().notes
+
+def test_handoff_skips_taken_order_numbers(seeded_db, source):
+    """
+    GIVEN manually created orders already numbered TW-DR-000001 and TW-DR-000001-2
+    WHEN the handoff job creates the quote for design request 1
+    THEN check that it gets the next free number
+    """
+    client_id = seeded_db.query(Client.id).first()[0]
+    for number in ('TW-DR-000001', 'TW-DR-000001-2'):
+        seeded_db.add(Order(order_number=number, client_id=client_id, status=OrderStatus.QUOTE))
+    seeded_db.commit()
+
+    DesignHandoffJob(seeded_db, source).run()
+    order = seeded_db.query(Order).filter_by(order_number='TW-DR-000001-3').one()
+    assert order.client.email == 'john@techcorp.com'
+
+def test_handoff_dry_run_writes_nothing(db, source):
+    """
+    GIVEN an empty dashboard database
+    WHEN the handoff job runs as a dry run
+    THEN check that the report counts the changes but no rows or watermark are written
+    """
+    job = DesignHandoffJob(db, source, dry_run=True)
+    report = job.run().to_dict()
+    assert report['orders_created'] == 2
+    assert db.query(Order).count() == 0
+    assert db.query(Client).count() == 0
+    assert job.get_watermark() == 0
@@ -0,0 +1,118 @@
+import io
+
+def _csv_upload(text):
+    return {'file': (io.BytesIO(text.encode('utf-8')), 'import.csv')}
+
+def test_import_clients(seeded_client):
+    """
+    GIVEN a Flask application configured for testing
+    WHEN a clients CSV with new, existing, duplicate and invalid rows is imported
+    THEN check that valid rows are upserted and bad rows are reported by row number
+    """
+    csv_text = (
+        "company_name,contact_person,email,acquisition_source\n"
+        "New Lead Co,Ann Lee,ann@newlead.com,Trade Show\n"
+        "TechCorp Renamed,John Smith,john@techcorp.com,website\n"
+        "Dup Lead Co,Ann Lee,ann@newlead.com,trade_show\n"
+        "Bad Source Co,Bob Ray,bob@badsource.com,billboard\n"
+        ",No Company,nocompany@example.com,\n"
+    )
+    response = seeded_client.post('/api/import/clients', data=_csv_upload(csv_text),
+                                  content_type='multipart/form-data')
+    assert response.status_code == 200
+
+    report = response.json
+    assert report['total_rows'] == 5
+    assert report['created'] == 1
+    assert report['updated'] == 1
+    assert report['error_count'] == 3
+    assert [error['row'] for error in report['errors']] == [4, 5, 6]
+
+    clients = seeded_client.get('/api/clients/', query_string={'search': 'newlead'}).json
+    assert len(clients) == 1
+    assert clients[0]['acquisition_source'] == 'trade_show'
+
+    clients = seeded_client.get('/api/clients/', query_string={'search': 'john@techcorp.com'}).json
+    assert clients[0]['company_name'] == 'TechCorp Renamed'
+
+def test_import_products_from_export(seeded_client):
+    """
+    GIVEN a Flask application configured for testing
+    WHEN the products CSV export is re-imported with a new row appended
+    THEN check that export formatting is accepted and only the new product is created
+    """
+    exported = seeded_client.get('/api/export/products').data.decode('utf-8')
+    exported += 'NEW-001,Bamboo Pen,Office Supplies,Eco pen,$1.50,0.05,30.0%,200,20,Yes,No,$0.50,Active\r\n'
+    existing_count = len(seeded_client.get('/api/products/', query_string={'active': 'false'}).json)
+
+    response = seeded_client.post('/api/import/products', data=_csv_upload(exported),
+                                  content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.json['error_count'] == 0
+    assert response.json['created'] == 1
+    assert response.json['updated'] == existing_count
+
+    products = seeded_client.get('/api/products/', query_string={'search': 'NEW-001'}).json
+    assert len(products) == 1
+    assert products[0]['category'] == 'office_supplies'
+    assert products[0]['base_cost'] == 1.5
+    assert products[0]['stock_quantity'] == 200
+
+def test_import_dry_run(client):
+    """
+    GIVEN a Flask application configured for testing
+    WHEN a CSV is imported with dry_run enabled
+    THEN check that rows are validated and counted but nothing is written
+    """
+    csv_text = "sku,name,base_cost,category\nDRY-1,Dry Mug,4.00,drinkware\nDRY-2,Bad Mug,abc,drinkware\n"
+    response = client.post('/api/import/products?dry_run=true', data=_csv_upload(csv_text),
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.json['dry_run'] is True
+    assert response.json['created'] == 1
+    assert response.json['error_count'] == 1
+
+    assert client.get('/api/products/').json == []
+
+def test_import_requires_key_column(client):
+    """
+    GIVEN a Flask application configured for testing
+    WHEN a clients CSV without an email column is imported
+    THEN check that the import is rejected without processing rows
+    """
+    response = client.post('/api/import/clients', data=_csv_upload("company_name\nAcme\n"),
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.json['total_rows'] == 0
+    assert response.json['errors'][0]['error'] == 'Missing required column: email'
+
+def test_import_database_error_reports_written_rows_only(seeded_db, monkeypatch):
+    """
+    GIVEN a clients CSV with one existing and one new row, imported without updates
+    WHEN the bulk write fails
+    THEN check that only the new row is reported as an error and the existing row stays skipped
+    """
+    from utils.csv_importer import ClientImporter
+
+    execute = seeded_db.execute
+
+    def failing_execute(statement, *args, **kwargs):
+        # Let the existing-key lookup through and fail the bulk insert/update
+        if statement.is_dml:
+            raise RuntimeError('disk full')
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(seeded_db, 'execute', failing_execute)
+    csv_text = (
+        "company_name,email\n"
+        "TechCorp,john@techcorp.com\n"
+        "New Lead Co,ann@newlead.com\n"
+    )
+    report = ClientImporter(seeded_db, update_existing=False).run(io.StringIO(csv_text)).to_dict()
+
+    assert report['total_rows'] == 2
+    assert report['skipped'] == 1
+    assert report['created'] == 0
+    assert report['error_count'] == 1
+    assert report['errors'][0]['row'] == 3
+    assert report['errors'][0]['error'] == 'Database error: disk full'
@@ -0,0 +1,76 @@
+import pytest
+from app import create_app
+
+@pytest.fixture(scope='function')
+def instrumented_client(monkeypatch, seeded_db):
+    """A test client for an app with instrumentation enabled."""
+    monkeypatch.setenv('INSTRUMENTATION_ENABLED', 'true')
+    monkeypatch.setenv('SLOW_QUERY_MS', '0')
+    monkeypatch.setenv('PROFILE_THRESHOLD_MS', '0')
+    monkeypatch.setenv('METRICS_TOKEN', 'secret')
+    app = create_app()
+    app.config.update({"TESTING": True})
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = 'Bearer secret'
+    return client
+
+def test_metrics_disabled_by_default(client, monkeypatch):
+    """
+    GIVEN a Flask application configured for testing
+    WHEN the '/api/admin/metrics' endpoint is requested without instrumentation enabled
+    THEN check that a 404 error is returned
+    """
+    monkeypatch.setenv('METRICS_TOKEN', 'secret')
+    response = client.get('/api/admin/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 404
+
+def test_metrics_require_token(instrumented_client, monkeypatch):
+    """
+    GIVEN a Flask application with instrumentation enabled
+    WHEN the metrics are requested with a wrong token, or with no token configured
+    THEN check that access is refused
+    """
+    response = instrumented_client.get('/api/admin/metrics', headers={'Authorization': 'Bearer wrong'})
+    assert response.status_code == 401
+
+    monkeypatch.delenv('METRICS_TOKEN')
+    response = instrumented_client.get('/api/admin/metrics/prometheus')
+    assert response.status_code == 403
+
+def test_metrics_record_requests_and_sql(instrumented_client):
+    """
+    GIVEN a Flask application with instrumentation enabled
+    WHEN API endpoints are requested
+    THEN check that wall time, SQL counts and slow queries are recorded per endpoint
+    """
+    response = instrumented_client.get('/api/clients/')
+    assert response.status_code == 200
+    assert 'db;dur=' in response.headers['Server-Timing']
+    instrumented_client.get('/api/clients/')
+
+    metrics = instrumented_client.get('/api/admin/metrics').json
+    clients_stats = next(e for e in metrics['endpoints'] if e['endpoint'] == '/api/clients/')
+    assert clients_stats['count'] == 2
+    assert clients_stats['avg_sql_statements'] >= 1
+
+    # With a 0ms threshold every query is slow, and SELECTs carry a plan
+    assert metrics['slow_query_total'] > 0
+    select = next(q for q in metrics['slow_queries'] if q['statement'].lstrip().startswith('SELECT'))
+    assert select['plan']
+    # Bound values may be personal data and are never captured
+    assert all('parameters' not in q for q in metrics['slow_queries'])
+
+def test_prometheus_metrics(instrumented_client):
+    """
+    GIVEN a Flask application with instrumentation enabled
+    WHEN the Prometheus metrics endpoint is requested
+    THEN check that request histograms and SQL counters are exposed as text
+    """
+    instrumented_client.get('/api/products/')
+    response = instrumented_client.get('/api/admin/metrics/prometheus')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+    body = response.data.decode('utf-8')
+    assert 'tezzaworks_http_request_duration_seconds_count{method="GET",endpoint="/api/products/"} 1' in body
+    assert 'tezzaworks_sql_statements_total{method="GET",endpoint="/api/products/"}' in body
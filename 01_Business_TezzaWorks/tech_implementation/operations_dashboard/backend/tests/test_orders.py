@@ -106,3 +106,80 @@ def test_delete_order(seeded_client):
     # Verify the order was actually deleted
     get_response = seeded_client.get(f'/api/orders/{first_order_id}')
     assert get_response.status_code == 404
+
+def test_get_analytics(seeded_client):
+    """
+    GIVEN a Flask application configured for testing
+    WHEN the '/api/orders/analytics' endpoint is requested (GET)
+    THEN check that totals are aggregated across all orders and bad dates are rejected
+    """
+    orders = seeded_client.get('/api/orders/').json
+
+    response = seeded_client.get('/api/orders/analytics')
+    assert response.status_code == 200
+    assert response.json['total_orders'] == len(orders)
+    assert response.json['total_revenue'] == round(sum(order['total_amount'] for order in orders), 2)
+    assert sum(response.json['orders_by_status'].values()) == len(orders)
+
+    response = seeded_client.get('/api/orders/analytics', query_string={'start_date': '2099-01-01'})
+    assert response.json['total_orders'] == 0
+    assert response.json['top_products'] == []
+
+    response = seeded_client.get('/api/orders/analytics', query_string={'start_date': 'not-a-date'})
+    assert response.status_code == 400
+
+def test_quote_cache_and_conversion(seeded_client):
+    """
+    GIVEN a Flask application configured for testing
+    WHEN the same quote is requested twice and then converted to an order by fingerprint
+    THEN check that the second quote is served from cache and the order uses the quoted prices
+    """
+    from utils.quote_cache import quote_cache
+    quote_cache.clear()
+
+    client_id = seeded_client.get('/api/clients/').json[0]['id']
+    product = seeded_client.get('/api/products/').json[0]
+    quote_data = {
+        "items": [{"product_id": product['id'], "quantity": 50, "has_logo": True}],
+        "discount_percentage": 5,
+        "shipping_cost": 25
+    }
+
+    first = seeded_client.post('/api/orders/quote', json=quote_data)
+    assert first.status_code == 200
+    assert first.headers['X-Quote-Cache'] == 'miss'
+
+    second = seeded_client.post('/api/orders/quote', json=quote_data)
+    assert second.headers['X-Quote-Cache'] == 'hit'
+    assert second.json == first.json
+    fingerprint = first.json['quote_fingerprint']
+
+    response = seeded_client.post('/api/orders/', json={"client_id": client_id, "quote_fingerprint": fingerprint})
+    assert response.status_code == 201
+    assert response.json['items'][0]['unit_price'] == first.json['items'][0]['unit_price']
+    assert response.json['shipping_cost'] == 25
+
+def test_quote_invalidated_by_pricing_change(seeded_client):
+    """
+    GIVEN a Flask application configured for testing
+    WHEN a product's base cost changes after it was quoted
+    THEN check that the quote is recomputed and the old fingerprint can't become an order
+    """
+    client_id = seeded_client.get('/api/clients/').json[0]['id']
+    product = seeded_client.get('/api/products/').json[0]
+    quote_data = {"items": [{"product_id": product['id'], "quantity": 10}]}
+
+    old_quote = seeded_client.post('/api/orders/quote', json=quote_data).json
+    seeded_client.put(f"/api/products/{product['id']}", json={"base_cost": product['base_cost'] + 10})
+
+    response = seeded_client.post('/api/orders/quote', json=quote_data)
+    assert response.headers['X-Quote-Cache'] == 'miss'
+    assert response.json['quote_fingerprint'] != old_quote['quote_fingerprint']
+    assert response.json['items'][0]['unit_price'] > old_quote['items'][0]['unit_price']
+
+    response = seeded_client.post('/api/orders/', json={"client_id": client_id,
+                                                        "quote_fingerprint": old_quote['quote_fingerprint']})
+    assert response.status_code == 409
+
+    response = seeded_client.post('/api/orders/', json={"client_id": client_id, "quote_fingerprint": "unknown"})
+    assert response.status_code == 404
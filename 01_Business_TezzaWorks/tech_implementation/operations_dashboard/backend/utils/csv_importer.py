@@ -0,0 +1,357 @@
+"""
+Bulk CSV importer for clients and products
+Streams rows in chunks, validates them against the model enums, de-duplicates
+with one set-based lookup per chunk and upserts each chunk in bulk
+"""
+import csv
+from datetime import datetime
+from sqlalchemy import insert, update
+from models.client import Client, AcquisitionSource
+from models.product import Product, ProductCategory
+
+
+class ImportReport:
+    """Row-level outcome of a bulk import"""
+
+    # Cap on reported errors so a badly broken file can't blow up the response
+    MAX_ERRORS = 1000
+
+    def __init__(self):
+        self.total_rows = 0
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.errors = []
+        self.error_count = 0
+        self.started_at = datetime.utcnow()
+
+    def add_error(self, row_number, message, key=None):
+        self.error_count += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append({'row': row_number, 'key': key, 'error': message})
+
+    def to_dict(self):
+        elapsed = (datetime.utcnow() - self.started_at).total_seconds()
+        return {
+            'total_rows': self.total_rows,
+            'created': self.created,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'errors_truncated': self.error_count > len(self.errors),
+            'elapsed_seconds': round(elapsed, 3),
+        }
+
+
+class RowError(ValueError):
+    """Raised when a single CSV row fails validation"""
+
+
+def _clean(value):
+    """Strip whitespace and normalise empty cells to None"""
+    if value is None:
+        return None
+    value = value.strip()
+    return value or None
+
+
+def _parse_float(value, field):
+    """Parse numbers, tolerating the '$' and '%' formatting used by the CSV export"""
+    try:
+        return float(value.replace('$', '').replace('%', '').replace(',', ''))
+    except ValueError:
+        raise RowError(f"Invalid number for {field}: {value!r}")
+
+
+def _parse_int(value, field):
+    number = _parse_float(value, field)
+    if not number.is_integer():
+        raise RowError(f"Invalid integer for {field}: {value!r}")
+    return int(number)
+
+
+def _parse_bool(value, field):
+    lowered = value.lower()
+    if lowered in ('1', 'true', 'yes', 'y', 'active'):
+        return True
+    if lowered in ('0', 'false', 'no', 'n', 'inactive'):
+        return False
+    raise RowError(f"Invalid boolean for {field}: {value!r}")
+
+
+def parse_enum(enum_cls, value, field):
+    """Accept either the enum value ('trade_show') or its label ('Trade Show')"""
+    normalized = value.strip().lower().replace(' ', '_').replace('-', '_')
+    try:
+        return enum_cls(normalized)
+    except ValueError:
+        allowed = ', '.join(member.value for member in enum_cls)
+        raise RowError(f"Invalid {field}: {value!r} (allowed: {allowed})")
+
+
+def group_by_columns(rows):
+    """Split row dicts into lists that all share the same set of keys"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(frozenset(row), []).append(row)
+    return groups.values()
+
+
+class CSVImporter:
+    """
+    Base class for chunked CSV imports
+
+    Subclasses describe the model, its natural key column, the accepted
+    headers and how to turn a raw CSV row into column values.
+    """
+
+    model = None
+    key_field = None
+    # Maps accepted CSV headers (snake_case field names and the export headers)
+    # to model attributes
+    HEADER_MAP = {}
+    DEFAULT_CHUNK_SIZE = 500
+
+    def __init__(self, db, chunk_size=None, update_existing=True, dry_run=False):
+        self.db = db
+        self.chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        self.update_existing = update_existing
+        self.dry_run = dry_run
+
+    def parse_row(self, row):
+        """Convert a header-mapped row into model column values"""
+        raise NotImplementedError
+
+    def _map_headers(self, fieldnames):
+        mapping = {}
+        for header in fieldnames or []:
+            if header is None:
+                continue
+            normalized = header.strip().lower()
+            attr = self.HEADER_MAP.get(normalized) or self.HEADER_MAP.get(normalized.replace(' ', '_'))
+            if attr:
+                mapping[header] = attr
+        return mapping
+
+    def run(self, text_stream):
+        """
+        Import every row from a text stream
+
+        Args:
+            text_stream: File-like object yielding CSV text
+
+        Returns:
+            ImportReport: Counts and row-level errors
+        """
+        report = ImportReport()
+        reader = csv.DictReader(text_stream)
+        header_map = self._map_headers(reader.fieldnames)
+
+        if self.key_field not in header_map.values():
+            report.add_error(1, f"Missing required column: {self.key_field}")
+            return report
+
+        # Keys already handled in this file, so duplicates across chunks are caught
+        seen_keys = {}
+        chunk = []
+
+        # Row 1 is the header, so data rows start at 2
+        for row_number, raw in enumerate(reader, start=2):
+            report.total_rows += 1
+            row = {attr: _clean(raw.get(header)) for header, attr in header_map.items()}
+
+            try:
+                values = self.parse_row(row)
+            except RowError as e:
+                report.add_error(row_number, str(e), row.get(self.key_field))
+                continue
+
+            key = values[self.key_field]
+            if key in seen_keys:
+                report.add_error(row_number, f"Duplicate {self.key_field} in file (first seen on row {seen_keys[key]})", key)
+                continue
+            seen_keys[key] = row_number
+
+            chunk.append((row_number, values))
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk, report)
+                chunk = []
+
+        if chunk:
+            self._flush(chunk, report)
+
+        return report
+
+    def _flush(self, chunk, report):
+        """Upsert one chunk with a single lookup, one bulk insert and one bulk update"""
+        key_column = getattr(self.model, self.key_field)
+        keys = [values[self.key_field] for _, values in chunk]
+
+        existing = dict(
+            self.db.query(key_column, self.model.id).filter(key_column.in_(keys)).all()
+        )
+
+        now = datetime.utcnow()
+        to_insert = []
+        to_update = []
+        # Rows sent to the database, reported as errors if the write fails
+        written = []
+        for row_number, values in chunk:
+            existing_id = existing.get(values[self.key_field])
+            if existing_id is None:
+                to_insert.append(self.apply_defaults(values))
+            elif self.update_existing:
+                to_update.append(dict(values, id=existing_id, updated_at=now))
+            else:
+                report.skipped += 1
+                continue
+            written.append((row_number, values[self.key_field]))
+
+        try:
+            # Rows only batch into one executemany when they share the same
+            # columns, so group sparse rows by their key set first
+            for batch in group_by_columns(to_insert):
+                self.db.execute(insert(self.model), batch)
+            for batch in group_by_columns(to_update):
+                self.db.execute(update(self.model), batch)
+
+            if self.dry_run:
+                self.db.rollback()
+            else:
+                self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            for row_number, key in written:
+                report.add_error(row_number, f"Database error: {e}", key)
+            return
+
+        report.created += len(to_insert)
+        report.updated += len(to_update)
+
+    def apply_defaults(self, values):
+        """Fill in defaults for newly created rows"""
+        return values
+
+
+class ClientImporter(CSVImporter):
+    """Import clients keyed by email"""
+
+    model = Client
+    key_field = 'email'
+    HEADER_MAP = {
+        'company_name': 'company_name',
+        'contact_person': 'contact_person',
+        'email': 'email',
+        'phone': 'phone',
+        'address': 'address',
+        'city': 'city',
+        'state': 'state',
+        'zip_code': 'zip_code',
+        'zip': 'zip_code',
+        'country': 'country',
+        'industry': 'industry',
+        'acquisition_source': 'acquisition_source',
+        'preferences': 'preferences',
+        'notes': 'notes',
+    }
+    TEXT_FIELDS = ('company_name', 'contact_person', 'phone', 'address', 'city',
+                   'state', 'zip_code', 'country', 'industry', 'preferences', 'notes')
+
+    def __init__(self, db, default_source=AcquisitionSource.OTHER, **kwargs):
+        super().__init__(db, **kwargs)
+        self.default_source = default_source
+
+    def parse_row(self, row):
+        if not row.get('company_name') or not row.get('email'):
+            raise RowError('Company name and email are required')
+
+        values = {'email': row['email']}
+        for field in self.TEXT_FIELDS:
+            if row.get(field) is not None:
+                values[field] = row[field]
+
+        if row.get('acquisition_source'):
+            values['acquisition_source'] = parse_enum(AcquisitionSource, row['acquisition_source'], 'acquisition_source')
+
+        return values
+
+    def apply_defaults(self, values):
+        return {
+            'contact_person': '',
+            'country': 'USA',
+            'acquisition_source': self.default_source,
+            **values,
+        }
+
+
+class ProductImporter(CSVImporter):
+    """Import products keyed by SKU"""
+
+    model = Product
+    key_field = 'sku'
+    HEADER_MAP = {
+        'sku': 'sku',
+        'name': 'name',
+        'description': 'description',
+        'category': 'category',
+        'base_cost': 'base_cost',
+        'labor_hours': 'labor_hours',
+        'overhead_percentage': 'overhead_percentage',
+        'overhead_%': 'overhead_percentage',
+        'stock_quantity': 'stock_quantity',
+        'reorder_level': 'reorder_level',
+        'is_active': 'is_active',
+        'active': 'is_active',
+        'allows_logo': 'allows_logo',
+        'allows_personalization': 'allows_personalization',
+        'customization_cost': 'customization_cost',
+    }
+    FLOAT_FIELDS = ('base_cost', 'labor_hours', 'overhead_percentage', 'customization_cost')
+    INT_FIELDS = ('stock_quantity', 'reorder_level')
+    BOOL_FIELDS = ('is_active', 'allows_logo', 'allows_personalization')
+
+    def parse_row(self, row):
+        if not row.get('sku') or not row.get('name') or not row.get('base_cost'):
+            raise RowError('SKU, name, and base cost are required')
+
+        values = {'sku': row['sku'], 'name': row['name']}
+        if row.get('description') is not None:
+            values['description'] = row['description']
+        if row.get('category'):
+            values['category'] = parse_enum(ProductCategory, row['category'], 'category')
+
+        for field in self.FLOAT_FIELDS:
+            if row.get(field) is not None:
+                values[field] = _parse_float(row[field], field)
+        for field in self.INT_FIELDS:
+            if row.get(field) is not None:
+                values[field] = _parse_int(row[field], field)
+        for field in self.BOOL_FIELDS:
+            if row.get(field) is not None:
+                values[field] = _parse_bool(row[field], field)
+
+        if values['base_cost'] < 0:
+            raise RowError('Base cost cannot be negative')
+
+        return values
+
+    def apply_defaults(self, values):
+        return {
+            'category': ProductCategory.CUSTOM,
+            'labor_hours': 0.0,
+            'overhead_percentage': 30.0,
+            'stock_quantity': 0,
+            'reorder_level': 10,
+            'is_active': True,
+            'allows_logo': True,
+            'allows_personalization': False,
+            'customization_cost': 0.0,
+            **values,
+        }
+
+
+IMPORTERS = {
+    'clients': ClientImporter,
+    'products': ProductImporter,
+}
@@ -0,0 +1,394 @@
+"""
+Design-to-order handoff from the personalization platform
+Reads approvals (client feedback with at least one selected design) from the
+personalization platform's database, upserts the client by email and creates
+a quote-status order for each approved design request.
+
+Runs are incremental: every feedback submission, including edits that only
+change the rating or clear every selection, stamps client_feedback.revision
+from a table-wide counter, so the highest revision handled is stored as a
+watermark and the next run starts after it. Each batch is committed together
+with its watermark, and design_handoffs maps every design request to its
+order, so re-running or resuming after a failure never duplicates orders.
+"""
+import os
+from datetime import datetime
+from sqlalchemy import (MetaData, Table, Column, Integer, String, Text, DateTime,
+                        create_engine, select, func, update)
+from models.client import Client, AcquisitionSource
+from models.order import Order, OrderStatus
+from models.handoff import SyncState, DesignHandoff
+from utils.csv_importer import group_by_columns
+
+SYNC_NAME = 'design_handoff'
+DEFAULT_BATCH_SIZE = 200
+
+# The columns the handoff reads from the personalization platform's schema
+source_metadata = MetaData()
+
+design_requests = Table(
+    'design_requests', source_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('company_name', String(200)),
+    Column('contact_name', String(200)),
+    Column('contact_email', String(200)),
+    Column('contact_phone', String(50)),
+    Column('brand_keywords', Text),
+    Column('brand_colors', String(500)),
+    Column('target_audience', String(500)),
+    Column('additional_notes', Text),
+    Column('gallery_token', String(100)),
+)
+
+designs = Table(
+    'designs', source_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('request_id', Integer),
+    Column('title', String(200)),
+    Column('display_order', Integer),
+)
+
+client_feedback = Table(
+    'client_feedback', source_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('request_id', Integer),
+    Column('overall_feedback', Text),
+    Column('rating', Integer),
+    Column('revision', Integer),
+    Column('created_at', DateTime),
+)
+
+design_selections = Table(
+    'design_selections', source_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('feedback_id', Integer),
+    Column('design_id', Integer),
+)
+
+
+def create_source_engine(url=None):
+    """
+    Engine for the personalization platform's database
+
+    Args:
+        url: Database URL; defaults to PERSONALIZATION_DATABASE_URL
+    """
+    url = url or os.getenv('PERSONALIZATION_DATABASE_URL')
+    if not url:
+        raise ValueError('Set PERSONALIZATION_DATABASE_URL to the personalization platform database')
+    return create_engine(url, connect_args={"check_same_thread": False} if 'sqlite' in url else {})
+
+
+def order_number_for(design_request_id):
+    """Deterministic order number for a design request's quote"""
+    return f"TW-DR-{design_request_id:06d}"
+
+
+def free_order_number(base, taken):
+    """First of base, base-2, base-3, ... not in taken"""
+    number = base
+    suffix = 1
+    while number in taken:
+        suffix += 1
+        number = f"{base}-{suffix}"
+    return number
+
+
+class HandoffReport:
+    """Outcome of one handoff run"""
+
+    def __init__(self, watermark):
+        self.approvals = 0
+        self.clients_created = 0
+        self.clients_updated = 0
+        self.orders_created = 0
+        self.orders_updated = 0
+        self.withdrawn = 0
+        self.skipped = 0
+        self.batches = 0
+        self.watermark_from = watermark
+        self.watermark_to = watermark
+        self.started_at = datetime.utcnow()
+
+    def to_dict(self):
+        elapsed = (datetime.utcnow() - self.started_at).total_seconds()
+        return {
+            'approvals': self.approvals,
+            'clients_created': self.clients_created,
+            'clients_updated': self.clients_updated,
+            'orders_created': self.orders_created,
+            'orders_updated': self.orders_updated,
+            'withdrawn': self.withdrawn,
+            'skipped': self.skipped,
+            'batches': self.batches,
+            'watermark_from': self.watermark_from,
+            'watermark_to': self.watermark_to,
+            'elapsed_seconds': round(elapsed, 3),
+        }
+
+
+class DesignHandoffJob:
+    """
+    Incremental sync of approved design requests into clients and quote orders
+
+    Each batch costs a fixed number of queries on either side, whatever its size:
+    three reads from the source, and on the dashboard one client lookup, one
+    handoff lookup, bulk client inserts/updates, bulk order inserts and one
+    watermark update (plus one order number lookup per number collision).
+    """
+
+    def __init__(self, db, source_engine, batch_size=None, dry_run=False):
+        self.db = db
+        self.source_engine = source_engine
+        self.batch_size = batch_size or DEFAULT_BATCH_SIZE
+        self.dry_run = dry_run
+
+    def get_watermark(self):
+        state = self.db.get(SyncState, SYNC_NAME)
+        return state.watermark if state else 0
+
+    def reset(self):
+        """Forget the watermark so the next run re-checks every approval"""
+        state = self.db.get(SyncState, SYNC_NAME)
+        if state:
+            state.watermark = 0
+            self.db.commit()
+
+    def run(self):
+        """
+        Process every approval newer than the stored watermark
+
+        Returns:
+            HandoffReport: Counts of created and updated records
+        """
+        watermark = self.get_watermark()
+        report = HandoffReport(watermark)
+
+        with self.source_engine.connect() as source:
+            while True:
+                batch = self._fetch_batch(source, watermark)
+                if not batch:
+                    break
+                watermark = batch[-1].revision
+                approvals = self._fetch_approvals(source, batch)
+                self._apply_batch(approvals, watermark, report)
+                report.batches += 1
+                report.watermark_to = watermark
+                if len(batch) < self.batch_size:
+                    break
+
+        return report
+
+    def _fetch_batch(self, source, watermark):
+        """Ids of the next batch of requests with new feedback, oldest submission first"""
+        latest = (
+            select(client_feedback.c.request_id, client_feedback.c.revision)
+            .where(client_feedback.c.revision > watermark)
+            .order_by(client_feedback.c.revision)
+            .limit(self.batch_size)
+        )
+        return source.execute(latest).all()
+
+    def _fetch_approvals(self, source, batch):
+        """Load request details and selected designs for a batch"""
+        request_ids = [row.request_id for row in batch]
+
+        details = {
+            row.id: row._asdict() for row in source.execute(
+                select(design_requests, client_feedback.c.overall_feedback,
+                       client_feedback.c.rating, client_feedback.c.created_at.label('approved_at'))
+                .join(client_feedback, client_feedback.c.request_id == design_requests.c.id)
+                .where(design_requests.c.id.in_(request_ids))
+            )
+        }
+
+        selected = {}
+        for row in source.execute(
+            select(client_feedback.c.request_id, designs.c.id, designs.c.title)
+            .join(design_selections, design_selections.c.feedback_id == client_feedback.c.id)
+            .join(designs, designs.c.id == design_selections.c.design_id)
+            .where(client_feedback.c.request_id.in_(request_ids))
+            .order_by(designs.c.display_order, designs.c.id)
+        ):
+            selected.setdefault(row.request_id, []).append(row.title or f"Design #{row.id}")
+
+        approvals = []
+        for row in batch:
+            if row.request_id not in details:
+                continue
+            approval = details[row.request_id]
+            approval['revision'] = row.revision
+            approval['selected_designs'] = selected.get(row.request_id, [])
+            approvals.append(approval)
+        return approvals
+
+    def _apply_batch(self, approvals, watermark, report):
+        """Upsert clients and orders for one batch and advance the watermark atomically"""
+        try:
+            handoffs = {
+                handoff.design_request_id: handoff
+                for handoff in self.db.query(DesignHandoff)
+                .filter(DesignHandoff.design_request_id.in_([approval['id'] for approval in approvals]))
+            }
+            # Feedback without selected designs only matters if it withdraws an earlier approval
+            approvals = [
+                approval for approval in approvals
+                if approval['selected_designs'] or approval['id'] in handoffs
+            ]
+            report.approvals += len(approvals)
+
+            client_ids = self._upsert_clients(approvals, report)
+            self._upsert_orders(approvals, client_ids, handoffs, report)
+
+            state = self.db.get(SyncState, SYNC_NAME)
+            if state is None:
+                state = SyncState(name=SYNC_NAME)
+                self.db.add(state)
+            state.watermark = watermark
+            state.last_run_at = datetime.utcnow()
+
+            if self.dry_run:
+                self.db.rollback()
+            else:
+                self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _upsert_clients(self, approvals, report):
+        """Create or refresh one client per distinct email, returning {email: client_id}"""
+        contacts = {}
+        for approval in approvals:
+            email = approval['contact_email'].strip().lower()
+            approval['email'] = email
+            # Later approvals carry the most recent contact details
+            contacts[email] = approval
+
+        existing = dict(
+            self.db.query(func.lower(Client.email), Client.id)
+            .filter(func.lower(Client.email).in_(list(contacts)))
+            .all()
+        )
+
+        now = datetime.utcnow()
+        to_update = []
+        new_clients = []
+        for email, approval in contacts.items():
+            values = {
+                'company_name': approval['company_name'],
+                'contact_person': approval['contact_name'],
+            }
+            if approval['contact_phone']:
+                values['phone'] = approval['contact_phone']
+
+            if email in existing:
+                to_update.append(dict(values, id=existing[email], updated_at=now))
+            else:
+                new_clients.append(Client(
+                    email=email,
+                    acquisition_source=AcquisitionSource.WEBSITE,
+                    **values,
+                ))
+
+        for batch in group_by_columns(to_update):
+            self.db.execute(update(Client), batch)
+        if new_clients:
+            self.db.add_all(new_clients)
+            self.db.flush()
+
+        report.clients_created += len(new_clients)
+        report.clients_updated += len(to_update)
+        existing.update({client.email: client.id for client in new_clients})
+        return existing
+
+    def _upsert_orders(self, approvals, client_ids, handoffs, report):
+        """Create quotes for new approvals and refresh quotes whose feedback changed"""
+        request_ids = [approval['id'] for approval in approvals]
+        order_statuses = dict(
+            self.db.query(Order.id, Order.status)
+            .filter(Order.id.in_([handoff.order_id for handoff in handoffs.values()]))
+            .all()
+        ) if handoffs else {}
+        taken_numbers = {
+            number for (number,) in self.db.query(Order.order_number)
+            .filter(Order.order_number.in_([order_number_for(request_id) for request_id in request_ids]))
+        }
+
+        now = datetime.utcnow()
+        to_update = []
+        new_orders = []
+        for approval in approvals:
+            handoff = handoffs.get(approval['id'])
+            if handoff is None:
+                order_number = order_number_for(approval['id'])
+                if order_number in taken_numbers:
+                    # A manually created order already uses the number
+                    taken_numbers.update(
+                        number for (number,) in self.db.query(Order.order_number)
+                        .filter(Order.order_number.like(f"{order_number}-%"))
+                    )
+                    order_number = free_order_number(order_number, taken_numbers)
+                taken_numbers.add(order_number)
+                order = Order(
+                    order_number=order_number,
+                    client_id=client_ids[approval['email']],
+                    status=OrderStatus.QUOTE,
+                    order_date=approval['approved_at'] or now,
+                    **_order_text(approval),
+                )
+                new_orders.append((approval, order))
+            elif order_statuses.get(handoff.order_id) == OrderStatus.QUOTE:
+                to_update.append(dict(_order_text(approval), id=handoff.order_id, updated_at=now))
+                handoff.revision = approval['revision']
+                if not approval['selected_designs']:
+                    report.withdrawn += 1
+            else:
+                # The order has moved past the quote stage, so leave it to staff
+                report.skipped += 1
+
+        if to_update:
+            self.db.execute(update(Order), to_update)
+        if new_orders:
+            self.db.add_all([order for _, order in new_orders])
+            self.db.flush()
+            self.db.add_all([
+                DesignHandoff(
+                    design_request_id=approval['id'],
+                    client_id=order.client_id,
+                    order_id=order.id,
+                    revision=approval['revision'],
+                )
+                for approval, order in new_orders
+            ])
+            self.db.flush()
+
+        report.orders_created += len(new_orders)
+        report.orders_updated += len(to_update)
+
+
+def _order_text(approval):
+    """Notes, instructions and provenance copied onto the quote"""
+    if approval['selected_designs']:
+        notes = [f"Approved designs: {', '.join(approval['selected_designs'])}"]
+    else:
+        notes = ["Approval withdrawn: the client has no designs selected"]
+    if approval['rating']:
+        notes.append(f"Client rating: {approval['rating']}/5")
+    if approval['overall_feedback']:
+        notes.append(f"Client feedback: {approval['overall_feedback']}")
+
+    instructions = [f"Brand keywords: {approval['brand_keywords']}"]
+    if approval['brand_colors']:
+        instructions.append(f"Brand colors: {approval['brand_colors']}")
+    if approval['target_audience']:
+        instructions.append(f"Target audience: {approval['target_audience']}")
+    if approval['additional_notes']:
+        instructions.append(f"Additional notes: {approval['additional_notes']}")
+
+    return {
+        'notes': '\n'.join(notes),
+        'special_instructions': '\n'.join(instructions),
+        'internal_notes': (f"Created from personalization design request #{approval['id']} "
+                           f"(gallery {approval['gallery_token']})"),
+    }
+
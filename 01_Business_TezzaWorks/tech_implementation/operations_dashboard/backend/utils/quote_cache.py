@@ -0,0 +1,145 @@
+"""
+Quote fingerprints and a bounded in-memory cache of generated quotes
+A fingerprint covers every input of a quote, including a version hash of each
+product's price-relevant fields. Changing a product's pricing by any route (API,
+CSV import, direct SQL) therefore yields a new fingerprint, and stale entries
+age out of the cache without explicit invalidation.
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Product fields that affect a generated quote
+PRICING_FIELDS = ('name', 'base_cost', 'labor_hours', 'overhead_percentage', 'customization_cost')
+
+
+def pricing_version(product):
+    """
+    Version a product's price-relevant fields
+
+    Args:
+        product (Product): Product row
+
+    Returns:
+        str: Short hash that changes whenever a pricing field changes
+    """
+    values = [getattr(product, field) for field in PRICING_FIELDS]
+    return hashlib.sha256(json.dumps(values).encode('utf-8')).hexdigest()[:12]
+
+
+def normalize_quote_request(data):
+    """
+    Validate and canonicalize a quote request body
+
+    Args:
+        data (dict): Request body with items, discount_percentage, tax_rate, shipping_cost
+
+    Returns:
+        dict: Canonical request with typed values, item order preserved
+
+    Raises:
+        ValueError: If an item is missing its product or has an invalid quantity
+    """
+    items = []
+    for item in data['items']:
+        if item.get('product_id') is None:
+            raise ValueError('Each item needs a product_id')
+        quantity = int(item.get('quantity', 0))
+        if quantity < 1:
+            raise ValueError('Quantity must be at least 1')
+        items.append({
+            'product_id': int(item['product_id']),
+            'quantity': quantity,
+            'has_logo': bool(item.get('has_logo', False)),
+            'has_personalization': bool(item.get('has_personalization', False)),
+        })
+
+    return {
+        'items': items,
+        'discount_percentage': float(data.get('discount_percentage', 0.0)),
+        'tax_rate': float(data.get('tax_rate', 8.5)),
+        'shipping_cost': float(data.get('shipping_cost', 0.0)),
+    }
+
+
+def quote_fingerprint(request, pricing_versions):
+    """
+    Build a deterministic fingerprint for a canonical quote request
+
+    Args:
+        request (dict): Output of normalize_quote_request
+        pricing_versions (dict): Product id -> pricing_version() of that product
+
+    Returns:
+        str: Hex digest identifying the quote
+    """
+    payload = {
+        'items': [
+            [item['product_id'], pricing_versions[item['product_id']], item['quantity'],
+             item['has_logo'], item['has_personalization']]
+            for item in request['items']
+        ],
+        'discount_percentage': request['discount_percentage'],
+        'tax_rate': request['tax_rate'],
+        'shipping_cost': request['shipping_cost'],
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+class QuoteCache:
+    """Thread-safe LRU cache of quotes keyed by fingerprint, with a TTL"""
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint):
+        """Return the cached entry for a fingerprint, or None"""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None or time.monotonic() - entry['stored_at'] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[fingerprint]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return entry
+
+    def put(self, fingerprint, request, pricing_versions, quote):
+        """Store a quote along with the canonical request and pricing versions it was built from"""
+        with self._lock:
+            self._entries[fingerprint] = {
+                'request': request,
+                'pricing_versions': pricing_versions,
+                'quote': quote,
+                'stored_at': time.monotonic(),
+            }
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+quote_cache = QuoteCache(
+    max_entries=int(os.getenv('QUOTE_CACHE_SIZE', 1024)),
+    ttl_seconds=float(os.getenv('QUOTE_CACHE_TTL', 3600)),
+)
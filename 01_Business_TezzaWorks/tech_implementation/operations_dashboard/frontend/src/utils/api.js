@@ -18,6 +18,8 @@ export const clientsAPI = {
   delete: (id) => api.delete(`/clients/${id}`),
   getInteractions: (id) => api.get(`/clients/${id}/interactions`),
   createInteraction: (id, data) => api.post(`/clients/${id}/interactions`, data),
+  getTimeline: (id, params) => api.get(`/clients/${id}/timeline`, { params }),
+  getFollowUps: (params) => api.get('/clients/follow-ups', { params }),
   getStats: (id) => api.get(`/clients/${id}/stats`),
 }
 
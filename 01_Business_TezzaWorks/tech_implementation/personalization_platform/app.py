@@ -2,37 +2,59 @@
 TezzaWorks Customer Personalization Platform - Main Application
 """
 import os
+import sys
 from flask import Flask, render_template
 from models import db
-from database import init_db, create_admin_user
+from database import (init_db, create_admin_user, upgrade_schema, migrate_feedback_selections,
+                      backfill_feedback_revisions)
 from routes.client import client_bp
 from routes.admin import admin_bp
+from routes.files import files_bp
+from utils.uploads import UploadRequest
+from utils.storage import upload_url
+
+# Code shared with the other TezzaWorks apps lives in tech_implementation/tezzaworks_common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from tezzaworks_common.instrumentation import init_instrumentation, instrumentation_enabled
 
 
 def create_app():
     """Create and configure the Flask application"""
     app = Flask(__name__)
+    # Streams logo/design uploads to disk instead of buffering them
+    app.request_class = UploadRequest
 
     # Configuration
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///tezzaworks.db'
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///tezzaworks.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
     # Initialize database
     db.init_app(app)
 
+    # Opt-in request/SQL instrumentation (INSTRUMENTATION_ENABLED=true)
+    if instrumentation_enabled():
+        with app.app_context():
+            init_instrumentation(app, db.engine, metric_prefix='tezzaworks_personalization')
+
     # Register blueprints
     app.register_blueprint(client_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(files_bp)
+
+    # Templates link to uploads through the storage backend
+    app.jinja_env.globals['upload_url'] = upload_url
 
-    # Create upload directories
-    os.makedirs('static/uploads', exist_ok=True)
+    # Create output directories (upload storage creates its own)
     os.makedirs('static/pdfs', exist_ok=True)
 
     # Initialize database tables
     with app.app_context():
         db.create_all()
+        upgrade_schema()
+        migrate_feedback_selections()
+        backfill_feedback_revisions()
         print("Database initialized successfully!")
 
         # Create default admin user if none exists
@@ -1,8 +1,14 @@
 """
 Database initialization and helper functions
 """
+import os
 import secrets
-from models import db, DesignRequest, Design, ClientFeedback, AdminUser
+import threading
+import time
+from sqlalchemy import event, func, inspect, or_, text
+from sqlalchemy.schema import CreateColumn
+import json
+from models import db, DesignRequest, Design, ClientFeedback, DesignSelection, AdminUser
 from werkzeug.security import generate_password_hash
 
 
@@ -10,9 +16,114 @@ def init_db(app):
     """Initialize the database"""
     with app.app_context():
         db.create_all()
+        upgrade_schema()
+        migrate_feedback_selections()
+        backfill_feedback_revisions()
         print("Database tables created successfully!")
 
 
+def upgrade_schema():
+    """Add columns and indexes introduced after a table was first created (create_all skips existing tables)"""
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_sql = CreateColumn(column).compile(dialect=db.engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_sql}"))
+
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+
+
+def migrate_feedback_selections():
+    """Move selections stored as JSON in client_feedback.selected_designs into design_selections"""
+    legacy = ClientFeedback.query.filter(ClientFeedback.selected_designs.isnot(None)).all()
+    for feedback in legacy:
+        try:
+            design_ids = {int(design_id) for design_id in json.loads(feedback.selected_designs)}
+        except (TypeError, ValueError):
+            design_ids = set()
+        # Only keep ids that still belong to this request
+        valid_ids = {
+            design_id for (design_id,) in db.session.query(Design.id)
+            .filter(Design.request_id == feedback.request_id, Design.id.in_(design_ids))
+        } if design_ids else set()
+        existing = {selection.design_id for selection in feedback.selections}
+        for design_id in sorted(valid_ids - existing):
+            db.session.add(DesignSelection(feedback_id=feedback.id, design_id=design_id))
+        feedback.selected_designs = None
+    if legacy:
+        db.session.commit()
+        print(f"Migrated design selections for {len(legacy)} feedback entries")
+
+
+def backfill_feedback_revisions():
+    """Give feedback submitted before revisions existed one, in submission order"""
+    start = db.session.query(func.max(ClientFeedback.revision)).scalar() or 0
+    updated = ClientFeedback.query.filter(ClientFeedback.revision.is_(None)).update(
+        {ClientFeedback.revision: ClientFeedback.id + start}, synchronize_session=False
+    )
+    if updated:
+        db.session.commit()
+
+
+def selection_rates(by='position'):
+    """
+    How often designs get picked, across every request with feedback
+
+    A design counts as shown once its request has feedback. Position is the
+    design's place in its gallery (1 = first), ignoring gaps left by deletions.
+
+    Args:
+        by: 'position' or 'title' (case-insensitive, untitled designs skipped)
+
+    Returns:
+        list of dict: group, shown, selected and selection_rate, in group order
+    """
+    selected = func.count(DesignSelection.id)
+    shown = func.count(Design.id)
+
+    if by == 'position':
+        position = func.row_number().over(
+            partition_by=Design.request_id,
+            order_by=(Design.display_order, Design.id),
+        ).label('position')
+        positioned = db.session.query(Design.id.label('design_id'), position).subquery()
+        group = positioned.c.position
+        query = (db.session.query(group, shown, selected)
+                 .select_from(Design)
+                 .join(positioned, positioned.c.design_id == Design.id))
+    elif by == 'title':
+        group = func.lower(func.trim(Design.title))
+        query = (db.session.query(group, shown, selected)
+                 .select_from(Design)
+                 .filter(Design.title.isnot(None), func.trim(Design.title) != ''))
+    else:
+        raise ValueError("by must be 'position' or 'title'")
+
+    rows = (query
+            .join(ClientFeedback, ClientFeedback.request_id == Design.request_id)
+            .outerjoin(DesignSelection, (DesignSelection.design_id == Design.id)
+                       & (DesignSelection.feedback_id == ClientFeedback.id))
+            .group_by(group)
+            .order_by(group)
+            .all())
+
+    return [
+        {
+            by: value,
+            'shown': shown_count,
+            'selected': selected_count,
+            'selection_rate': round(selected_count / shown_count, 4) if shown_count else 0.0,
+        }
+        for value, shown_count, selected_count in rows
+    ]
+
+
 def create_admin_user(username, password, email):
     """Create a new admin user"""
     password_hash = generate_password_hash(password)
@@ -46,6 +157,84 @@ def get_all_requests():
     return DesignRequest.query.order_by(DesignRequest.created_at.desc()).all()
 
 
+# Dashboard status counts, cached briefly and dropped whenever a request changes
+_status_counts = {'counts': None, 'at': 0.0}
+_status_counts_lock = threading.Lock()
+
+
+def get_status_counts():
+    """Number of design requests per status, from a short-lived cache"""
+    ttl = float(os.environ.get('DASHBOARD_CACHE_SECONDS', 30))
+    with _status_counts_lock:
+        if _status_counts['counts'] is not None and time.monotonic() - _status_counts['at'] < ttl:
+            return dict(_status_counts['counts'])
+
+    counts = {'pending': 0, 'in_progress': 0, 'completed': 0}
+    rows = db.session.query(DesignRequest.status, func.count(DesignRequest.id)).group_by(DesignRequest.status)
+    for status, count in rows:
+        counts[status] = count
+
+    with _status_counts_lock:
+        _status_counts['counts'] = counts
+        _status_counts['at'] = time.monotonic()
+    return dict(counts)
+
+
+def invalidate_status_counts(*args):
+    with _status_counts_lock:
+        _status_counts['counts'] = None
+
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(DesignRequest, _event, invalidate_status_counts)
+
+
+def get_requests_page(status, page=1, per_page=20, search=None):
+    """
+    One page of design requests in a status, newest first
+
+    Each request gets design_count and feedback_count attributes, loaded with
+    one grouped query per relationship rather than a lazy load per row.
+
+    Args:
+        status: 'pending', 'in_progress' or 'completed'
+        page: 1-based page number
+        per_page: Requests per page
+        search: Optional text matched against company, contact and keywords
+
+    Returns:
+        Pagination of DesignRequest
+    """
+    query = db.select(DesignRequest).where(DesignRequest.status == status)
+    if search:
+        pattern = f"%{search}%"
+        query = query.where(or_(
+            DesignRequest.company_name.ilike(pattern),
+            DesignRequest.contact_name.ilike(pattern),
+            DesignRequest.contact_email.ilike(pattern),
+            DesignRequest.brand_keywords.ilike(pattern),
+        ))
+    query = query.order_by(DesignRequest.created_at.desc(), DesignRequest.id.desc())
+
+    pagination = db.paginate(query, page=page, per_page=per_page, error_out=False)
+
+    request_ids = [design_request.id for design_request in pagination.items]
+    design_counts = dict(
+        db.session.query(Design.request_id, func.count(Design.id))
+        .filter(Design.request_id.in_(request_ids)).group_by(Design.request_id)
+    ) if request_ids else {}
+    feedback_counts = dict(
+        db.session.query(ClientFeedback.request_id, func.count(ClientFeedback.id))
+        .filter(ClientFeedback.request_id.in_(request_ids)).group_by(ClientFeedback.request_id)
+    ) if request_ids else {}
+
+    for design_request in pagination.items:
+        design_request.design_count = design_counts.get(design_request.id, 0)
+        design_request.feedback_count = feedback_counts.get(design_request.id, 0)
+
+    return pagination
+
+
 def update_request_status(request_id, new_status):
     """Update the status of a design request"""
     request = DesignRequest.query.get(request_id)
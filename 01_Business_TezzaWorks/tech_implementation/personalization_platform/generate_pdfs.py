@@ -0,0 +1,109 @@
+"""
+Batch-render PDF presentations for many design requests in parallel
+
+Presentations whose inputs haven't changed since their last render are
+skipped. After a branding or layout change, bump
+TezzaWorksPDFGenerator.TEMPLATE_VERSION (or pass --force) to re-issue them all.
+
+Usage:
+    python generate_pdfs.py --status in_progress
+    python generate_pdfs.py --status in_progress --status completed --since 2024-01-01 --workers 4
+    python generate_pdfs.py --force --dry-run
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from app import create_app
+from models import DesignRequest, Design
+from utils.pdf_generator import TezzaWorksPDFGenerator, RequestSnapshot, DesignSnapshot, build_presentation
+
+
+def select_requests(statuses, since=None, until=None):
+    """Load snapshots of the matching requests that have at least one design"""
+    query = DesignRequest.query.filter(DesignRequest.designs.any())
+    if statuses:
+        query = query.filter(DesignRequest.status.in_(statuses))
+    if since:
+        query = query.filter(DesignRequest.created_at >= since)
+    if until:
+        query = query.filter(DesignRequest.created_at <= until)
+
+    selected = []
+    for design_request in query.order_by(DesignRequest.id).all():
+        designs = Design.query.filter_by(request_id=design_request.id).order_by(Design.display_order).all()
+        selected.append((RequestSnapshot(design_request), [DesignSnapshot(design) for design in designs]))
+    return selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render PDF presentations for many design requests')
+    parser.add_argument('--status', action='append', choices=['pending', 'in_progress', 'completed'],
+                        help='Request status to include (repeatable; default: in_progress)')
+    parser.add_argument('--since', type=datetime.fromisoformat, help='Only requests created on/after this date')
+    parser.add_argument('--until', type=datetime.fromisoformat, help='Only requests created on/before this date')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Parallel render processes')
+    parser.add_argument('--force', action='store_true', help='Re-render even if inputs are unchanged')
+    parser.add_argument('--dry-run', action='store_true', help='List what would be rendered without rendering')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        selected = select_requests(args.status or ['in_progress'], args.since, args.until)
+
+    # Skip unchanged presentations before paying for a worker round-trip
+    generator = TezzaWorksPDFGenerator()
+    to_render = []
+    skipped = 0
+    for request_snapshot, design_snapshots in selected:
+        if not args.force and os.path.exists(generator.cached_path(request_snapshot, design_snapshots)):
+            skipped += 1
+        else:
+            to_render.append((request_snapshot, design_snapshots))
+
+    print(f"\n{len(selected)} requests selected, {skipped} unchanged, {len(to_render)} to render")
+    if args.dry_run:
+        for request_snapshot, design_snapshots in to_render:
+            print(f"  #{request_snapshot.id} {request_snapshot.company_name} ({len(design_snapshots)} designs)")
+        return 0
+
+    built = 0
+    failed = 0
+    build_seconds = 0.0
+    total_bytes = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {
+            executor.submit(build_presentation, request_snapshot, design_snapshots, force=args.force): request_snapshot
+            for request_snapshot, design_snapshots in to_render
+        }
+        for future in as_completed(futures):
+            request_snapshot = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"  FAILED #{request_snapshot.id} {request_snapshot.company_name}: {e}")
+                continue
+            built += 1
+            build_seconds += result['build_seconds']
+            total_bytes += result['size_bytes']
+
+    elapsed = time.perf_counter() - start
+
+    print(f"\nRendered {built} presentations in {elapsed:.2f}s with {args.workers} workers")
+    if built:
+        print(f"  Throughput:     {built / elapsed:.2f} PDFs/s")
+        print(f"  Avg build time: {build_seconds / built:.2f}s")
+        print(f"  Total size:     {total_bytes / 1024 / 1024:.1f} MB")
+    print(f"  Skipped:        {skipped}")
+    print(f"  Failed:         {failed}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
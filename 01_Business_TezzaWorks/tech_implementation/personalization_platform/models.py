@@ -1,8 +1,10 @@
 """
 Database models for the TezzaWorks Personalization Platform
 """
+import json
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, update
 
 db = SQLAlchemy()
 
@@ -10,6 +12,10 @@ db = SQLAlchemy()
 class DesignRequest(db.Model):
     """Model for client design consultation requests"""
     __tablename__ = 'design_requests'
+    __table_args__ = (
+        # Admin dashboard lists each status newest first
+        db.Index('ix_design_requests_status_created', 'status', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -36,9 +42,13 @@ class DesignRequest(db.Model):
     # Unique link for client gallery
     gallery_token = db.Column(db.String(100), unique=True, nullable=False)
 
+    # Bumped whenever anything shown in the gallery changes (see _bump_content_versions)
+    content_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     # Relationships
     designs = db.relationship('Design', backref='request', lazy=True, cascade='all, delete-orphan')
     feedback = db.relationship('ClientFeedback', backref='request', lazy=True, cascade='all, delete-orphan')
+    pdf_jobs = db.relationship('PDFJob', backref='request', lazy=True, cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<DesignRequest {self.company_name}>'
@@ -47,6 +57,10 @@ class DesignRequest(db.Model):
 class Design(db.Model):
     """Model for uploaded design options"""
     __tablename__ = 'designs'
+    __table_args__ = (
+        # Galleries and presentations list a request's designs in display order
+        db.Index('ix_designs_request_order', 'request_id', 'display_order'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     request_id = db.Column(db.Integer, db.ForeignKey('design_requests.id'), nullable=False)
@@ -56,6 +70,11 @@ class Design(db.Model):
     title = db.Column(db.String(200), nullable=True)
     description = db.Column(db.Text, nullable=True)
 
+    # Original image size and downscaled copies (see utils/image_pipeline.py)
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    derivatives = db.Column(db.Text, nullable=True)  # JSON: {name: {filename, width, height}}
+
     # Client Selection
     is_selected = db.Column(db.Boolean, default=False)
 
@@ -64,27 +83,104 @@ class Design(db.Model):
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    selections = db.relationship('DesignSelection', backref='design', lazy=True, cascade='all, delete-orphan')
+
     def __repr__(self):
         return f'<Design {self.filename}>'
 
+    def derivative_info(self):
+        """Derivative metadata keyed by name ('thumb', 'web', 'print')"""
+        return json.loads(self.derivatives) if self.derivatives else {}
+
+    def image_for(self, size):
+        """Filename of the derivative for a size, falling back to the original"""
+        info = self.derivative_info().get(size)
+        return info['filename'] if info else self.filename
+
 
 class ClientFeedback(db.Model):
     """Model for client feedback on designs"""
     __tablename__ = 'client_feedback'
 
     id = db.Column(db.Integer, primary_key=True)
-    request_id = db.Column(db.Integer, db.ForeignKey('design_requests.id'), nullable=False)
+    request_id = db.Column(db.Integer, db.ForeignKey('design_requests.id'), nullable=False, index=True)
 
     # Feedback Content
-    selected_designs = db.Column(db.Text, nullable=True)  # JSON string of selected design IDs
+    # Legacy JSON list of selected design ids, moved into design_selections at startup
+    selected_designs = db.Column(db.Text, nullable=True)
     overall_feedback = db.Column(db.Text, nullable=True)
     rating = db.Column(db.Integer, nullable=True)  # 1-5 stars
 
+    # Table-wide counter bumped on every submission, so the operations dashboard
+    # can pick up edits (including clearing every selection) incrementally
+    revision = db.Column(db.Integer, nullable=True, index=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    selections = db.relationship('DesignSelection', backref='feedback', lazy=True, cascade='all, delete-orphan')
+
     def __repr__(self):
         return f'<ClientFeedback for Request {self.request_id}>'
 
+    @staticmethod
+    def next_revision():
+        return (db.session.query(db.func.max(ClientFeedback.revision)).scalar() or 0) + 1
+
+
+class DesignSelection(db.Model):
+    """A design a client picked in their gallery feedback"""
+    __tablename__ = 'design_selections'
+    __table_args__ = (
+        db.UniqueConstraint('feedback_id', 'design_id', name='uq_design_selections_feedback_design'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    feedback_id = db.Column(db.Integer, db.ForeignKey('client_feedback.id'), nullable=False, index=True)
+    design_id = db.Column(db.Integer, db.ForeignKey('designs.id'), nullable=False, index=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DesignSelection design {self.design_id} in feedback {self.feedback_id}>'
+
+
+class PDFJob(db.Model):
+    """Model for background PDF presentation builds"""
+    __tablename__ = 'pdf_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    request_id = db.Column(db.Integer, db.ForeignKey('design_requests.id'), nullable=False, index=True)
+
+    # Jobs queued together by "regenerate all" share a batch id
+    batch_id = db.Column(db.String(32), nullable=True, index=True)
+
+    status = db.Column(db.String(20), default='queued', index=True)  # queued, done, failed
+    # Presentation key of the designs snapshotted when the job was queued
+    presentation_key = db.Column(db.String(64), nullable=True)
+    pdf_path = db.Column(db.String(500), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    cache_hit = db.Column(db.Boolean, default=False)
+    build_seconds = db.Column(db.Float, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<PDFJob {self.id} for Request {self.request_id}: {self.status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'request_id': self.request_id,
+            'batch_id': self.batch_id,
+            'status': self.status,
+            'error': self.error,
+            'cache_hit': self.cache_hit,
+            'build_seconds': self.build_seconds,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
 
 class AdminUser(db.Model):
     """Model for admin users (simple auth for MVP)"""
@@ -99,3 +195,23 @@ class AdminUser(db.Model):
 
     def __repr__(self):
         return f'<AdminUser {self.username}>'
+
+
+@event.listens_for(db.session, 'before_flush')
+def _bump_content_versions(session, flush_context, instances):
+    """Bump DesignRequest.content_version when the request, its designs or its feedback change"""
+    request_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, DesignRequest):
+            if obj in session.dirty and session.is_modified(obj):
+                obj.content_version = (obj.content_version or 0) + 1
+        elif isinstance(obj, (Design, ClientFeedback)) and obj.request_id:
+            request_ids.add(obj.request_id)
+
+    if request_ids:
+        session.execute(
+            update(DesignRequest)
+            .where(DesignRequest.id.in_(request_ids))
+            .values(content_version=DesignRequest.content_version + 1),
+            execution_options={'synchronize_session': False},
+        )
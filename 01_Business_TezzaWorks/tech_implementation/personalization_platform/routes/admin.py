@@ -3,22 +3,23 @@ Admin routes for managing design requests and uploads
 """
 import os
 import json
-from flask import Blueprint, render_template, request, redirect, url_for, flash, send_file, session
-from werkzeug.utils import secure_filename
+from flask import Blueprint, render_template, request, redirect, url_for, flash, send_file, session, jsonify, Response, current_app
 from werkzeug.security import check_password_hash
-from models import db, DesignRequest, Design, ClientFeedback, AdminUser
-from database import get_all_requests, update_request_status
-from utils.pdf_generator import generate_design_pdf
+from models import db, DesignRequest, Design, ClientFeedback, AdminUser, PDFJob
+from database import get_requests_page, get_status_counts, update_request_status, selection_rates
+from utils.pdf_generator import TezzaWorksPDFGenerator, pdf_build_stats, built_on
+from utils.pdf_queue import enqueue_pdf, enqueue_in_progress, refresh_job
+from utils.image_pipeline import process_design_async, remove_derivatives
+from utils.uploads import streaming_upload, store_upload, UploadError
+from utils.storage import get_storage
+from utils.gallery_cache import gallery_cache
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
-UPLOAD_FOLDER = 'static/uploads'
-
-
-def allowed_file(filename):
-    """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+ALLOWED_TYPES = {'png', 'jpeg', 'pdf'}
+DESIGN_MAX_BYTES = int(os.environ.get('DESIGN_MAX_BYTES', 16 * 1024 * 1024))
+DASHBOARD_PAGE_SIZE = int(os.environ.get('DASHBOARD_PAGE_SIZE', 20))
+STATUSES = ('pending', 'in_progress', 'completed')
 
 
 def login_required(f):
@@ -34,6 +35,22 @@ def login_required(f):
     return decorated_function
 
 
+def metrics_access_required(f):
+    """Decorator allowing logged-in admins or scrapers presenting METRICS_TOKEN"""
+    from functools import wraps
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        token = os.environ.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') == f'Bearer {token}':
+            return f(*args, **kwargs)
+        if not session.get('admin_logged_in'):
+            return redirect(url_for('admin.login'))
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
 @admin_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """Admin login page"""
@@ -66,18 +83,28 @@ def logout():
 @admin_bp.route('/dashboard')
 @login_required
 def dashboard():
-    """Admin dashboard showing all design requests"""
-    requests = get_all_requests()
+    """Admin dashboard showing design requests by status, one page per section"""
+    search = request.args.get('q', '').strip()
+
+    # Each status section pages independently (?pending_page=2&completed_page=3)
+    pages = {
+        status: get_requests_page(status, request.args.get(f'{status}_page', 1, type=int),
+                                  DASHBOARD_PAGE_SIZE, search or None)
+        for status in STATUSES
+    }
 
-    # Categorize requests by status
-    pending_requests = [r for r in requests if r.status == 'pending']
-    in_progress_requests = [r for r in requests if r.status == 'in_progress']
-    completed_requests = [r for r in requests if r.status == 'completed']
+    def page_url(status, page):
+        args = request.args.to_dict()
+        args[f'{status}_page'] = page
+        return url_for('admin.dashboard', **args)
 
     return render_template('admin_dashboard.html',
-                           pending_requests=pending_requests,
-                           in_progress_requests=in_progress_requests,
-                           completed_requests=completed_requests)
+                           pending_requests=pages['pending'],
+                           in_progress_requests=pages['in_progress'],
+                           completed_requests=pages['completed'],
+                           status_counts=get_status_counts(),
+                           search=search,
+                           page_url=page_url)
 
 
 @admin_bp.route('/request/<int:request_id>')
@@ -87,11 +114,15 @@ def view_request(request_id):
     design_request = DesignRequest.query.get_or_404(request_id)
     designs = Design.query.filter_by(request_id=request_id).order_by(Design.display_order).all()
     feedback = ClientFeedback.query.filter_by(request_id=request_id).first()
+    pdf_job = PDFJob.query.filter_by(request_id=request_id).order_by(PDFJob.id.desc()).first()
+    if pdf_job:
+        refresh_job(pdf_job)
 
     return render_template('admin_request_detail.html',
                            request=design_request,
                            designs=designs,
-                           feedback=feedback)
+                           feedback=feedback,
+                           pdf_job=pdf_job)
 
 
 @admin_bp.route('/request/<int:request_id>/update_status', methods=['POST'])
@@ -111,6 +142,7 @@ def update_status(request_id):
 
 @admin_bp.route('/request/<int:request_id>/upload_design', methods=['POST'])
 @login_required
+@streaming_upload(DESIGN_MAX_BYTES, ALLOWED_TYPES)
 def upload_design(request_id):
     """Upload a design option for a request"""
     design_request = DesignRequest.query.get_or_404(request_id)
@@ -127,16 +159,12 @@ def upload_design(request_id):
             flash('No file selected', 'error')
             return redirect(url_for('admin.view_request', request_id=request_id))
 
-        if file and allowed_file(file.filename):
-            # Save file
-            filename = secure_filename(file.filename)
-            import time
-            timestamp = str(int(time.time()))
-            unique_filename = f"design_{request_id}_{timestamp}_{filename}"
-            filepath = os.path.join(UPLOAD_FOLDER, unique_filename)
-            os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-            file.save(filepath)
-
+        try:
+            # Named by content hash, so re-uploading the same file reuses it
+            unique_filename, duplicate = store_upload(file, 'design')
+        except UploadError as e:
+            flash(str(e), 'error')
+        else:
             # Get design details
             title = request.form.get('design_title', '')
             description = request.form.get('design_description', '')
@@ -154,12 +182,22 @@ def upload_design(request_id):
                 display_order=max_order + 1
             )
 
+            # An identical file already has derivatives; share them
+            existing = Design.query.filter(Design.filename == unique_filename,
+                                           Design.derivatives.isnot(None)).first() if duplicate else None
+            if existing:
+                design.width = existing.width
+                design.height = existing.height
+                design.derivatives = existing.derivatives
+
             db.session.add(design)
             db.session.commit()
 
+            # Thumbnail, web and print copies are built in the background
+            if not existing:
+                process_design_async(current_app._get_current_object(), design.id, unique_filename)
+
             flash('Design uploaded successfully!', 'success')
-        else:
-            flash('Invalid file type. Allowed types: png, jpg, jpeg, pdf', 'error')
 
     except Exception as e:
         db.session.rollback()
@@ -176,10 +214,11 @@ def delete_design(request_id, design_id):
     design = Design.query.get_or_404(design_id)
 
     try:
-        # Delete file from filesystem
-        filepath = os.path.join(UPLOAD_FOLDER, design.filename)
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        # Delete the file unless another design shares it (identical uploads are stored once)
+        shared = Design.query.filter(Design.filename == design.filename, Design.id != design.id).count()
+        if not shared:
+            get_storage().delete(design.filename)
+            remove_derivatives(design)
 
         # Delete database record
         db.session.delete(design)
@@ -197,7 +236,7 @@ def delete_design(request_id, design_id):
 @admin_bp.route('/request/<int:request_id>/generate_pdf')
 @login_required
 def generate_pdf(request_id):
-    """Generate and download PDF presentation"""
+    """Download the PDF presentation, queueing a build if it isn't cached"""
     design_request = DesignRequest.query.get_or_404(request_id)
     designs = Design.query.filter_by(request_id=request_id).order_by(Design.display_order).all()
 
@@ -206,20 +245,84 @@ def generate_pdf(request_id):
         return redirect(url_for('admin.view_request', request_id=request_id))
 
     try:
-        # Generate PDF
-        pdf_path = generate_design_pdf(design_request, designs)
+        # Unchanged presentations are served straight from the cache
+        cached_path = TezzaWorksPDFGenerator().cached_path(design_request, designs)
+        if os.path.exists(cached_path):
+            pdf_build_stats.record_hit()
+            return send_file(
+                cached_path,
+                as_attachment=True,
+                download_name=f"TezzaWorks_Presentation_{design_request.company_name}.pdf"
+            )
 
-        # Send file for download
-        return send_file(
-            pdf_path,
-            as_attachment=True,
-            download_name=f"TezzaWorks_Presentation_{design_request.company_name}.pdf"
-        )
+        enqueue_pdf(current_app._get_current_object(), request_id)
+        flash('The PDF is being generated. It will be ready to download here shortly.', 'success')
 
     except Exception as e:
+        db.session.rollback()
         print(f"Error generating PDF: {e}")
         flash('An error occurred while generating the PDF.', 'error')
-        return redirect(url_for('admin.view_request', request_id=request_id))
+
+    return redirect(url_for('admin.view_request', request_id=request_id))
+
+
+@admin_bp.route('/pdf_jobs/<int:job_id>')
+@login_required
+def pdf_job_status(job_id):
+    """Status of a background PDF build, polled by the request page"""
+    job = refresh_job(PDFJob.query.get_or_404(job_id))
+    result = job.to_dict()
+    if job.status == 'done':
+        result['download_url'] = url_for('admin.download_pdf_job', job_id=job.id)
+        result['generated_on'] = built_on(job.pdf_path)
+    return jsonify(result)
+
+
+@admin_bp.route('/pdf_jobs/<int:job_id>/download')
+@login_required
+def download_pdf_job(job_id):
+    """Download the PDF built by a finished job"""
+    job = PDFJob.query.get_or_404(job_id)
+
+    if job.status != 'done' or not job.pdf_path or not os.path.exists(job.pdf_path):
+        flash('That PDF is no longer available. Please generate it again.', 'error')
+        return redirect(url_for('admin.view_request', request_id=job.request_id))
+
+    return send_file(
+        job.pdf_path,
+        as_attachment=True,
+        download_name=f"TezzaWorks_Presentation_{job.request.company_name}.pdf"
+    )
+
+
+@admin_bp.route('/pdf_jobs/regenerate_in_progress', methods=['POST'])
+@login_required
+def regenerate_in_progress_pdfs():
+    """Queue PDF rebuilds for every in-progress request"""
+    try:
+        batch_id, jobs = enqueue_in_progress(current_app._get_current_object())
+        flash(f'Queued {len(jobs)} presentations for regeneration (batch {batch_id}).', 'success')
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error queueing PDF batch: {e}")
+        flash('An error occurred while queueing the PDFs.', 'error')
+
+    return redirect(url_for('admin.dashboard'))
+
+
+@admin_bp.route('/pdf_jobs/batch/<batch_id>')
+@login_required
+def pdf_batch_status(batch_id):
+    """Progress of a batch of PDF builds"""
+    jobs = [refresh_job(job) for job in PDFJob.query.filter_by(batch_id=batch_id).all()]
+    if not jobs:
+        return jsonify({'error': 'Batch not found'}), 404
+
+    counts = {}
+    for job in jobs:
+        counts[job.status] = counts.get(job.status, 0) + 1
+    return jsonify({'batch_id': batch_id, 'total': len(jobs), 'counts': counts,
+                    'jobs': [job.to_dict() for job in jobs]})
 
 
 @admin_bp.route('/request/<int:request_id>/update_design/<int:design_id>', methods=['POST'])
@@ -240,3 +343,47 @@ def update_design(request_id, design_id):
         flash('An error occurred while updating the design.', 'error')
 
     return redirect(url_for('admin.view_request', request_id=request_id))
+
+
+@admin_bp.route('/reports/selections')
+@login_required
+def selection_report():
+    """Selection rates by gallery position (default) or ?by=title, as JSON"""
+    by = request.args.get('by', 'position')
+    if by not in ('position', 'title'):
+        return jsonify({'error': "by must be 'position' or 'title'"}), 400
+    return jsonify({'by': by, 'rows': selection_rates(by)})
+
+
+@admin_bp.route('/metrics')
+@metrics_access_required
+def metrics():
+    """Request timings, slow queries and profile summaries as JSON"""
+    store = current_app.extensions.get('instrumentation')
+    if store is None:
+        return jsonify({'error': 'Instrumentation is disabled'}), 404
+    snapshot = store.snapshot()
+    snapshot['pdf_builds'] = pdf_build_stats.snapshot()
+    snapshot['gallery_cache'] = gallery_cache.stats()
+    return jsonify(snapshot)
+
+
+@admin_bp.route('/metrics/prometheus')
+@metrics_access_required
+def metrics_prometheus():
+    """Metrics in the Prometheus text exposition format"""
+    store = current_app.extensions.get('instrumentation')
+    if store is None:
+        return jsonify({'error': 'Instrumentation is disabled'}), 404
+    return Response(store.prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@admin_bp.route('/metrics/profiles/<int:index>')
+@metrics_access_required
+def metrics_profile(index):
+    """Download a slow-request profile as folded stacks for flamegraph tools"""
+    store = current_app.extensions.get('instrumentation')
+    profiles = list(store.profiles) if store else []
+    if index < 0 or index >= len(profiles):
+        return jsonify({'error': 'Profile not found'}), 404
+    return Response(profiles[index]['folded'], mimetype='text/plain')
@@ -2,21 +2,19 @@
 Client-facing routes for design request submission and gallery viewing
 """
 import os
-import json
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-from werkzeug.utils import secure_filename
-from models import db, DesignRequest, Design, ClientFeedback
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, make_response
+from datetime import datetime
+from sqlalchemy import delete, insert, update
+from models import db, DesignRequest, Design, ClientFeedback, DesignSelection
 from database import generate_gallery_token, get_request_by_token
+from utils.uploads import streaming_upload, store_upload, UploadError
+from utils.storage import upload_url_version
+from utils.gallery_cache import gallery_cache
 
 client_bp = Blueprint('client', __name__)
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'svg', 'pdf'}
-UPLOAD_FOLDER = 'static/uploads'
-
-
-def allowed_file(filename):
-    """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+ALLOWED_TYPES = {'png', 'jpeg', 'svg', 'pdf'}
+LOGO_MAX_BYTES = int(os.environ.get('LOGO_MAX_BYTES', 5 * 1024 * 1024))
 
 
 @client_bp.route('/')
@@ -26,6 +24,7 @@ def index():
 
 
 @client_bp.route('/submit', methods=['POST'])
+@streaming_upload(LOGO_MAX_BYTES, ALLOWED_TYPES)
 def submit_request():
     """Handle client design request submission"""
     try:
@@ -48,15 +47,13 @@ def submit_request():
         logo_filename = None
         if 'logo' in request.files:
             file = request.files['logo']
-            if file and file.filename and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                # Add timestamp to prevent conflicts
-                import time
-                timestamp = str(int(time.time()))
-                logo_filename = f"{timestamp}_{filename}"
-                filepath = os.path.join(UPLOAD_FOLDER, logo_filename)
-                os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-                file.save(filepath)
+            if file and file.filename:
+                # Named by content hash, so a repeat upload reuses the stored file
+                try:
+                    logo_filename, _ = store_upload(file, 'logo')
+                except UploadError as e:
+                    flash(f'Logo not accepted: {e}', 'error')
+                    return redirect(url_for('client.index'))
 
         # Generate unique gallery token
         gallery_token = generate_gallery_token()
@@ -96,21 +93,43 @@ def submit_request():
 @client_bp.route('/gallery/<token>')
 def gallery(token):
     """Client gallery view for a specific design request"""
-    design_request = get_request_by_token(token)
+    # Fast path: one indexed lookup decides whether the cached page is current
+    row = db.session.query(DesignRequest.id, DesignRequest.content_version).filter_by(gallery_token=token).first()
 
-    if not design_request:
+    if not row:
         return render_template('error.html', message='Gallery not found.'), 404
 
-    # Get associated designs
-    designs = Design.query.filter_by(request_id=design_request.id).order_by(Design.display_order).all()
+    # Pages carrying a flash message are one-offs; don't cache them
+    cacheable = not session.get('_flashes')
+    version = (row.content_version, upload_url_version())
+    cached = gallery_cache.get(token, version) if cacheable else None
 
-    # Get existing feedback if any
-    feedback = ClientFeedback.query.filter_by(request_id=design_request.id).first()
+    if cached:
+        html, etag = cached
+    else:
+        design_request = db.session.get(DesignRequest, row.id)
 
-    return render_template('gallery.html',
-                           request=design_request,
-                           designs=designs,
-                           feedback=feedback)
+        # Get associated designs
+        designs = Design.query.filter_by(request_id=design_request.id).order_by(Design.display_order).all()
+
+        # Get existing feedback if any
+        feedback = ClientFeedback.query.filter_by(request_id=design_request.id).first()
+
+        html = render_template('gallery.html',
+                               request=design_request,
+                               designs=designs,
+                               feedback=feedback)
+        if not cacheable:
+            response = make_response(html)
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+        etag = gallery_cache.put(token, version, html)
+
+    # Browsers revalidate on every visit and get a 304 when nothing changed
+    response = make_response(html)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
 
 
 @client_bp.route('/gallery/<token>/feedback', methods=['POST'])
@@ -123,7 +142,8 @@ def submit_feedback(token):
 
     try:
         # Get feedback data
-        selected_designs = request.form.getlist('selected_designs[]')
+        selected_designs = {int(design_id) for design_id in request.form.getlist('selected_designs[]')
+                            if design_id.isdigit()}
         overall_feedback = request.form.get('overall_feedback', '')
         rating = request.form.get('rating', None)
 
@@ -136,22 +156,41 @@ def submit_feedback(token):
 
         if feedback:
             # Update existing feedback
-            feedback.selected_designs = json.dumps(selected_designs)
             feedback.overall_feedback = overall_feedback
             feedback.rating = rating
         else:
             # Create new feedback
             feedback = ClientFeedback(
                 request_id=design_request.id,
-                selected_designs=json.dumps(selected_designs),
                 overall_feedback=overall_feedback,
                 rating=rating
             )
             db.session.add(feedback)
+            db.session.flush()
+
+        # Only this gallery's designs can be selected
+        selected_ids = [
+            design_id for (design_id,) in db.session.query(Design.id)
+            .filter(Design.request_id == design_request.id, Design.id.in_(selected_designs))
+        ] if selected_designs else []
+
+        # Replace the selection rows and flags with one statement each
+        db.session.execute(delete(DesignSelection).where(DesignSelection.feedback_id == feedback.id))
+        if selected_ids:
+            db.session.execute(insert(DesignSelection), [
+                {'feedback_id': feedback.id, 'design_id': design_id, 'created_at': datetime.utcnow()}
+                for design_id in selected_ids
+            ])
+        db.session.execute(
+            update(Design)
+            .where(Design.request_id == design_request.id)
+            .values(is_selected=Design.id.in_(selected_ids)),
+            execution_options={'synchronize_session': False},
+        )
 
-        # Update selected status on designs
-        for design in Design.query.filter_by(request_id=design_request.id).all():
-            design.is_selected = str(design.id) in selected_designs
+        # Bulk statements skip the flush listener, so bump the gallery version here
+        design_request.content_version = (design_request.content_version or 0) + 1
+        feedback.revision = ClientFeedback.next_revision()
 
         db.session.commit()
 
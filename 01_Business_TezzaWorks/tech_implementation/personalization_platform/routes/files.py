@@ -0,0 +1,28 @@
+"""
+Signed downloads of stored uploads for the local storage backend
+"""
+import os
+from flask import Blueprint, abort, current_app, request, send_file
+from utils.storage import get_storage, verify, CACHE_CONTROL
+
+files_bp = Blueprint('files', __name__, url_prefix='/files')
+
+
+@files_bp.route('/<key>')
+def serve_file(key):
+    """Serve a stored file if the URL's signature is valid and unexpired"""
+    if not verify(key, request.args.get('expires'), request.args.get('sig'), current_app.config['SECRET_KEY']):
+        abort(403)
+
+    storage = get_storage()
+    try:
+        if not storage.exists(key):
+            abort(404)
+        path = storage.local_path(key)
+    except ValueError:
+        abort(404)
+
+    response = send_file(os.path.abspath(path), conditional=True, etag=key)
+    # Keys are content hashes, so the bytes behind a URL never change
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
@@ -0,0 +1,27 @@
+import os
+import sys
+import pytest
+
+# Tests import the platform's modules the way app.py does, by name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """An app backed by a throwaway database, with PDFs and uploads under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv('STORAGE_ROOT', str(tmp_path / 'storage'))
+
+    import utils.storage
+    monkeypatch.setattr(utils.storage, '_storage', None)
+
+    from app import create_app
+    app = create_app()
+    app.config.update({'TESTING': True})
+    yield app
+
+    from models import db
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
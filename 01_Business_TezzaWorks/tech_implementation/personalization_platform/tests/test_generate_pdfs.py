@@ -0,0 +1,61 @@
+import sys
+import pytest
+import generate_pdfs
+from utils import pdf_generator
+from models import db, DesignRequest, Design
+
+
+@pytest.fixture
+def in_progress_request(app):
+    with app.app_context():
+        design_request = DesignRequest(company_name='Acme Corp', contact_name='Ann', contact_email='ann@acme.test',
+                                       brand_keywords='bold, modern', status='in_progress', gallery_token='acme')
+        db.session.add(design_request)
+        db.session.flush()
+        db.session.add(Design(request_id=design_request.id, filename='designs/missing.png', title='Mug'))
+        db.session.commit()
+        return design_request.id
+
+
+def run_cli(monkeypatch, app, capsys, on_date, *args):
+    monkeypatch.setattr(generate_pdfs, 'create_app', lambda: app)
+    monkeypatch.setattr(pdf_generator, 'presentation_date', lambda: on_date)
+    monkeypatch.setattr(sys, 'argv', ['generate_pdfs.py', '--workers', '1', *args])
+    assert generate_pdfs.main() == 0
+    return capsys.readouterr().out
+
+
+def test_unchanged_presentations_are_skipped_on_later_days(app, in_progress_request, monkeypatch, capsys, tmp_path):
+    """
+    GIVEN an in-progress request whose presentation was rendered by the batch CLI
+    WHEN the CLI runs again on a later day without any change to the request
+    THEN check that the presentation is skipped and keeps the date it was built on
+    """
+    first = run_cli(monkeypatch, app, capsys, 'March 04, 2025')
+    assert '1 requests selected, 0 unchanged, 1 to render' in first
+    pdfs = sorted((tmp_path / 'static' / 'pdfs').glob('*.pdf'))
+    assert len(pdfs) == 1
+
+    second = run_cli(monkeypatch, app, capsys, 'March 05, 2025')
+    assert '1 requests selected, 1 unchanged, 0 to render' in second
+    assert sorted((tmp_path / 'static' / 'pdfs').glob('*.pdf')) == pdfs
+    assert pdf_generator.built_on(str(pdfs[0])) == 'March 04, 2025'
+
+
+def test_changed_presentations_are_rendered_again(app, in_progress_request, monkeypatch, capsys, tmp_path):
+    """
+    GIVEN an in-progress request whose presentation was rendered by the batch CLI
+    WHEN a design title changes and the CLI runs again the next day
+    THEN check that the presentation is rendered again and replaces the old one
+    """
+    run_cli(monkeypatch, app, capsys, 'March 04, 2025')
+
+    with app.app_context():
+        Design.query.filter_by(request_id=in_progress_request).update({'title': 'Travel Mug'})
+        db.session.commit()
+
+    output = run_cli(monkeypatch, app, capsys, 'March 05, 2025')
+    assert '0 unchanged, 1 to render' in output
+    pdfs = list((tmp_path / 'static' / 'pdfs').glob('*.pdf'))
+    assert len(pdfs) == 1
+    assert pdf_generator.built_on(str(pdfs[0])) == 'March 05, 2025'
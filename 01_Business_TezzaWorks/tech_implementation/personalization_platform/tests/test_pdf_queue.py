@@ -0,0 +1,34 @@
+from concurrent.futures import Future
+from models import db, DesignRequest, PDFJob
+from utils.pdf_queue import _finish_job
+
+
+def finished(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def test_finish_job_ignores_deleted_jobs(app):
+    """
+    GIVEN a PDF job that was deleted while its presentation was rendering
+    WHEN the build finishes
+    THEN check that the completion callback returns without touching the database
+    """
+    with app.app_context():
+        design_request = DesignRequest(company_name='Acme Corp', contact_name='Ann', contact_email='ann@acme.test',
+                                       brand_keywords='bold', gallery_token='acme')
+        db.session.add(design_request)
+        db.session.flush()
+        job = PDFJob(request_id=design_request.id, status='queued')
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+        db.session.delete(job)
+        db.session.commit()
+
+    result = {'pdf_path': 'static/pdfs/presentation.pdf', 'cache_hit': False, 'build_seconds': 0.1, 'size_bytes': 1}
+    _finish_job(app, job_id, 1, finished(result))
+
+    with app.app_context():
+        assert PDFJob.query.count() == 0
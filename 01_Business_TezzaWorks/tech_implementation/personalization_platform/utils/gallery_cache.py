@@ -0,0 +1,57 @@
+"""
+Rendered client galleries, cached per gallery token
+An entry is only reused while the request's content_version and the signed
+upload URL window are unchanged. Any edit to the request, its designs or its
+feedback bumps content_version, so stale pages are never served and no
+explicit invalidation is needed.
+"""
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+
+
+class GalleryCache:
+    """Thread-safe LRU cache of rendered gallery HTML"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token, version):
+        """Return (html, etag) for a token if cached at this version, else None"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry['version'] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry['html'], entry['etag']
+
+    def put(self, token, version, html):
+        """Store a rendered page and return its ETag"""
+        etag = hashlib.sha256(html.encode('utf-8')).hexdigest()[:32]
+        with self._lock:
+            self._entries[token] = {'version': version, 'html': html, 'etag': etag}
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+gallery_cache = GalleryCache(max_entries=int(os.environ.get('GALLERY_CACHE_SIZE', 256)))
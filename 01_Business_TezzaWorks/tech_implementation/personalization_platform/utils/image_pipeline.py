@@ -0,0 +1,185 @@
+"""
+Upload-time image derivatives for design files
+Builds downscaled copies of each uploaded design and stores them alongside
+the original (see utils/storage.py):
+a thumbnail for the gallery grid and admin pages, a web-size image for the
+gallery lightbox (both WebP), and a print-size image for PDF presentations
+(JPEG, or PNG when the design has transparency).
+"""
+import os
+import json
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+from utils.storage import get_storage
+
+# name -> (longest edge in pixels, output format)
+DERIVATIVES = {
+    'thumb': (640, 'WEBP'),
+    'web': (1600, 'WEBP'),
+    # PDF presentations place designs in a 5 inch box; 300 DPI needs 1500px
+    'print': (1500, 'PRINT'),
+}
+
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp', 'gif', 'bmp', 'tiff'}
+
+_executor = None
+
+
+def is_processable(filename):
+    """Check whether a file is a raster image we can build derivatives for"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in IMAGE_EXTENSIONS
+
+
+def _has_alpha(img):
+    return img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+
+
+def create_derivatives(filename):
+    """
+    Build every derivative for one uploaded image
+
+    Runs in a worker process, so it only touches storage, not the database.
+    Derivative keys are derived from the original's content key, so they are
+    content-addressed too.
+
+    Args:
+        filename: Storage key of the original file
+
+    Returns:
+        dict: Original width/height and, per derivative, its key and size
+    """
+    storage = get_storage()
+    source_path = storage.local_path(filename)
+    stem = filename.rsplit('.', 1)[0]
+
+    with Image.open(source_path) as img:
+        # Apply EXIF rotation so phone photos aren't sideways
+        img = ImageOps.exif_transpose(img)
+        width, height = img.size
+        alpha = _has_alpha(img)
+        img = img.convert('RGBA' if alpha else 'RGB')
+
+        derivatives = {}
+        for name, (max_edge, fmt) in DERIVATIVES.items():
+            resized = img.copy()
+            # Never upscale; thumbnail keeps the aspect ratio
+            resized.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+            if fmt == 'PRINT':
+                fmt = 'PNG' if alpha else 'JPEG'
+            ext = {'WEBP': 'webp', 'PNG': 'png', 'JPEG': 'jpg'}[fmt]
+            out_name = f"{stem}.{name}.{ext}"
+            fd, tmp_path = tempfile.mkstemp(dir=storage.staging_dir, suffix=f".{ext}")
+            os.close(fd)
+
+            if fmt == 'WEBP':
+                resized.save(tmp_path, 'WEBP', quality=82, method=4)
+            elif fmt == 'JPEG':
+                resized.save(tmp_path, 'JPEG', quality=90, optimize=True, progressive=True, dpi=(300, 300))
+            else:
+                resized.save(tmp_path, 'PNG', optimize=True, dpi=(300, 300))
+            storage.put_file(out_name, tmp_path, move=True)
+
+            derivatives[name] = {'filename': out_name, 'width': resized.width, 'height': resized.height}
+
+    return {'width': width, 'height': height, 'derivatives': derivatives}
+
+
+def remove_derivatives(design):
+    """Delete a design's derivative files"""
+    storage = get_storage()
+    for info in design.derivative_info().values():
+        storage.delete(info['filename'])
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        workers = int(os.environ.get('IMAGE_WORKERS', min(2, os.cpu_count() or 1)))
+        _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+def _apply_result(design, result):
+    design.width = result['width']
+    design.height = result['height']
+    design.derivatives = json.dumps(result['derivatives'])
+
+
+def process_design_async(app, design_id, filename):
+    """
+    Build a design's derivatives in the worker pool and record them on the Design
+
+    Pages fall back to the original file until the derivatives are ready.
+
+    Args:
+        app: Flask application, used to get an app context in the callback
+        design_id: Design to update when the job finishes
+        filename: Storage key of the uploaded file
+    """
+    if not is_processable(filename):
+        return None
+
+    future = _get_executor().submit(create_derivatives, filename)
+
+    def on_done(done):
+        from models import db, Design
+        try:
+            result = done.result()
+        except Exception as e:
+            print(f"Error creating derivatives for {filename}: {e}")
+            return
+        with app.app_context():
+            design = db.session.get(Design, design_id)
+            if design is None:
+                # Deleted while processing
+                storage = get_storage()
+                for info in result['derivatives'].values():
+                    storage.delete(info['filename'])
+                return
+            _apply_result(design, result)
+            db.session.commit()
+
+    future.add_done_callback(on_done)
+    return future
+
+
+def backfill_derivatives(app):
+    """
+    Build derivatives for designs uploaded before the pipeline existed
+
+    Returns:
+        int: Number of designs processed
+    """
+    from models import db, Design
+
+    storage = get_storage()
+    with app.app_context():
+        pending = [
+            (design.id, design.filename)
+            for design in Design.query.filter(Design.derivatives.is_(None)).all()
+            if is_processable(design.filename) and storage.exists(design.filename)
+        ]
+
+        executor = _get_executor()
+        futures = {design_id: executor.submit(create_derivatives, filename)
+                   for design_id, filename in pending}
+
+        processed = 0
+        for design_id, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error creating derivatives for design {design_id}: {e}")
+                continue
+            _apply_result(db.session.get(Design, design_id), result)
+            processed += 1
+        db.session.commit()
+        return processed
+
+
+if __name__ == '__main__':
+    from app import create_app
+    count = backfill_derivatives(create_app())
+    print(f"Created derivatives for {count} designs")
@@ -2,7 +2,14 @@
 PDF generation utility for design presentations
 """
 import os
+import glob
+import hashlib
+import json
+import threading
+import time
+from collections import deque
 from datetime import datetime
+from functools import partial
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -10,13 +17,85 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
+from utils.storage import get_storage
+
+
+def presentation_date():
+    """Date printed on a presentation built today, e.g. 'March 04, 2025'"""
+    return datetime.now().strftime('%B %d, %Y')
+
+
+def built_on_path(pdf_path):
+    """Path of the build record kept next to a cached presentation"""
+    return f"{pdf_path}.json"
+
+
+def write_built_on(pdf_path, generated_on):
+    """Record the date printed in a cached presentation"""
+    record_path = built_on_path(pdf_path)
+    tmp_path = f"{record_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'generated_on': generated_on}, f)
+    os.replace(tmp_path, record_path)
+
+
+def built_on(pdf_path):
+    """Date printed in a cached presentation, or None if it wasn't recorded"""
+    try:
+        with open(built_on_path(pdf_path)) as f:
+            return json.load(f).get('generated_on')
+    except (OSError, ValueError):
+        return None
+
+
+class PDFBuildStats:
+    """Thread-safe counters and recent timings for presentation builds"""
+
+    def __init__(self, max_recent=50):
+        self.hits = 0
+        self.misses = 0
+        self.total_build_seconds = 0.0
+        self.recent = deque(maxlen=max_recent)
+        self._lock = threading.Lock()
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_build(self, request_id, designs, seconds, size_bytes):
+        with self._lock:
+            self.misses += 1
+            self.total_build_seconds += seconds
+            self.recent.append({
+                'request_id': request_id,
+                'designs': designs,
+                'build_ms': round(seconds * 1000, 1),
+                'size_bytes': size_bytes,
+                'at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            })
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'cache_hits': self.hits,
+                'builds': self.misses,
+                'avg_build_ms': round(self.total_build_seconds / self.misses * 1000, 1) if self.misses else 0.0,
+                'recent_builds': list(self.recent),
+            }
+
+
+pdf_build_stats = PDFBuildStats()
 
 
 class TezzaWorksPDFGenerator:
     """Generate professional PDF presentations for design options"""
 
-    def __init__(self, output_dir='static/pdfs'):
+    # Bump when the layout or branding changes so cached presentations are rebuilt
+    TEMPLATE_VERSION = 1
+
+    def __init__(self, output_dir='static/pdfs', storage=None):
         self.output_dir = output_dir
+        self.storage = storage or get_storage()
         os.makedirs(output_dir, exist_ok=True)
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
@@ -56,7 +135,7 @@ class TezzaWorksPDFGenerator:
             fontName='Helvetica'
         ))
 
-    def _create_header_footer(self, canvas_obj, doc):
+    def _create_header_footer(self, canvas_obj, doc, generated_on):
         """Add header and footer to each page"""
         canvas_obj.saveState()
 
@@ -70,12 +149,130 @@ class TezzaWorksPDFGenerator:
         # Footer
         canvas_obj.setFont('Helvetica', 9)
         canvas_obj.setFillColor(colors.HexColor('#7F8C8D'))
-        canvas_obj.drawString(inch, 0.5 * inch, f"Generated on {datetime.now().strftime('%B %d, %Y')}")
+        canvas_obj.drawString(inch, 0.5 * inch, f"Generated on {generated_on}")
         canvas_obj.drawRightString(letter[0] - inch, 0.5 * inch, f"Page {doc.page}")
 
         canvas_obj.restoreState()
 
-    def generate_presentation(self, request, designs, output_filename=None):
+    def presentation_key(self, request, designs):
+        """
+        Fingerprint everything that ends up in a presentation
+
+        Covers the request fields shown in the PDF and the designs' order, titles,
+        descriptions and built derivatives. Design files are content-addressed,
+        so their keys stand in for their contents. The printed date is left out:
+        it records when the cached copy was built (see built_on).
+
+        Args:
+            request: DesignRequest model instance
+            designs: List of Design model instances, in presentation order
+
+        Returns:
+            Hex digest identifying the presentation contents
+        """
+        design_parts = [
+            [design.filename, design.title, design.description, getattr(design, 'derivatives', None)]
+            for design in designs
+        ]
+
+        payload = {
+            'template_version': self.TEMPLATE_VERSION,
+            'company_name': request.company_name,
+            'brand_keywords': request.brand_keywords,
+            'brand_colors': request.brand_colors,
+            'target_audience': request.target_audience,
+            'designs': design_parts,
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def cached_path(self, request, designs):
+        """Path the presentation for these inputs is (or will be) cached at"""
+        key = self.presentation_key(request, designs)
+        return os.path.join(self.output_dir, f"presentation_{request.id}_{key[:16]}.pdf")
+
+    def get_or_generate(self, request, designs, force=False):
+        """
+        Return a cached presentation, building it only when its inputs changed
+
+        Args:
+            request: DesignRequest model instance
+            designs: List of Design model instances
+            force: Rebuild even if a cached copy exists
+
+        Returns:
+            Path to the PDF file
+        """
+        output_path = self.cached_path(request, designs)
+
+        if os.path.exists(output_path) and not force:
+            # Refresh the mtime so the retention policy keeps presentations in use
+            os.utime(output_path)
+            pdf_build_stats.record_hit()
+            return output_path
+
+        # Build under a temporary name so a concurrent request never serves a
+        # half-written file
+        tmp_filename = f"{os.path.basename(output_path)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        start = time.perf_counter()
+        generated_on = presentation_date()
+        tmp_path = self.generate_presentation(request, designs, output_filename=tmp_filename,
+                                              generated_on=generated_on)
+        # Record the printed date before publishing the PDF, so a cached copy
+        # is never seen without it
+        write_built_on(output_path, generated_on)
+        os.replace(tmp_path, output_path)
+        elapsed = time.perf_counter() - start
+
+        pdf_build_stats.record_build(request.id, len(designs), elapsed, os.path.getsize(output_path))
+        print(f"Built presentation for request {request.id} ({len(designs)} designs) in {elapsed:.2f}s")
+
+        self.remove_superseded(request, keep=output_path)
+        self.cleanup()
+        return output_path
+
+    def remove_superseded(self, request, keep):
+        """Delete older cached presentations of the same request"""
+        for path in glob.glob(os.path.join(self.output_dir, f"presentation_{request.id}_*.pdf")):
+            if path != keep:
+                for stale in (path, built_on_path(path)):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+
+    def cleanup(self, max_age_days=None):
+        """
+        Delete PDFs that haven't been built or served for max_age_days
+
+        Args:
+            max_age_days: Retention in days (defaults to PDF_RETENTION_DAYS, 30)
+
+        Returns:
+            Number of files removed
+        """
+        if max_age_days is None:
+            max_age_days = float(os.environ.get('PDF_RETENTION_DAYS', 30))
+        cutoff = time.time() - max_age_days * 86400
+
+        removed = 0
+        for path in glob.glob(os.path.join(self.output_dir, '*.pdf')) + glob.glob(os.path.join(self.output_dir, '*.tmp')):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        # Drop the build records of presentations that are gone
+        for path in glob.glob(os.path.join(self.output_dir, '*.pdf.json')):
+            if not os.path.exists(path[:-len('.json')]):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return removed
+
+    def generate_presentation(self, request, designs, output_filename=None, generated_on=None):
         """
         Generate a professional PDF presentation
 
@@ -83,6 +280,7 @@ class TezzaWorksPDFGenerator:
             request: DesignRequest model instance
             designs: List of Design model instances
             output_filename: Optional custom filename
+            generated_on: Date printed on the cover and footers (defaults to today's)
 
         Returns:
             Path to generated PDF file
@@ -92,6 +290,7 @@ class TezzaWorksPDFGenerator:
             output_filename = f"presentation_{request.company_name}_{timestamp}.pdf"
 
         output_path = os.path.join(self.output_dir, output_filename)
+        generated_on = generated_on or presentation_date()
 
         # Create PDF document
         doc = SimpleDocTemplate(
@@ -114,7 +313,7 @@ class TezzaWorksPDFGenerator:
         story.append(Spacer(1, 0.2 * inch))
         story.append(Paragraph("TezzaWorks Design Team", self.styles['CustomBody']))
         story.append(Spacer(1, 0.1 * inch))
-        story.append(Paragraph(datetime.now().strftime('%B %d, %Y'), self.styles['CustomBody']))
+        story.append(Paragraph(generated_on, self.styles['CustomBody']))
 
         story.append(PageBreak())
 
@@ -151,9 +350,10 @@ class TezzaWorksPDFGenerator:
             story.append(Paragraph(f"<b>{title}</b>", self.styles['CustomSubtitle']))
             story.append(Spacer(1, 0.2 * inch))
 
-            # Design image
+            # Design image, using the print-size derivative when it's been built
             try:
-                img_path = os.path.join('static/uploads', design.filename)
+                image_filename = design.image_for('print') if hasattr(design, 'image_for') else design.filename
+                img_path = self.storage.local_path(image_filename)
                 if os.path.exists(img_path):
                     img = Image(img_path, width=5 * inch, height=5 * inch, kind='proportional')
                     story.append(img)
@@ -197,14 +397,72 @@ class TezzaWorksPDFGenerator:
         story.append(Paragraph(next_steps_text, self.styles['CustomBody']))
 
         # Build PDF
-        doc.build(story, onFirstPage=self._create_header_footer, onLaterPages=self._create_header_footer)
+        header_footer = partial(self._create_header_footer, generated_on=generated_on)
+        doc.build(story, onFirstPage=header_footer, onLaterPages=header_footer)
 
         return output_path
 
 
+class RequestSnapshot:
+    """Picklable copy of the DesignRequest fields a presentation uses"""
+
+    FIELDS = ('id', 'company_name', 'brand_keywords', 'brand_colors', 'target_audience')
+
+    def __init__(self, request):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(request, field))
+
+
+class DesignSnapshot:
+    """Picklable copy of the Design fields a presentation uses"""
+
+    FIELDS = ('id', 'filename', 'title', 'description', 'derivatives')
+
+    def __init__(self, design):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(design, field, None))
+
+    def image_for(self, size):
+        info = json.loads(self.derivatives).get(size) if self.derivatives else None
+        return info['filename'] if info else self.filename
+
+
+# One generator per worker process, so styles are set up once and reused
+_worker_generators = {}
+
+
+def build_presentation(request_snapshot, design_snapshots, output_dir='static/pdfs', force=False):
+    """
+    Build (or reuse) a presentation in a worker process
+
+    Args:
+        request_snapshot: RequestSnapshot of the DesignRequest
+        design_snapshots: List of DesignSnapshot in presentation order
+        force: Rebuild even if a cached copy exists
+
+    Returns:
+        dict: pdf_path, generated_on, cache_hit, build_seconds and size_bytes
+    """
+    generator = _worker_generators.get(output_dir)
+    if generator is None:
+        generator = _worker_generators[output_dir] = TezzaWorksPDFGenerator(output_dir)
+
+    cache_hit = not force and os.path.exists(generator.cached_path(request_snapshot, design_snapshots))
+    start = time.perf_counter()
+    pdf_path = generator.get_or_generate(request_snapshot, design_snapshots, force=force)
+    return {
+        'pdf_path': pdf_path,
+        'generated_on': built_on(pdf_path),
+        'cache_hit': cache_hit,
+        'build_seconds': round(time.perf_counter() - start, 3),
+        'size_bytes': os.path.getsize(pdf_path),
+    }
+
+
 def generate_design_pdf(request, designs):
     """
-    Convenience function to generate a PDF presentation
+    Convenience function to get a PDF presentation, reusing a cached one
+    when the request and designs haven't changed
 
     Args:
         request: DesignRequest model instance
@@ -214,4 +472,4 @@ def generate_design_pdf(request, designs):
         Path to generated PDF file
     """
     generator = TezzaWorksPDFGenerator()
-    return generator.generate_presentation(request, designs)
+    return generator.get_or_generate(request, designs)
@@ -0,0 +1,149 @@
+"""
+Background queue for PDF presentation builds
+Jobs are recorded in the pdf_jobs table and built in a small process pool.
+The pool runs at a lower CPU priority, so PDF builds can't starve gallery
+requests. The admin pages poll a job's status until it's done.
+"""
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from models import db, DesignRequest, Design, PDFJob
+from utils.pdf_generator import (TezzaWorksPDFGenerator, RequestSnapshot, DesignSnapshot,
+                                 build_presentation, pdf_build_stats)
+
+_executor = None
+
+
+def _init_worker():
+    # Let the web workers win any contention for CPU
+    try:
+        os.nice(int(os.environ.get('PDF_WORKER_NICE', 10)))
+    except (AttributeError, OSError):
+        pass
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=int(os.environ.get('PDF_WORKERS', 1)),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def _finish_job(app, job_id, design_count, future):
+    """Record a finished build; runs on a pool callback thread"""
+    with app.app_context():
+        job = db.session.get(PDFJob, job_id)
+        if job is None:
+            # The job (or its request) was deleted while it was rendering
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Error generating PDF for job {job_id}: {e}")
+            job.status = 'failed'
+            job.error = str(e)
+        else:
+            job.status = 'done'
+            job.pdf_path = result['pdf_path']
+            job.cache_hit = result['cache_hit']
+            job.build_seconds = result['build_seconds']
+            if result['cache_hit']:
+                pdf_build_stats.record_hit()
+            else:
+                pdf_build_stats.record_build(job.request_id, design_count,
+                                             result['build_seconds'], result['size_bytes'])
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+
+def enqueue_pdf(app, request_id, batch_id=None):
+    """
+    Queue a presentation build for a design request
+
+    A queued job for the same batch that will build the same presentation is
+    reused. An unchanged presentation that is already cached completes
+    immediately.
+
+    Args:
+        app: Flask application, used for the completion callback
+        request_id: DesignRequest to build
+        batch_id: Optional id grouping jobs queued together
+
+    Returns:
+        PDFJob, or None if the request has no designs
+    """
+    design_request = db.session.get(DesignRequest, request_id)
+    designs = Design.query.filter_by(request_id=request_id).order_by(Design.display_order).all()
+    if design_request is None or not designs:
+        return None
+
+    request_snapshot = RequestSnapshot(design_request)
+    design_snapshots = [DesignSnapshot(design) for design in designs]
+
+    generator = TezzaWorksPDFGenerator()
+    presentation_key = generator.presentation_key(request_snapshot, design_snapshots)
+
+    # A job queued before the designs changed would build a stale presentation
+    existing = PDFJob.query.filter_by(request_id=request_id, batch_id=batch_id, status='queued',
+                                      presentation_key=presentation_key).first()
+    if existing and not is_stale(existing):
+        return existing
+
+    job = PDFJob(request_id=request_id, batch_id=batch_id, status='queued', presentation_key=presentation_key)
+    db.session.add(job)
+
+    cached_path = generator.cached_path(request_snapshot, design_snapshots)
+    if os.path.exists(cached_path):
+        os.utime(cached_path)
+        pdf_build_stats.record_hit()
+        job.status = 'done'
+        job.pdf_path = cached_path
+        job.cache_hit = True
+        job.build_seconds = 0.0
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return job
+
+    db.session.commit()
+    future = _get_executor().submit(build_presentation, request_snapshot, design_snapshots)
+    future.add_done_callback(partial(_finish_job, app, job.id, len(designs)))
+    return job
+
+
+def enqueue_in_progress(app):
+    """
+    Queue presentation rebuilds for every in-progress request with designs
+
+    Returns:
+        tuple: (batch_id, list of PDFJob)
+    """
+    batch_id = secrets.token_hex(8)
+    request_ids = [
+        request_id for (request_id,) in db.session.query(DesignRequest.id)
+        .filter(DesignRequest.status == 'in_progress')
+        .filter(DesignRequest.designs.any())
+        .order_by(DesignRequest.id)
+    ]
+    jobs = [job for job in (enqueue_pdf(app, request_id, batch_id) for request_id in request_ids) if job]
+    return batch_id, jobs
+
+
+def is_stale(job):
+    """A job still queued after PDF_JOB_TIMEOUT seconds was lost (e.g. a restart)"""
+    timeout = timedelta(seconds=int(os.environ.get('PDF_JOB_TIMEOUT', 600)))
+    return job.status == 'queued' and job.created_at and datetime.utcnow() - job.created_at > timeout
+
+
+def refresh_job(job):
+    """Mark lost jobs as failed so pollers stop waiting"""
+    if is_stale(job):
+        job.status = 'failed'
+        job.error = 'Timed out waiting for a PDF worker; please try again'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    return job
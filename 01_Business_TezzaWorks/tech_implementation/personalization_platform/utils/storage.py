@@ -0,0 +1,319 @@
+"""
+Content-addressed storage for uploaded logos, designs and their derivatives
+Files are stored under a key derived from a hash of their contents, so a key
+always names the same bytes. That lets any app instance share one store, and
+lets browsers and CDNs cache files forever. Two backends are available:
+
+- local (default): files under STORAGE_ROOT, served through signed URLs by
+  routes/files.py
+- s3: any S3-compatible object store (AWS S3, MinIO, ...), served through
+  presigned URLs; requires boto3
+
+Run `python -m utils.storage migrate` to move uploads saved under the old
+`static/uploads/<timestamp>_<name>` scheme into the configured backend.
+"""
+import os
+import hmac
+import time
+import hashlib
+import mimetypes
+import shutil
+import tempfile
+from functools import lru_cache
+
+# Content-addressed files never change, so browsers may cache them for a year
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Sniffed type -> stored extension
+EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'pdf': 'pdf', 'svg': 'svg'}
+
+_storage = None
+
+
+def content_key(prefix, digest, extension):
+    """
+    Build the storage key for a file's contents
+
+    Args:
+        prefix: Kind of file, e.g. 'logo' or 'design'
+        digest: Hex sha256 of the file contents
+        extension: File extension without the dot
+
+    Returns:
+        str: Key such as 'design_<hash>.png'
+    """
+    return f"{prefix}_{digest[:32]}.{extension}"
+
+
+def url_window(ttl):
+    """
+    Expiry time for a signed URL generated now
+
+    Expiries are rounded up to a multiple of ttl, so every page rendered in the
+    same window links to the same URL and browsers can reuse their cached copy.
+    URLs stay valid for between ttl and 2 * ttl seconds.
+    """
+    return (int(time.time()) // ttl + 2) * ttl
+
+
+def sign(key, expires, secret):
+    """HMAC signature authorizing a download of key until expires"""
+    message = f"{key}:{expires}".encode('utf-8')
+    return hmac.new(secret.encode('utf-8'), message, hashlib.sha256).hexdigest()[:32]
+
+
+def verify(key, expires, signature, secret):
+    """Check a signature from sign() and that it hasn't expired"""
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign(key, expires, secret), signature or '')
+
+
+class LocalStorage:
+    """Files in a directory on local disk"""
+
+    name = 'local'
+
+    def __init__(self, root='storage', url_ttl=86400):
+        self.root = root
+        self.url_ttl = url_ttl
+        self.staging_dir = os.path.join(root, '.incoming')
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def _path(self, key):
+        if not key or '/' in key or '\\' in key or key.startswith('.'):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return os.path.join(self.root, key)
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def put_file(self, key, path, move=False):
+        """Store a file under key; with move=True the source file is consumed"""
+        destination = self._path(key)
+        if move:
+            os.replace(path, destination)
+        else:
+            tmp_path = f"{destination}.{os.getpid()}.tmp"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, destination)
+        # Staged files are created owner-only
+        os.chmod(destination, 0o644)
+
+    def delete(self, key):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def local_path(self, key):
+        """Path of a readable copy of the file on this machine"""
+        return self._path(key)
+
+    def url(self, key):
+        """Signed URL served by routes/files.py"""
+        from flask import current_app, url_for
+        expires = url_window(self.url_ttl)
+        signature = sign(key, expires, current_app.config['SECRET_KEY'])
+        return url_for('files.serve_file', key=key, expires=expires, sig=signature)
+
+
+class S3Storage:
+    """Files in an S3-compatible bucket, with a local read-through cache"""
+
+    name = 's3'
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None, cache_dir='storage_cache', url_ttl=86400):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.cache_dir = cache_dir
+        # Presigned URLs can't outlive 7 days
+        self.url_ttl = min(url_ttl, 3 * 86400)
+        self.staging_dir = os.path.join(cache_dir, '.incoming')
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self._client = None
+
+    @property
+    def client(self):
+        # Created lazily so worker processes build their own client
+        if self._client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError('STORAGE_BACKEND=s3 requires boto3 (pip install boto3)')
+            self._client = boto3.client('s3', endpoint_url=self.endpoint_url, region_name=self.region)
+        return self._client
+
+    def _object_key(self, key):
+        return f"{self.prefix}{key}"
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def put_file(self, key, path, move=False):
+        """Upload a file under key; with move=True the source becomes the local cached copy"""
+        content_type = mimetypes.guess_type(key)[0] or 'application/octet-stream'
+        self.client.upload_file(path, self.bucket, self._object_key(key), ExtraArgs={
+            'ContentType': content_type,
+            'CacheControl': CACHE_CONTROL,
+        })
+        if move:
+            os.replace(path, os.path.join(self.cache_dir, key))
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        cached = os.path.join(self.cache_dir, key)
+        if os.path.exists(cached):
+            os.remove(cached)
+
+    def local_path(self, key):
+        """Path of a cached local copy, downloading the object on first use"""
+        path = os.path.join(self.cache_dir, key)
+        if not os.path.exists(path):
+            fd, tmp_path = tempfile.mkstemp(dir=self.staging_dir, suffix='.download')
+            os.close(fd)
+            try:
+                self.client.download_file(self.bucket, self._object_key(key), tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return path
+
+    def url(self, key):
+        return self._presigned_url(key, url_window(self.url_ttl))
+
+    @lru_cache(maxsize=4096)
+    def _presigned_url(self, key, expires):
+        # Cached per window so repeat renders reuse one URL
+        return self.client.generate_presigned_url('get_object', Params={
+            'Bucket': self.bucket,
+            'Key': self._object_key(key),
+            'ResponseCacheControl': CACHE_CONTROL,
+        }, ExpiresIn=int(expires - time.time()))
+
+
+def create_storage():
+    """Build the storage backend configured by environment variables"""
+    backend = os.environ.get('STORAGE_BACKEND', 'local')
+    url_ttl = int(os.environ.get('STORAGE_URL_TTL', 86400))
+
+    if backend == 'local':
+        return LocalStorage(os.environ.get('STORAGE_ROOT', 'storage'), url_ttl=url_ttl)
+    if backend == 's3':
+        return S3Storage(
+            bucket=os.environ['S3_BUCKET'],
+            prefix=os.environ.get('S3_PREFIX', ''),
+            endpoint_url=os.environ.get('S3_ENDPOINT_URL') or None,
+            region=os.environ.get('S3_REGION') or None,
+            cache_dir=os.environ.get('STORAGE_CACHE_DIR', 'storage_cache'),
+            url_ttl=url_ttl,
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+
+def get_storage():
+    """Process-wide storage backend"""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+
+def upload_url(key):
+    """Jinja helper: URL of a stored file"""
+    return get_storage().url(key) if key else ''
+
+
+def upload_url_version():
+    """Changes whenever upload_url() starts returning new signed URLs"""
+    return url_window(get_storage().url_ttl)
+
+
+def _migrate_file(storage, source_dir, filename, prefix):
+    """Copy one legacy upload into storage and return its content key"""
+    from utils.uploads import sniff_type, SNIFF_BYTES
+
+    source_path = os.path.join(source_dir, filename)
+    digest = hashlib.sha256()
+    with open(source_path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+        digest.update(head)
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    kind = sniff_type(head)
+    extension = EXTENSIONS[kind] if kind else filename.rsplit('.', 1)[-1].lower()
+    key = content_key(prefix, digest.hexdigest(), extension)
+    if not storage.exists(key):
+        storage.put_file(key, source_path)
+    return key
+
+
+def migrate_uploads(app, source_dir='static/uploads'):
+    """
+    Move legacy uploads into the configured storage backend
+
+    Every logo and design file is copied under its content key and its row
+    updated. Design derivatives are rebuilt under the new keys. Source files
+    are left in place; delete source_dir once the migration has been checked.
+
+    Returns:
+        dict: Counts of migrated logos and designs, and files that were missing
+    """
+    from models import db, DesignRequest, Design
+    from utils.image_pipeline import backfill_derivatives
+
+    storage = get_storage()
+    counts = {'logos': 0, 'designs': 0, 'missing': 0}
+
+    with app.app_context():
+        for design_request in DesignRequest.query.filter(DesignRequest.logo_filename.isnot(None)):
+            if storage.exists(design_request.logo_filename):
+                continue
+            if not os.path.exists(os.path.join(source_dir, design_request.logo_filename)):
+                counts['missing'] += 1
+                continue
+            design_request.logo_filename = _migrate_file(storage, source_dir, design_request.logo_filename, 'logo')
+            counts['logos'] += 1
+
+        for design in Design.query.all():
+            if storage.exists(design.filename):
+                continue
+            if not os.path.exists(os.path.join(source_dir, design.filename)):
+                counts['missing'] += 1
+                continue
+            design.filename = _migrate_file(storage, source_dir, design.filename, 'design')
+            design.derivatives = None
+            counts['designs'] += 1
+
+        db.session.commit()
+
+    backfill_derivatives(app)
+    return counts
+
+
+if __name__ == '__main__':
+    import sys
+    from app import create_app
+
+    if sys.argv[1:2] != ['migrate']:
+        print("Usage: python -m utils.storage migrate [SOURCE_DIR]")
+        sys.exit(1)
+
+    source = sys.argv[2] if len(sys.argv) > 2 else 'static/uploads'
+    result = migrate_uploads(create_app(), source)
+    print(f"Migrated {result['logos']} logos and {result['designs']} designs "
+          f"to {get_storage().name} storage ({result['missing']} files missing)")
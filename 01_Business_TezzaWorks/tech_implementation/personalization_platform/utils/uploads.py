@@ -0,0 +1,217 @@
+"""
+Streaming upload handling for logos and design files
+Multipart file parts are written straight to a temporary file in the upload
+folder as they arrive, hashing each chunk on the way. The real file type is
+sniffed from the first bytes rather than trusted from the extension, and
+oversize or invalid files are dropped as soon as that is known, so nothing
+is buffered for them. Files are then stored under a content-addressed key
+(see utils/storage.py), so uploading the same logo twice stores it once.
+"""
+import os
+import hashlib
+import tempfile
+from functools import wraps
+from flask import Request, g
+from werkzeug.formparser import default_stream_factory
+from utils.storage import get_storage, content_key, EXTENSIONS
+
+# Enough of the file to recognise an SVG behind an XML prolog or comment
+SNIFF_BYTES = 512
+
+# Extensions a browser may send for each sniffed type
+CLAIMED_EXTENSIONS = {'png': {'png'}, 'jpeg': {'jpg', 'jpeg'}, 'pdf': {'pdf'}, 'svg': {'svg'}}
+
+
+class UploadError(Exception):
+    """Raised when an uploaded file is rejected"""
+
+
+def sniff_type(head):
+    """
+    Identify a file from its first bytes
+
+    Args:
+        head: Up to SNIFF_BYTES bytes from the start of the file
+
+    Returns:
+        str: 'png', 'jpeg', 'pdf' or 'svg', or None if unrecognised
+    """
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'%PDF-'):
+        return 'pdf'
+    text = head.lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if text.startswith((b'<?xml', b'<svg', b'<!--', b'<!doctype svg')) and b'<svg' in text:
+        return 'svg'
+    return None
+
+
+def _extension(filename):
+    return filename.rsplit('.', 1)[1].lower() if filename and '.' in filename else ''
+
+
+class UploadStream:
+    """Writable file part that hashes, sniffs and size-checks data as it streams in"""
+
+    def __init__(self, filename, staging_dir, max_bytes, allowed_types):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.allowed_types = allowed_types
+        self.size = 0
+        self.kind = None
+        self.error = None
+        self.path = None
+        self._file = None
+        self._hash = hashlib.sha256()
+        self._head = b''
+
+        claimed = _extension(filename)
+        if not any(claimed in CLAIMED_EXTENSIONS[kind] for kind in allowed_types):
+            # Reject on the extension before writing a single byte
+            self._reject(self._invalid_message())
+            return
+
+        fd, self.path = tempfile.mkstemp(dir=staging_dir, suffix='.part')
+        self._file = os.fdopen(fd, 'w+b')
+
+    def _invalid_message(self):
+        allowed = ', '.join(sorted({ext for kind in self.allowed_types for ext in CLAIMED_EXTENSIONS[kind]}))
+        return f'Invalid file type. Allowed types: {allowed}'
+
+    def _reject(self, message):
+        self.error = message
+        self._discard()
+
+    def _discard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.path = None
+
+    def _check_type(self):
+        self.kind = sniff_type(self._head)
+        if self.kind not in self.allowed_types:
+            self._reject(self._invalid_message())
+
+    def write(self, data):
+        if self.error:
+            # Keep consuming the request body, but store nothing
+            return len(data)
+
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self._reject(f'File is too large. Maximum size is {self.max_bytes // (1024 * 1024)} MB')
+            return len(data)
+
+        if self.kind is None and len(self._head) < SNIFF_BYTES:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._check_type()
+                if self.error:
+                    return len(data)
+
+        self._hash.update(data)
+        self._file.write(data)
+        return len(data)
+
+    def seek(self, offset, whence=0):
+        return self._file.seek(offset, whence) if self._file else 0
+
+    def tell(self):
+        return self._file.tell() if self._file else 0
+
+    def read(self, size=-1):
+        return self._file.read(size) if self._file else b''
+
+    def readline(self, size=-1):
+        return self._file.readline(size) if self._file else b''
+
+    def close(self):
+        """Called when the request ends; drops the temporary file if it wasn't stored"""
+        self._discard()
+
+    def finish(self):
+        """
+        Finish the upload and return its sniffed type and content hash
+
+        Raises:
+            UploadError: If the file was rejected or is empty
+        """
+        if not self.error and self.kind is None:
+            # Files shorter than SNIFF_BYTES are checked once complete
+            self._check_type()
+        if not self.error and self.size == 0:
+            self._reject('The uploaded file is empty')
+        if self.error:
+            raise UploadError(self.error)
+        self._file.close()
+        self._file = None
+        return self.kind, self._hash.hexdigest()
+
+
+class UploadRequest(Request):
+    """Request class that streams file parts through UploadStream when a view sets an upload policy"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        policy = g.get('upload_policy')
+        if policy is None or not filename:
+            return default_stream_factory(total_content_length=total_content_length, filename=filename,
+                                          content_type=content_type, content_length=content_length)
+        return UploadStream(filename, get_storage().staging_dir, **policy)
+
+
+def streaming_upload(max_bytes, allowed_types):
+    """
+    Decorator enabling streaming uploads for a view
+
+    Must wrap the view before anything reads request.form or request.files.
+
+    Args:
+        max_bytes: Largest accepted file, per file
+        allowed_types: Sniffed types to accept ('png', 'jpeg', 'pdf', 'svg')
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            g.upload_policy = {'max_bytes': max_bytes, 'allowed_types': set(allowed_types)}
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
+
+
+def store_upload(file, prefix):
+    """
+    Move a streamed upload into storage under its content key
+
+    Args:
+        file: FileStorage from a view decorated with streaming_upload
+        prefix: Key prefix, e.g. 'logo' or 'design'
+
+    Returns:
+        tuple: (storage key, True if an identical file was already stored)
+
+    Raises:
+        UploadError: If the file was rejected
+    """
+    stream = file.stream
+    if not isinstance(stream, UploadStream):
+        raise UploadError('Upload was not streamed; decorate the view with streaming_upload')
+
+    kind, digest = stream.finish()
+    key = content_key(prefix, digest, EXTENSIONS[kind])
+    storage = get_storage()
+
+    if storage.exists(key):
+        os.remove(stream.path)
+        stream.path = None
+        return key, True
+
+    storage.put_file(key, stream.path, move=True)
+    stream.path = None
+    return key, False
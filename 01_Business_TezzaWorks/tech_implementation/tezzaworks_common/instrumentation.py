@@ -0,0 +1,321 @@
+"""
+Opt-in request instrumentation shared by the TezzaWorks Flask applications
+Records per-request wall time, SQL statement counts and SQL time (via SQLAlchemy
+engine events), captures slow queries with their query plan, and
+keeps sampling-profiler dumps of slow requests. Enabled with INSTRUMENTATION_ENABLED=true.
+"""
+from collections import Counter, deque
+from flask import g, request, current_app, has_app_context, has_request_context
+from sqlalchemy import event
+import os
+import sys
+import threading
+import time
+
+# Histogram buckets (seconds) for the Prometheus request duration metric
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _env_flag(name, default='false'):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of in-flight request threads from one background thread
+
+    Each registered thread accumulates a Counter of folded stacks
+    ("module:function;module:function ..."), the format flamegraph tools read.
+    """
+
+    MAX_DEPTH = 64
+
+    def __init__(self, interval_seconds):
+        self.interval = interval_seconds
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self, ident):
+        with self._lock:
+            self._active[ident] = Counter()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='request-sampler', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, ident):
+        with self._lock:
+            return self._active.pop(ident, Counter())
+
+    def _run(self):
+        while True:
+            # Clear before checking, so a start() between the check and the
+            # wait leaves the event set instead of being missed
+            self._wakeup.clear()
+            with self._lock:
+                idle = not self._active
+            if idle:
+                self._wakeup.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, stacks in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stacks[self._fold(frame)] += 1
+
+    def _fold(self, frame):
+        parts = []
+        while frame is not None and len(parts) < self.MAX_DEPTH:
+            code = frame.f_code
+            parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ';'.join(reversed(parts))
+
+
+class MetricsStore:
+    """Thread-safe aggregate of request and query metrics"""
+
+    def __init__(self, slow_query_ms=100.0, profile_threshold_ms=500.0,
+                 max_slow_queries=50, max_profiles=20, metric_prefix='tezzaworks'):
+        self.metric_prefix = metric_prefix
+        self.slow_query_ms = slow_query_ms
+        self.profile_threshold_ms = profile_threshold_ms
+        self.started_at = time.time()
+        self.endpoints = {}
+        self.slow_queries = deque(maxlen=max_slow_queries)
+        self.slow_query_total = 0
+        self.profiles = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def record_request(self, method, endpoint, status, duration, sql_count, sql_time):
+        with self._lock:
+            stats = self.endpoints.get((method, endpoint))
+            if stats is None:
+                stats = self.endpoints[(method, endpoint)] = {
+                    'count': 0,
+                    'errors': 0,
+                    'total_seconds': 0.0,
+                    'max_seconds': 0.0,
+                    'sql_statements': 0,
+                    'sql_seconds': 0.0,
+                    'buckets': [0] * len(DURATION_BUCKETS),
+                }
+            stats['count'] += 1
+            if status >= 500:
+                stats['errors'] += 1
+            stats['total_seconds'] += duration
+            stats['max_seconds'] = max(stats['max_seconds'], duration)
+            stats['sql_statements'] += sql_count
+            stats['sql_seconds'] += sql_time
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats['buckets'][i] += 1
+
+    def record_slow_query(self, entry):
+        with self._lock:
+            self.slow_query_total += 1
+            self.slow_queries.append(entry)
+
+    def record_profile(self, entry):
+        with self._lock:
+            self.profiles.append(entry)
+
+    def snapshot(self):
+        """Return metrics as a JSON-serialisable dict"""
+        with self._lock:
+            endpoints = []
+            for (method, endpoint), stats in sorted(self.endpoints.items(), key=lambda kv: -kv[1]['total_seconds']):
+                endpoints.append({
+                    'method': method,
+                    'endpoint': endpoint,
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_seconds'] / stats['count'] * 1000, 2),
+                    'max_ms': round(stats['max_seconds'] * 1000, 2),
+                    'total_ms': round(stats['total_seconds'] * 1000, 2),
+                    'avg_sql_statements': round(stats['sql_statements'] / stats['count'], 2),
+                    'avg_sql_ms': round(stats['sql_seconds'] / stats['count'] * 1000, 2),
+                })
+            return {
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'slow_query_threshold_ms': self.slow_query_ms,
+                'profile_threshold_ms': self.profile_threshold_ms,
+                'endpoints': endpoints,
+                'slow_query_total': self.slow_query_total,
+                'slow_queries': list(self.slow_queries),
+                'profiles': [
+                    {k: v for k, v in profile.items() if k != 'folded'}
+                    for profile in self.profiles
+                ],
+            }
+
+    def prometheus(self, prefix=None):
+        """Render metrics in the Prometheus text exposition format"""
+        prefix = prefix or self.metric_prefix
+        lines = [
+            f'# HELP {prefix}_http_request_duration_seconds Request wall time',
+            f'# TYPE {prefix}_http_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            items = sorted(self.endpoints.items())
+            for (method, endpoint), stats in items:
+                labels = f'method="{method}",endpoint="{_escape_label(endpoint)}"'
+                for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+                    lines.append(f'{prefix}_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{prefix}_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats["count"]}')
+                lines.append(f'{prefix}_http_request_duration_seconds_sum{{{labels}}} {stats["total_seconds"]:.6f}')
+                lines.append(f'{prefix}_http_request_duration_seconds_count{{{labels}}} {stats["count"]}')
+
+            for name, key, help_text, fmt in (
+                ('http_request_errors_total', 'errors', 'Requests that returned a 5xx status', '{}'),
+                ('sql_statements_total', 'sql_statements', 'SQL statements executed while serving requests', '{}'),
+                ('sql_seconds_total', 'sql_seconds', 'Time spent in SQL while serving requests', '{:.6f}'),
+            ):
+                lines.append(f'# HELP {prefix}_{name} {help_text}')
+                lines.append(f'# TYPE {prefix}_{name} counter')
+                for (method, endpoint), stats in items:
+                    labels = f'method="{method}",endpoint="{_escape_label(endpoint)}"'
+                    lines.append(f'{prefix}_{name}{{{labels}}} {fmt.format(stats[key])}')
+
+            lines.append(f'# HELP {prefix}_sql_slow_queries_total Queries slower than {self.slow_query_ms}ms')
+            lines.append(f'# TYPE {prefix}_sql_slow_queries_total counter')
+            lines.append(f'{prefix}_sql_slow_queries_total {self.slow_query_total}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _explain(conn, statement, parameters):
+    """Fetch the query plan for a slow SELECT using a separate raw cursor"""
+    if not statement.lstrip().upper().startswith('SELECT'):
+        return None
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [' | '.join(str(col) for col in row) for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+
+    if not has_app_context():
+        return
+    store = current_app.extensions.get('instrumentation')
+    if store is None:
+        return
+
+    if has_request_context() and 'instr_start' in g:
+        g.instr_sql_count += 1
+        g.instr_sql_time += elapsed
+
+    if elapsed * 1000 >= store.slow_query_ms:
+        store.record_slow_query({
+            'duration_ms': round(elapsed * 1000, 2),
+            # Bound values can hold client names and emails, so only the
+            # statement text is kept
+            'statement': statement,
+            'executemany': executemany,
+            'plan': None if executemany else _explain(conn, statement, parameters),
+            'endpoint': request.path if has_request_context() else None,
+            'at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        })
+
+
+def init_instrumentation(app, engine, metric_prefix='tezzaworks'):
+    """
+    Attach request timing, SQL counters and the sampling profiler to an app
+
+    Args:
+        app: Flask application
+        engine: SQLAlchemy engine whose statements should be counted
+        metric_prefix: Name prefix for this app's Prometheus metrics
+
+    Returns:
+        MetricsStore: The store backing the metrics endpoints
+    """
+    store = MetricsStore(
+        slow_query_ms=float(os.getenv('SLOW_QUERY_MS', 100)),
+        profile_threshold_ms=float(os.getenv('PROFILE_THRESHOLD_MS', 500)),
+        metric_prefix=metric_prefix,
+    )
+    app.extensions['instrumentation'] = store
+
+    profiler = None
+    if _env_flag('PROFILING_ENABLED', 'true'):
+        profiler = SamplingProfiler(float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', 5)) / 1000)
+
+    # The engine is shared module state, so only listen once per process
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_timer():
+        g.instr_start = time.perf_counter()
+        g.instr_sql_count = 0
+        g.instr_sql_time = 0.0
+        if profiler:
+            profiler.start(threading.get_ident())
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'instr_start' not in g:
+            return response
+
+        duration = time.perf_counter() - g.instr_start
+        endpoint = request.url_rule.rule if request.url_rule else '<unmatched>'
+        store.record_request(request.method, endpoint, response.status_code,
+                             duration, g.instr_sql_count, g.instr_sql_time)
+
+        response.headers['Server-Timing'] = (
+            f'app;dur={duration * 1000:.1f}, db;dur={g.instr_sql_time * 1000:.1f};desc="{g.instr_sql_count} queries"'
+        )
+
+        if profiler:
+            stacks = profiler.stop(threading.get_ident())
+            if duration * 1000 >= store.profile_threshold_ms and stacks:
+                store.record_profile({
+                    'method': request.method,
+                    'path': request.full_path.rstrip('?'),
+                    'endpoint': endpoint,
+                    'duration_ms': round(duration * 1000, 2),
+                    'sql_statements': g.instr_sql_count,
+                    'samples': sum(stacks.values()),
+                    'top_frames': [
+                        {'stack': stack.rsplit(';', 1)[-1], 'samples': count}
+                        for stack, count in stacks.most_common(10)
+                    ],
+                    'folded': '\n'.join(f'{stack} {count}' for stack, count in stacks.most_common()),
+                    'at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                })
+
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exception=None):
+        # after_request is skipped on unhandled errors, so make sure the
+        # sampler stops tracking this thread either way
+        if profiler:
+            profiler.stop(threading.get_ident())
+
+    return store
+
+
+def instrumentation_enabled():
+    """Check whether instrumentation is switched on for this process"""
+    return _env_flag('INSTRUMENTATION_ENABLED')